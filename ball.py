@@ -1,33 +1,57 @@
-from random import random
-from math import pi
 from rectangle import Rectangle
 from coordinate import Coordinate
-from vector import Vector
-
-import adafruit_logging as logging
-logger = logging.getLogger('breakout')
 
 BALL_SIZE = 8
 COLLISION_MARGIN = 1
 
+# heading codes: 3 * (sign of x + 1) + (sign of y + 1), plus STEEP when
+# the velocity is at least as much along y as along x
+STEEP = 9
+HEADINGS = 18
+
+
+def heading_of(x, y):
+    """The heading code of a velocity with components x and y"""
+    code = 0 if x < 0 else 3 if x == 0 else 6
+    code += 0 if y < 0 else 1 if y == 0 else 2
+    if abs(y) >= abs(x):
+        code += STEEP
+    return code
+
+
 class Ball(object):
 
     def __init__(self, board, x=None, y=None, initial_velocity=None):
         self._board = board
         self._collision_bounding_box = Rectangle(0, 0, 0, 0)
+        # scratch points reused every tick; the *_position and center
+        # properties hand these back, so don't hold on to them
+        self._edge_point = Coordinate(0, 0)
+        self._center = Coordinate(0, 0)
+        self._left_cell = Coordinate(0, 0)
+        self._right_cell = Coordinate(0, 0)
+        self._top_cell = Coordinate(0, 0)
+        self._bottom_cell = Coordinate(0, 0)
         if x is None:
-            self._position  = Coordinate(board.paddle_x + (board.paddle_width // 2) - (BALL_SIZE // 2), board.scale * 3 - 1)
-            self._velocity = Vector((pi / 4) + random() * (pi / 8) - pi / 16, board.scale/2)
+            self._position  = board.physics.new_coordinate(board.paddle_x + (board.paddle_width // 2) - (BALL_SIZE // 2), board.scale * 3 - 1)
+            self._velocity = board.physics.launch_velocity(board.scale)
         else:
-            self._position = Coordinate(x, y)
+            self._position = board.physics.new_coordinate(x, y)
             self._velocity = initial_velocity
-        logger.debug('Creating ball position: %s, velocity: %s', self._position, self._velocity)
+        self.update_heading()
+
+    def update_heading(self):
+        """Classify the velocity into heading, which the collision checks
+        go by.  Done once a move, as velocity only changes in collisions."""
+        self.heading = heading_of(self._velocity.raw_x, self._velocity.raw_y)
 
     def update_bounding_box(self):
-        self._collision_bounding_box = Rectangle(self._position.y - COLLISION_MARGIN,
-                                                 self.position.x + COLLISION_MARGIN,
-                                                 self.position.y - (BALL_SIZE - 1) + COLLISION_MARGIN,
-                                                 self._position.x + (BALL_SIZE - 1) - COLLISION_MARGIN)
+        x = self._position.x
+        y = self._position.y
+        self._collision_bounding_box.set_bounds(y - (BALL_SIZE - 1) + COLLISION_MARGIN,
+                                                x + COLLISION_MARGIN,
+                                                y - COLLISION_MARGIN,
+                                                x + (BALL_SIZE - 1) - COLLISION_MARGIN)
 
     @property
     def velocity(self):
@@ -41,10 +65,14 @@ class Ball(object):
         self._velocity -= vector
 
     def move(self):
-        self._position.move_by(self._velocity)
+        if self._board.swept_collisions:
+            self._board.sweep_ball(self)
+        else:
+            self._position.move_by(self._velocity)
         self._position.clip_x(0, self._board.width - BALL_SIZE)
-        self._position.clip_y(0, self._board.height)
+        self._position.clip_y(BALL_SIZE - 1, self._board.height - 1)
         self.update_bounding_box()
+        self.update_heading()
         self._board.process_ball(self)
 
     @property
@@ -81,7 +109,7 @@ class Ball(object):
 
     @property
     def center(self):
-        return self._collision_bounding_box.center
+        return self._collision_bounding_box.center_into(self._center)
 
     @property
     def position(self):
@@ -89,21 +117,25 @@ class Ball(object):
 
     @property
     def left_cell_position(self):
-        return self._board.convert_to_tile_position(self._collision_bounding_box.middle_left)
+        point = self._collision_bounding_box.middle_left_into(self._edge_point)
+        return self._board.convert_to_tile_position(point, self._left_cell)
 
     @property
     def right_cell_position(self):
-        return self._board.convert_to_tile_position(self._collision_bounding_box.middle_right)
+        point = self._collision_bounding_box.middle_right_into(self._edge_point)
+        return self._board.convert_to_tile_position(point, self._right_cell)
 
     @property
     def top_cell_position(self):
-        return self._board.convert_to_tile_position(self._collision_bounding_box.top_center)
+        point = self._collision_bounding_box.top_center_into(self._edge_point)
+        return self._board.convert_to_tile_position(point, self._top_cell)
 
     @property
     def bottom_cell_position(self):
-        return self._board.convert_to_tile_position(self._collision_bounding_box.bottom_center)
+        point = self._collision_bounding_box.bottom_center_into(self._edge_point)
+        return self._board.convert_to_tile_position(point, self._bottom_cell)
 
-    def reflect_from_left_right(self, cell):
+    def reflect_from_side(self, cell):
         cell.reflect_off_vertical(self._velocity)
 
     def reflect_from_top_bottom(self, cell):
@@ -118,6 +150,4 @@ class Ball(object):
 
     @property
     def transferred_velocity(self):
-        angle = random() * 3.14 - 1.57
-        magnitude = random() - 0.5
-        return self.velocity + Vector(angle, magnitude)
+        return self._board.physics.transferred_velocity(self._velocity)
@@ -0,0 +1,87 @@
+"""Which balls are where, for finding the ones that might be touching.
+
+Balls are filed under the tile their collision box's centre is in, as
+singly linked lists threaded through bytearrays: the head of each tile's
+list sits in a grid the same shape as the board's, and each ball slot
+holds the slot after it.  Moving a ball only relinks it when it changes
+tile, and nothing is allocated per tick.
+"""
+
+_NONE = 0xFF
+
+
+class BallHash(object):
+
+    def __init__(self, columns, rows, scale, capacity):
+        """
+        :param columns: the board's columns, including the halo
+        :param rows: the board's rows, including the halo
+        :param scale: the number of points in a tile
+        :param capacity: the number of ball slots; at most 255
+        """
+        if capacity > _NONE:
+            raise ValueError('A BallHash holds at most {0} balls, not {1}'.format(_NONE, capacity))
+        self._columns = columns
+        self._rows = rows
+        self._scale = scale
+        self._heads = bytearray([_NONE]) * (columns * rows)
+        self._next = bytearray([_NONE]) * capacity
+        self._tiles = [-1] * capacity
+        self._near = []
+
+    def _tile_index(self, x, y):
+        column = min(max(int(x // self._scale), 0), self._columns - 1)
+        row = min(max(int(y // self._scale), 0), self._rows - 1)
+        return row * self._columns + column
+
+    def place(self, slot, x, y):
+        """File a ball under the tile (x, y) is in"""
+        tile = self._tile_index(x, y)
+        if tile == self._tiles[slot]:
+            return
+        self.remove(slot)
+        self._next[slot] = self._heads[tile]
+        self._heads[tile] = slot
+        self._tiles[slot] = tile
+
+    def remove(self, slot):
+        tile = self._tiles[slot]
+        if tile < 0:
+            return
+        previous = _NONE
+        current = self._heads[tile]
+        while current != slot:
+            previous = current
+            current = self._next[current]
+        if previous == _NONE:
+            self._heads[tile] = self._next[slot]
+        else:
+            self._next[previous] = self._next[slot]
+        self._tiles[slot] = -1
+
+    def clear(self):
+        for slot in range(len(self._tiles)):
+            self.remove(slot)
+
+    def near(self, x, y, reach):
+        """The slots of the balls filed within `reach` points of (x, y) in
+        each direction, in slot order.  The list is reused by the next
+        call."""
+        near = self._near
+        del near[:]
+        scale = self._scale
+        first_column = max(int((x - reach) // scale), 0)
+        last_column = min(int((x + reach) // scale), self._columns - 1)
+        first_row = max(int((y - reach) // scale), 0)
+        last_row = min(int((y + reach) // scale), self._rows - 1)
+        heads = self._heads
+        following = self._next
+        for row in range(first_row, last_row + 1):
+            index = row * self._columns
+            for column in range(first_column, last_column + 1):
+                slot = heads[index + column]
+                while slot != _NONE:
+                    near.append(slot)
+                    slot = following[slot]
+        near.sort()
+        return near
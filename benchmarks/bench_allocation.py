@@ -0,0 +1,78 @@
+"""Counts the geometry and cell objects created per call of the board's
+per tick methods.
+
+    python benchmarks/bench_allocation.py [ticks]
+
+CPython boxes every float, so tracemalloc can't show the device's
+behaviour; counting constructor calls can.
+"""
+
+import sys
+
+import scenario
+
+CONSTRUCTORS = {
+    ('coordinate.py', '__init__'): 'Coordinate',
+    ('rectangle.py', '__init__'): 'Rectangle',
+    ('vector.py', '__init__'): 'Vector',
+    ('vector.py', 'vector_from_components'): 'Vector',
+    ('fixed_point.py', '__init__'): 'Fixed*',
+    ('cells.py', '__init__'): 'Cell',
+}
+
+
+class ConstructorCounter(object):
+
+    def __init__(self):
+        self.counts = {}
+
+    def __call__(self, frame, event, arg):
+        if event != 'call':
+            return
+        code = frame.f_code
+        key = (code.co_filename.rsplit('/', 1)[-1], code.co_name)
+        name = CONSTRUCTORS.get(key)
+        if name is not None:
+            self.counts[name] = self.counts.get(name, 0) + 1
+
+    def __enter__(self):
+        sys.setprofile(self)
+        return self
+
+    def __exit__(self, *exc):
+        sys.setprofile(None)
+
+
+def measure(label, method_name, ticks, fixed_point):
+    board, paddle = scenario.new_game(seed=3, fixed_point=fixed_point)
+    method = getattr(board, method_name)
+    calls = 0
+    counter = ConstructorCounter()
+    for tick in range(ticks):
+        if not board.is_still_in_play:
+            if board.is_game_over:
+                break
+            board.launch()
+        scenario.sweep_paddle(paddle, tick)
+        for name in ('update_paddle', 'move_balls'):
+            if name == method_name:
+                with counter:
+                    method()
+                calls += 1
+            else:
+                getattr(board, name)()
+    created = sum(counter.counts.values())
+    detail = ', '.join('{0} {1}'.format(k, v) for k, v in sorted(counter.counts.items())) or 'none'
+    print('{0:>22}: {1:6.3f} objects/call over {2} calls ({3})'.format(label, created / float(calls), calls, detail))
+
+
+def main():
+    ticks = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    for fixed_point in (False, True):
+        suffix = ' (fixed)' if fixed_point else ''
+        measure('update_paddle' + suffix, 'update_paddle', ticks, fixed_point)
+        measure('move_balls' + suffix, 'move_balls', ticks, fixed_point)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+"""Cost of the ball-ball collision pass with many balls in play, using the
+spatial hash against checking every slot.  Boards allowing no more than
+MAX_BALLS_IN_PLAY balls check every slot themselves, so the two should
+cost the same there.
+
+    python benchmarks/bench_ball_hash.py [ticks]
+"""
+
+import random
+import sys
+import time
+
+import scenario
+from game_board import Board
+from paddle import Paddle
+from vector import Vector
+
+
+class EverySlotBoard(Board):
+    """Checks each ball against every other slot, as before the hash"""
+
+    def check_for_and_handle_ball_collision(self, ball1):
+        for ball2 in self.balls:
+            if ball2 is None or ball2 is ball1:
+                continue
+            if self.physics.handle_ball_collision(ball1, ball2):
+                return True
+        return False
+
+
+class _Timed(object):
+
+    def __init__(self, board):
+        self.total_ns = 0
+        self.calls = 0
+        check = board.check_for_and_handle_ball_collision
+
+        def timed(ball):
+            start = time.perf_counter_ns()
+            result = check(ball)
+            self.total_ns += time.perf_counter_ns() - start
+            self.calls += 1
+            return result
+
+        board.check_for_and_handle_ball_collision = timed
+
+
+def run(board_class, balls, ticks, size=16):
+    """A size x size board with no blocks, kept topped up with `balls` balls."""
+    random.seed(balls)
+    paddle = Paddle(8, field_columns=size)
+    board = board_class(8, size, size, paddle, max_balls=balls)
+    board.launch()
+    timer = _Timed(board)
+    for tick in range(ticks):
+        while board.can_launch_another_ball:
+            board.add_ball(random.randint(3, size - 1), random.randint(1, size - 2),
+                           Vector(random.uniform(0.3, 2.8), random.uniform(0.5, 2.0)))
+        scenario.sweep_paddle(paddle, tick)
+        board.update_paddle()
+        board.move_balls()
+    return timer, board.score, bytes(board.cells)
+
+
+def main():
+    ticks = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    for balls in (2, 8, 32, 64):
+        line = '{0:3d} balls:'.format(balls)
+        results = []
+        for label, board_class in (('every slot', EverySlotBoard), ('board', Board)):
+            timer, score, cells = run(board_class, balls, ticks)
+            results.append((score, cells))
+            line += ' {0} {1:6.1f} us/ball,'.format(label, timer.total_ns / timer.calls / 1000.0)
+        print(line + (' same game' if results[0] == results[1] else ' GAMES DIFFER'))
+
+
+if __name__ == '__main__':
+    main()
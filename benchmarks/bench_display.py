@@ -0,0 +1,61 @@
+"""Cost of pushing frames to NeoTrellis walls of different sizes, straight
+from the board and through a Compositor, using the stand-in trellis from
+headless/.
+
+    python benchmarks/bench_display.py [ticks]
+"""
+
+import os
+import random
+import sys
+import time
+
+import scenario
+
+sys.path.insert(0, os.path.join(scenario.ROOT, 'headless'))
+
+import neotrellis_display
+from compositor import Compositor
+from game_board import Board
+from layout import DEFAULT_LAYOUT, tile_grid
+from level_format import compile_level
+from paddle import Paddle
+
+
+def measure(label, layout, ticks, compositor=None):
+    random.seed(0)
+    paddle = Paddle(8, field_columns=layout.columns)
+    board = Board(8, layout.rows, layout.columns, paddle)
+    lines = [''.join(random.choice('  BGRS') for _ in range(layout.columns)) for _ in range(layout.rows // 2)]
+    board.load_level(compile_level(lines))
+    display = neotrellis_display.Adapter(8, layout, compositor)
+    display.update(board)
+    display.reset_counters()
+    elapsed = 0
+    for tick in range(ticks):
+        if not board.is_still_in_play:
+            if board.is_game_over:
+                board.reset_game()
+            board.launch()
+        scenario.sweep_paddle(paddle, tick)
+        board.update_paddle()
+        board.move_balls()
+        start = time.perf_counter_ns()
+        display.update(board)
+        elapsed += time.perf_counter_ns() - start
+    print('{0:>17}: {1:7.1f} us/frame, {2:5.2f} pixels, {3:5.2f} tiles shown, {4:5.2f} bus transactions per frame'.format(
+        label, elapsed / ticks / 1000.0, display.pixels_written / ticks, display.tiles_shown / ticks,
+        display.bus_transactions / ticks))
+
+
+def main():
+    ticks = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    measure('8x8', DEFAULT_LAYOUT, ticks)
+    measure('16x16', tile_grid(4, 4), ticks)
+    measure('8x32', tile_grid(2, 8), ticks)
+    measure('8x8, composited', DEFAULT_LAYOUT, ticks, Compositor(0.5))
+    measure('16x16, composited', tile_grid(4, 4), ticks, Compositor(0.5))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,48 @@
+"""Ticks per second for the float and fixed point physics paths, plus a
+digest of the fixed point game state to compare between platforms.
+
+    python benchmarks/bench_fixed_point.py [ticks]
+"""
+
+import sys
+import time
+
+import scenario
+
+
+def digest(board):
+    """FNV-1a over the grid, score and ball positions"""
+    h = 0x811C9DC5
+    values = list(board.cells) + [board.score]
+    for ball in board._balls:
+        if ball is not None:
+            values.append(ball.position.raw_x)
+            values.append(ball.position.raw_y)
+    for value in values:
+        for shift in (0, 8, 16, 24):
+            h ^= (value >> shift) & 0xFF
+            h = (h * 0x01000193) & 0xFFFFFFFF
+    return h
+
+
+def measure(label, fixed_point, ticks):
+    played = 0
+    start = time.monotonic()
+    for seed in range(5):
+        board, paddle = scenario.new_game(seed=seed, fixed_point=fixed_point)
+        played += scenario.play(board, paddle, ticks)
+    elapsed = time.monotonic() - start
+    line = '{0:>6}: {1:7d} ticks, {2:9.1f} ticks/s'.format(label, played, played / elapsed)
+    if fixed_point:
+        line += ', last game digest {0:08x}'.format(digest(board))
+    print(line)
+
+
+def main():
+    ticks = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    measure('float', False, ticks)
+    measure('fixed', True, ticks)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,128 @@
+"""Direction predicates called per tick by the collision checks, going by
+the heading code Ball works out once a move against asking the ball's
+is_heading_* properties as each check needs them.
+
+    python benchmarks/bench_heading.py [ticks]
+"""
+
+import sys
+import time
+
+import scenario
+from game_board import Board
+from paddle import Paddle
+
+
+class PredicateBoard(Board):
+    """Collision checks asking the ball which way it's heading, as before
+    heading codes"""
+
+    def check_for_and_handle_corner_collision(self, ball):
+        top = ball.top_cell_position.y
+        bottom = ball.bottom_cell_position.y
+        left = ball.left_cell_position.x
+        right = ball.right_cell_position.x
+
+        if ball.is_heading_primarily_up:
+            if ball.is_heading_left:
+                return self.vertical_hit(left, top, ball)
+            if ball.is_heading_right:
+                return self.vertical_hit(right, top, ball)
+        if ball.is_heading_primarily_down:
+            if ball.is_heading_left:
+                return self.vertical_hit(left, bottom, ball)
+            if ball.is_heading_right:
+                return self.vertical_hit(right, bottom, ball)
+        if ball.is_heading_primarily_left:
+            if ball.is_heading_up:
+                return self.horizontal_hit(left, top, ball)
+            if ball.is_heading_down:
+                return self.horizontal_hit(left, bottom, ball)
+        if ball.is_heading_primarily_right:
+            if ball.is_heading_up:
+                return self.horizontal_hit(right, top, ball)
+            if ball.is_heading_down:
+                return self.horizontal_hit(right, bottom, ball)
+        return False
+
+    def check_for_and_handle_non_corner_collision(self, ball):
+        position = ball.bottom_cell_position
+        if self._edge_hit(position.x, position.y, ball, True, not ball.is_heading_up):
+            return True
+        position = ball.top_cell_position
+        if self._edge_hit(position.x, position.y, ball, True, not ball.is_heading_down):
+            return True
+        position = ball.left_cell_position
+        if self._edge_hit(position.x, position.y, ball, False, not ball.is_heading_right):
+            return True
+        position = ball.right_cell_position
+        if self._edge_hit(position.x, position.y, ball, False, not ball.is_heading_left):
+            return True
+        return False
+
+    def _edge_hit(self, column, row, ball, horizontal, heading_towards):
+        cell = self.cell_at(column, row)
+        if not (cell.is_horizontal if horizontal else cell.is_vertical):
+            return False
+        if not cell.is_hit_by(ball, column, row):
+            return False
+        if not heading_towards:
+            return False
+        cell.process_hit(ball, column, row)
+        if horizontal:
+            ball.reflect_from_top_bottom(cell)
+        else:
+            ball.reflect_from_side(cell)
+        return True
+
+
+class _PredicateCounter(object):
+    """Counts calls of the heading predicates and heading_of"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, frame, event, arg):
+        if event == 'call':
+            name = frame.f_code.co_name
+            if name.startswith('is_heading') or name == 'heading_of':
+                self.calls += 1
+
+
+def new_game(board_class):
+    """scenario.new_game(seed=4) on a board_class board"""
+    paddle = Paddle(8)
+    board = board_class(8, 8, 8, paddle, seed=5)
+    board.reset_game()
+    board.set_up_level(0)
+    board.launch()
+    return board, paddle
+
+
+def run(board_class, ticks):
+    board, paddle = new_game(board_class)
+    counter = _PredicateCounter()
+    sys.setprofile(counter)
+    played = scenario.play(board, paddle, ticks)
+    sys.setprofile(None)
+
+    timed_board, timed_paddle = new_game(board_class)
+    start = time.perf_counter_ns()
+    scenario.play(timed_board, timed_paddle, ticks)
+    elapsed = time.perf_counter_ns() - start
+    return played, counter.calls, elapsed, (board.score, bytes(board.cells))
+
+
+def main():
+    ticks = int(sys.argv[1]) if len(sys.argv) > 1 else 3000
+    results = []
+    for label, board_class in (('is_heading_*', PredicateBoard), ('heading code', Board)):
+        played, calls, elapsed, outcome = run(board_class, ticks)
+        results.append(outcome)
+        print('{0:>13}: {1:6.2f} predicate calls/tick, {2:6.1f} us/tick over {3} ticks'.format(
+            label, calls / float(played), elapsed / 1000.0 / played, played))
+    print('same game' if results[0] == results[1] else 'GAMES DIFFER')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+"""How far the paddle goes for a spin of the encoder, and then a moment
+after it, taking the detents turned since the last tick against only
+asking which way it moved, and what a sample costs.
+
+    python benchmarks/bench_input.py [ticks]
+"""
+
+import sys
+import time
+
+import scenario
+from input_sampler import InputSampler
+from paddle import Paddle, POINTS_PER_STEP
+
+INPUT_HZ = 100
+PHYSICS_HZ = 30
+FIELD_COLUMNS = 256         # wide enough that the paddle doesn't reach the edge
+
+
+class _Encoder(object):
+    """Turns `rate` detents a second, read at INPUT_HZ, for `turning` reads"""
+
+    def __init__(self, rate, turning):
+        self._rate = rate
+        self._turning = turning
+        self.reads = 0
+
+    @property
+    def position(self):
+        position = min(self.reads, self._turning) * self._rate // INPUT_HZ
+        self.reads += 1
+        return position
+
+
+class _Button(object):
+    fell = False
+    rose = False
+
+    def update(self):
+        pass
+
+
+def spin(rate, ticks, sampled):
+    """Points the paddle moves while the encoder turns at rate for ticks
+    and then stays still for as long again, and the detents turned"""
+    turning = ticks * INPUT_HZ // PHYSICS_HZ
+    encoder = _Encoder(rate, turning)
+    sampler = InputSampler(encoder, _Button())
+    paddle = Paddle(8, field_columns=FIELD_COLUMNS)
+    start = paddle.position.x
+    last_position = 0
+    samples = 0
+    for tick in range(2 * ticks):
+        direction = 0
+        while samples * PHYSICS_HZ < (tick + 1) * INPUT_HZ:
+            if sampled:
+                sampler.sample()
+            else:
+                position = encoder.position
+                if position != last_position:
+                    direction = 1 if position > last_position else -1
+                last_position = position
+            samples += 1
+        if sampled:
+            paddle.move(sampler.take_steps())
+        elif direction > 0:
+            paddle.move_right()
+        else:
+            paddle.stop()
+    return start - paddle.position.x, turning * rate // INPUT_HZ
+
+
+def sample_ns(samples):
+    sampler = InputSampler(_Encoder(30, samples), _Button())
+    start = time.perf_counter_ns()
+    for _ in range(samples):
+        sampler.sample()
+    return (time.perf_counter_ns() - start) / float(samples)
+
+
+def main():
+    ticks = int(sys.argv[1]) if len(sys.argv) > 1 else 30
+    for rate in (10, 30, 60, 120, 240):
+        turned = spin(rate, ticks, True)[1]
+        line = '{0:4d} detents/s, {1:3d} turned:'.format(rate, turned)
+        for label, sampled in (('direction', False), ('steps', True)):
+            moved = spin(rate, ticks, sampled)[0]
+            line += ' {0} {1:6.1f} points ({2:3.0f}%)'.format(label, moved, 100.0 * moved / (turned * POINTS_PER_STEP))
+        print(line)
+    print('sample: {0:.0f} ns'.format(sample_ns(100000)))
+
+
+if __name__ == '__main__':
+    main()
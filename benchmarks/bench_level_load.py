@@ -0,0 +1,58 @@
+"""Time taken to load a level by parsing its strings, as Board used to,
+and by copying in the compiled form.
+
+    python benchmarks/bench_level_load.py [repeats]
+"""
+
+import random
+import sys
+import time
+
+import scenario
+from cells import block_code_for
+from game_board import Board
+from level_format import compile_level
+from levels import levels
+from paddle import Paddle
+
+
+def parse_level(board, lines):
+    """Board.set_up_level before levels were compiled"""
+    row = board.rows - 2
+    for line in lines:
+        for column in range(1, board.columns - 1):
+            board.set_code_at(column, row, block_code_for(line[column - 1]))
+        row -= 1
+
+
+def random_level(size):
+    random.seed(size)
+    return [''.join(random.choice(' BGRSo') for _ in range(size)) for _ in range(size - 1)]
+
+
+def measure(label, size, lines, repeats):
+    board = Board(8, size, size, Paddle(8, field_columns=size))
+    data = compile_level(lines)
+    start = time.perf_counter_ns()
+    for _ in range(repeats):
+        parse_level(board, lines)
+    parsed = bytes(board.cells)
+    parse_us = (time.perf_counter_ns() - start) / repeats / 1000.0
+    start = time.perf_counter_ns()
+    for _ in range(repeats):
+        board.load_level(data)
+    load_us = (time.perf_counter_ns() - start) / repeats / 1000.0
+    same = 'same grid' if bytes(board.cells) == parsed else 'GRIDS DIFFER'
+    print('{0:>8}: parse {1:9.1f} us, load compiled {2:7.1f} us, {3} bytes, {4}'.format(
+        label, parse_us, load_us, len(data), same))
+
+
+def main():
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    measure('level 1', 8, levels[0], repeats)
+    for size in (16, 32, 64):
+        measure('{0}x{0}'.format(size), size, random_level(size), repeats)
+
+
+if __name__ == '__main__':
+    main()
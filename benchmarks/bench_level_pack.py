@@ -0,0 +1,72 @@
+"""Opening a large level pack and loading levels from it, memory mapped and
+read with seek/readinto, cold and from the cache.
+
+    python benchmarks/bench_level_pack.py [levels]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+import scenario
+from game_board import Board
+from level_format import compile_level
+from level_pack import LevelPack, write_pack
+from paddle import Paddle
+
+
+def random_levels(count):
+    random.seed(count)
+    return [compile_level([''.join(random.choice('   BGRSo') for _ in range(8)) for _ in range(7)])
+            for _ in range(count)]
+
+
+def measure(label, path, compiled, memory_map):
+    start = time.perf_counter_ns()
+    pack = LevelPack(path, memory_map=memory_map)
+    open_us = (time.perf_counter_ns() - start) / 1000.0
+    board = Board(8, 8, 8, Paddle(8), level_pack=pack)
+
+    start = time.perf_counter_ns()
+    for number in range(len(pack)):
+        board.set_up_level(number)
+    cold_us = (time.perf_counter_ns() - start) / len(pack) / 1000.0
+
+    # the next level is read between launches, so only the load counts
+    elapsed = 0
+    for number in range(len(pack)):
+        start = time.perf_counter_ns()
+        board.set_up_level(number)
+        elapsed += time.perf_counter_ns() - start
+        pack.service()
+    prefetched_us = elapsed / len(pack) / 1000.0
+
+    start = time.perf_counter_ns()
+    for _ in range(len(pack)):
+        board.set_up_level(0)
+    cached_us = (time.perf_counter_ns() - start) / len(pack) / 1000.0
+
+    correct = all(pack.level(number) == compiled[number] for number in range(len(pack)))
+    pack.close()
+    print('{0:>10}: open {1:7.1f} us, level cold {2:5.1f} us, prefetched {3:5.1f} us, cached {4:5.1f} us, {5}'.format(
+        label, open_us, cold_us, prefetched_us, cached_us, 'levels match' if correct else 'LEVELS DIFFER'))
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    compiled = random_levels(count)
+    handle, path = tempfile.mkstemp(suffix='.pack')
+    os.close(handle)
+    try:
+        write_pack(path, compiled)
+        print('{0} levels, {1} bytes'.format(count, os.path.getsize(path)))
+        measure('mmap', path, compiled, True)
+        measure('readinto', path, compiled, False)
+    finally:
+        os.remove(path)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+"""Check NumpyEngine against Board on the standard games, then measure how
+many ball-ticks a second it manages with many balls in play.
+
+    python benchmarks/bench_numpy_engine.py [ticks]
+"""
+
+import random
+import sys
+import time
+
+import numpy as np
+
+import scenario
+from cells import BLUE_BLOCK, RED_BLOCK, GREEN_BLOCK, SOLID_BLOCK, BALL_BLOCK
+from game_board import Board
+from numpy_engine import NumpyEngine
+from paddle import Paddle
+
+
+def board_state(board):
+    balls = tuple((ball.position.raw_x, ball.position.raw_y, ball.velocity.x, ball.velocity.y)
+                  for ball in board.balls if ball is not None)
+    return bytes(board.cells), board.score, board.balls_remaining, balls
+
+
+def engine_state(engine):
+    balls = tuple((float(engine.x[slot]), float(engine.y[slot]), float(engine.vx[slot]), float(engine.vy[slot]))
+                  for slot in np.flatnonzero(engine.active))
+    return engine.grid.tobytes(), engine.score, engine.balls_remaining, balls
+
+
+def record(game, state, paddle, ticks):
+    states = []
+    for tick in range(ticks):
+        if not game.is_still_in_play:
+            if game.is_game_over:
+                break
+            game.launch()
+        scenario.sweep_paddle(paddle, tick)
+        game.update_paddle()
+        game.move_balls()
+        states.append(state(game))
+    return states
+
+
+def new_game(seed, ball_blocks):
+    board, paddle = scenario.new_game(seed=seed)
+    if ball_blocks:
+        # so that two balls are in play for much of the game
+        for column in (2, 4, 7):
+            board.set_code_at(column, 4, BALL_BLOCK)
+            board.set_code_at(column, 6, BALL_BLOCK)
+    return board, paddle
+
+
+def check_parity(ticks):
+    for ball_blocks in (False, True):
+        for seed in range(5):
+            board, paddle = new_game(seed, ball_blocks)
+            expected = record(board, board_state, paddle, ticks)
+            board, paddle = new_game(seed, ball_blocks)
+            actual = record(NumpyEngine(board), engine_state, paddle, ticks)
+            mismatch = next((tick for tick, (a, b) in enumerate(zip(expected, actual)) if a != b), None)
+            label = 'seed {0}{1}'.format(seed, ' with ball blocks' if ball_blocks else '')
+            if mismatch is None and len(expected) == len(actual):
+                print('{0}: identical for {1} ticks, score {2}'.format(label, len(expected), expected[-1][1]))
+            else:
+                print('{0}: differs from tick {1}'.format(label, mismatch))
+
+
+def stress_engine(balls, ticks, size=32):
+    """A size x size board, three quarters full of blocks, kept topped up
+    with `balls` balls."""
+    random.seed(balls)
+    board = Board(8, size, size, Paddle(8, field_columns=size))
+    for row in range(size // 4 + 2, size + 1):
+        for column in range(1, size + 1):
+            board.set_code_at(column, row, random.choice((BLUE_BLOCK, RED_BLOCK, GREEN_BLOCK, SOLID_BLOCK)))
+    engine = NumpyEngine(board, capacity=balls)
+    engine.ball_ticks = 0
+    start = time.monotonic()
+    for tick in range(ticks):
+        while engine.can_launch_another_ball:
+            engine.add_ball(random.uniform(8, board.width - 16), random.uniform(24, size * 2),
+                            random.uniform(-2.0, 2.0), random.uniform(0.5, 2.0))
+        engine.move_balls()
+    elapsed = time.monotonic() - start
+    return engine.ball_ticks / elapsed
+
+
+def stress_board(ticks):
+    played = 0
+    start = time.monotonic()
+    for seed in range(5):
+        board, paddle = scenario.new_game(seed=seed)
+        played += scenario.play(board, paddle, ticks)
+    return played / (time.monotonic() - start)
+
+
+def main():
+    ticks = int(sys.argv[1]) if len(sys.argv) > 1 else 3000
+    check_parity(ticks)
+    print('Board, one ball: {0:10.0f} ball-ticks/s'.format(stress_board(ticks)))
+    for balls in (16, 128, 1024):
+        print('NumpyEngine, {0:4d} balls: {1:10.0f} ball-ticks/s'.format(balls, stress_engine(balls, ticks // 10)))
+
+
+if __name__ == '__main__':
+    main()
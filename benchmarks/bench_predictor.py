@@ -0,0 +1,93 @@
+"""The landing predictor against stepping a board forward: how far off its
+predictions are by how far ahead they look, what a prediction costs, and
+what a tick of the board it would otherwise take costs.  The autopilot
+plays, so this is also a check that it keeps the ball in play.
+
+    python benchmarks/bench_predictor.py [ticks]
+"""
+
+import sys
+import time
+
+import scenario
+from predictor import LandingPredictor, Autopilot
+from paddle import Paddle
+from game_board import Board
+
+RANGES = ((0, 10), (10, 40), (40, 1000))
+
+
+def new_game(fixed_point):
+    paddle = Paddle(8)
+    board = Board(8, 8, 8, paddle, fixed_point=fixed_point, seed=7)
+    board.reset_game()
+    board.set_up_level(0)
+    board.launch()
+    return board, paddle
+
+
+def accuracy(fixed_point, ticks):
+    """Errors in points of every prediction made, with how many ticks
+    ahead it looked, checked against where the ball was when the paddle
+    sent it back; the balls lost; the ticks played; and the time taken by
+    the predictions"""
+    board, paddle = new_game(fixed_point)
+    pilot = Autopilot(board, paddle)
+    predictor = LandingPredictor(board)
+    pending = []
+    errors = []
+    add_velocity_to = paddle.add_velocity_to
+
+    def landed(v):
+        x = board.balls[0].center.x
+        for ahead, predicted in pending:
+            errors.append((ahead, abs(predicted - x)))
+        del pending[:]
+        add_velocity_to(v)
+    paddle.add_velocity_to = landed
+
+    lost = 0
+    elapsed = 0
+    for tick in range(ticks):
+        if not board.is_still_in_play:
+            if board.is_game_over:
+                return errors, lost, tick, elapsed
+            lost += 1
+            del pending[:]
+            board.launch()
+        start = time.perf_counter_ns()
+        x = predictor.predict(board.balls[0])
+        elapsed += time.perf_counter_ns() - start
+        if x is not None:
+            pending.append((predictor.ticks, x))
+        paddle.move(pilot.steps())
+        board.update_paddle()
+        board.move_balls()
+    return errors, lost, ticks, elapsed
+
+
+def tick_ns(fixed_point, ticks):
+    board, paddle = new_game(fixed_point)
+    start = time.perf_counter_ns()
+    played = scenario.play(board, paddle, ticks)
+    return (time.perf_counter_ns() - start) / float(played)
+
+
+def main():
+    ticks = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    for label, fixed_point in (('float', False), ('fixed', True)):
+        errors, lost, played, elapsed = accuracy(fixed_point, ticks)
+        line = '{0}: {1} ticks, {2} balls lost, mean error'.format(label, played, lost)
+        for low, high in RANGES:
+            found = [error for ahead, error in errors if low <= ahead < high]
+            mean = sum(found) / len(found) if found else 0.0
+            line += ' {0:.2f} points {1}-{2} ticks ahead,'.format(mean, low, high)
+        print(line.rstrip(','))
+        ahead = sum(ahead for ahead, _ in errors) / len(errors)
+        tick = tick_ns(fixed_point, ticks)
+        print('    predicting {0:.1f} us, {1:.0f} ticks ahead on average; stepping the board that far {2:.1f} us'.format(
+            elapsed / 1000.0 / played, ahead, tick * ahead / 1000.0))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+"""Tunnelling and cost of the sampled and swept collision paths at
+increasing ball speeds.
+
+    python benchmarks/bench_sweep.py [games]
+
+A tunnelling event is a tick that ends with the ball's box overlapping a
+block, i.e. the ball got inside something it should have bounced off.
+"""
+
+import sys
+import time
+
+import scenario
+from cells import BLOCK_CODES
+
+BLOCKS = set(BLOCK_CODES.values())
+
+
+def _inside_a_block(board, ball):
+    box = ball.bounding_box
+    for column in range(board.columns):
+        for row in range(board.rows):
+            code = board.code_at(column, row)
+            if code in BLOCKS and box.collides_with(board.cell_type(code).bounding_box_at(column, row)):
+                return True
+    return False
+
+
+def measure(swept, speed, games):
+    ticks = 0
+    tunnelled = 0
+    elapsed = 0.0
+    for seed in range(games):
+        board, paddle = scenario.new_game(seed=seed, swept_collisions=swept)
+        ball = board._balls[0]
+        for _ in range(200):
+            if not board.is_still_in_play:
+                break
+            ball.velocity.magnitude = speed
+            start = time.perf_counter()
+            board.move_balls()
+            elapsed += time.perf_counter() - start
+            ticks += 1
+            if board.is_still_in_play and _inside_a_block(board, ball):
+                tunnelled += 1
+    print('{0:>7} speed {1:4.1f}: {2:5d} ticks, {3:4d} tunnelled, {4:8.1f} us/tick'.format(
+        'swept' if swept else 'sampled', speed, ticks, tunnelled, elapsed / ticks * 1e6))
+
+
+def main():
+    games = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    for speed in (2.0, 4.0, 8.0, 16.0):
+        for swept in (False, True):
+            measure(swept, speed, games)
+
+
+if __name__ == '__main__':
+    main()
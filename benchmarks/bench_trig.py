@@ -0,0 +1,78 @@
+"""Vector's trig with the math module against the 512 step tables: the
+worst error seen against the bounds vector.py gives, the cost of a call,
+and whole games.
+
+    python benchmarks/bench_trig.py [ticks]
+"""
+
+import math
+import random
+import sys
+import time
+
+import scenario
+import vector
+
+SAMPLES = 100000
+
+
+def worst_errors():
+    random.seed(0)
+    sine = cosine = arctangent = 0.0
+    for _ in range(SAMPLES):
+        a = random.uniform(-2 * math.pi, 2 * math.pi)
+        sine = max(sine, abs(vector.quantized_sin(a) - math.sin(a)))
+        cosine = max(cosine, abs(vector.quantized_cos(a) - math.cos(a)))
+        x = random.uniform(-3.0, 3.0)
+        y = random.uniform(-3.0, 3.0)
+        error = abs(vector.quantized_atan2(y, x) - math.atan2(y, x))
+        arctangent = max(arctangent, min(error, 2 * math.pi - error))
+    return sine, cosine, arctangent
+
+
+def per_call_ns(function, args):
+    start = time.perf_counter_ns()
+    for a in args:
+        function(*a)
+    return (time.perf_counter_ns() - start) / float(len(args))
+
+
+def play(quantized, ticks):
+    vector.use_quantized_angles(quantized)
+    try:
+        board, paddle = scenario.new_game(seed=4)
+        start = time.perf_counter()
+        played = scenario.play(board, paddle, ticks)
+        elapsed = time.perf_counter() - start
+    finally:
+        vector.use_quantized_angles(False)
+    return played, elapsed, board.score
+
+
+def main():
+    ticks = int(sys.argv[1]) if len(sys.argv) > 1 else 3000
+    sine, cosine, arctangent = worst_errors()
+    step = vector.STEPS_TO_RADIANS
+    print('worst error: sin {0:.5f}, cos {1:.5f} (bound {2:.5f}); atan2 {3:.5f} (bound {4:.5f})'.format(
+        sine, cosine, step / 2, arctangent, 2 * step / 3))
+    ok = max(sine, cosine) <= step / 2 and arctangent <= 2 * step / 3
+
+    random.seed(1)
+    angles = [(random.uniform(0.0, 2 * math.pi),) for _ in range(SAMPLES)]
+    points = [(random.uniform(-3.0, 3.0), random.uniform(-3.0, 3.0)) for _ in range(SAMPLES)]
+    for label, exact, quantized, args in (('sin', math.sin, vector.quantized_sin, angles),
+                                          ('cos', math.cos, vector.quantized_cos, angles),
+                                          ('atan2', math.atan2, vector.quantized_atan2, points)):
+        print('{0:>6}: math {1:6.1f} ns, tables {2:6.1f} ns'.format(
+            label, per_call_ns(exact, args), per_call_ns(quantized, args)))
+
+    for label, quantized in (('math', False), ('tables', True)):
+        played, elapsed, score = play(quantized, ticks)
+        print('{0:>6} game: {1} ticks, score {2}, {3:8.1f} ticks/s'.format(label, played, score, played / elapsed))
+    if not ok:
+        print('ERROR BOUNDS EXCEEDED')
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,220 @@
+"""Counts the trig and square root calls Vector makes per game tick, for
+the Cartesian Vector and for the original polar (angle, magnitude) form.
+
+    python benchmarks/bench_vector.py [ticks]
+"""
+
+import sys
+import time
+from math import pi
+
+import scenario
+import coordinate
+import paddle
+import physics
+import vector
+
+TRIG_FUNCTIONS = ('sin', 'cos', 'atan2', 'sqrt')
+
+
+class _PolarVector(object):
+    """The polar Vector this module replaced, kept as the 'before' case."""
+
+    def __init__(self, angle, magnitude):
+        self._angle = angle
+        self._magnitude = magnitude
+
+    @property
+    def x(self):
+        return self._magnitude * vector.cos(self._angle)
+
+    @property
+    def y(self):
+        return self._magnitude * vector.sin(self._angle)
+
+    raw_x = x
+    raw_y = y
+
+    @property
+    def angle(self):
+        return self._angle
+
+    @angle.setter
+    def angle(self, new_angle):
+        self._angle = new_angle
+
+    @property
+    def magnitude(self):
+        return self._magnitude
+
+    @magnitude.setter
+    def magnitude(self, new_magnitude):
+        self._magnitude = new_magnitude
+
+    def normalize_angle(self):
+        while self._angle > 2 * pi:
+            self._angle -= 2 * pi
+        while self._angle < 0.0:
+            self._angle += 2 * pi
+
+    def flip_x(self):
+        self.normalize_angle()
+        offset = 2 * pi if self._angle > pi else 0.0
+        self._angle = offset + pi - self._angle
+
+    def flip_y(self):
+        self.normalize_angle()
+        self._angle = (2 * pi) - self._angle
+
+    def _set(self, cx, cy):
+        self._angle = vector.atan2(cy, cx)
+        self._magnitude = vector.sqrt(cx * cx + cy * cy)
+
+    def __iadd__(self, o):
+        self._set(self.x + o.x, self.y + o.y)
+        return self
+
+    def __add__(self, o):
+        s = _PolarVector(self._angle, self._magnitude)
+        s += o
+        return s
+
+    def __isub__(self, o):
+        self._set(self.x - o.x, self.y - o.y)
+        return self
+
+    def __sub__(self, o):
+        s = _PolarVector(self._angle, self._magnitude)
+        s -= o
+        return s
+
+    def __mul__(self, scale):
+        return _PolarVector(self._angle, self._magnitude * scale)
+
+    def dot(self, o):
+        return self.x * o.x + self.y * o.y
+
+    def normalize(self):
+        self._magnitude = 1.0
+
+    def clip_magnitude_at(self, high):
+        self._magnitude = min(self._magnitude, high)
+
+    def clip_magnitude_between(self, low, high):
+        self._magnitude = min(max(self._magnitude, low), high)
+
+    def clip_angle_between(self, low, high):
+        self._angle = min(max(self._angle, low), high)
+
+    @property
+    def is_left(self):
+        self.normalize_angle()
+        return 0.5 * pi < self._angle < 1.5 * pi
+
+    @property
+    def is_right(self):
+        self.normalize_angle()
+        return self._angle > 1.5 * pi or self._angle < 0.5 * pi
+
+    @property
+    def is_down(self):
+        self.normalize_angle()
+        return self._angle < pi
+
+    @property
+    def is_up(self):
+        self.normalize_angle()
+        return self._angle > pi
+
+    @property
+    def is_primarily_right(self):
+        self.normalize_angle()
+        return self._angle <= 0.25 * pi or self._angle >= 1.75 * pi
+
+    @property
+    def is_primarily_up(self):
+        self.normalize_angle()
+        return 1.25 * pi <= self._angle <= 1.75 * pi
+
+    @property
+    def is_primarily_left(self):
+        self.normalize_angle()
+        return 0.75 * pi <= self._angle <= 1.25 * pi
+
+    @property
+    def is_primarily_down(self):
+        self.normalize_angle()
+        return 0.25 * pi <= self._angle <= 0.75 * pi
+
+    def is_in_the_same_direction_as(self, v):
+        return self.dot(v) > 0.0
+
+
+def _polar_from_components(x, y):
+    return _PolarVector(vector.atan2(y, x), vector.sqrt(x * x + y * y))
+
+
+class _TrigCounter(object):
+    """Replaces the math functions vector.py uses with counting wrappers."""
+
+    def __init__(self):
+        self.counts = dict((name, 0) for name in TRIG_FUNCTIONS)
+        self._originals = {}
+
+    def __enter__(self):
+        for name in TRIG_FUNCTIONS:
+            original = getattr(vector, name)
+            self._originals[name] = original
+            setattr(vector, name, self._counting(name, original))
+        return self
+
+    def _counting(self, name, original):
+        counts = self.counts
+
+        def counted(*args):
+            counts[name] += 1
+            return original(*args)
+        return counted
+
+    def __exit__(self, *exc):
+        for name, original in self._originals.items():
+            setattr(vector, name, original)
+
+    @property
+    def total(self):
+        return sum(self.counts.values())
+
+
+def _use_vector_class(cls, from_components):
+    for module in (physics, paddle):
+        module.Vector = cls
+    for module in (coordinate, physics):
+        module.vector_from_components = from_components
+
+
+def measure(label, ticks):
+    board, the_paddle = scenario.new_game(seed=1)
+    with _TrigCounter() as counter:
+        start = time.perf_counter()
+        played = scenario.play(board, the_paddle, ticks)
+        elapsed = time.perf_counter() - start
+    per_tick = dict((name, counter.counts[name] / float(played)) for name in TRIG_FUNCTIONS)
+    print('{0:>10}: {1:6.2f} trig calls/tick ({2}), {3:8.1f} ticks/s'.format(
+        label, counter.total / float(played),
+        ', '.join('{0} {1:.2f}'.format(name, per_tick[name]) for name in TRIG_FUNCTIONS),
+        played / elapsed))
+
+
+def main():
+    ticks = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    original = (physics.Vector, physics.vector_from_components)
+    try:
+        _use_vector_class(_PolarVector, _polar_from_components)
+        measure('polar', ticks)
+    finally:
+        _use_vector_class(*original)
+    measure('cartesian', ticks)
+
+
+if __name__ == '__main__':
+    main()
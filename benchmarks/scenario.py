@@ -0,0 +1,49 @@
+"""Fixed game scenarios shared by the benchmarks.
+
+Run the benchmarks from the repository root, e.g.
+
+    python benchmarks/bench_vector.py
+"""
+
+import os
+import random
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from paddle import Paddle
+from game_board import Board
+
+
+def new_game(seed=0, level=0, fixed_point=False, swept_collisions=False):
+    """A standard 8x8 board with the level loaded and a ball launched."""
+    random.seed(seed)
+    paddle = Paddle(8)
+    board = Board(8, 8, 8, paddle, fixed_point=fixed_point, seed=seed + 1, swept_collisions=swept_collisions)
+    board.reset_game()
+    board.set_up_level(level)
+    board.launch()
+    return board, paddle
+
+
+def sweep_paddle(paddle, tick):
+    """Move the paddle back and forth across the field."""
+    if (tick // 12) % 2 == 0:
+        paddle.move_right()
+    else:
+        paddle.move_left()
+
+
+def play(board, paddle, ticks, relaunch=True):
+    """Run `ticks` game ticks, relaunching whenever the ball is lost."""
+    for tick in range(ticks):
+        if not board.is_still_in_play:
+            if not relaunch or board.is_game_over:
+                return tick
+            board.launch()
+        sweep_paddle(paddle, tick)
+        board.update_paddle()
+        board.move_balls()
+    return ticks
@@ -0,0 +1,260 @@
+"""The game's hot paths on fixed scenarios, compared against stored
+baselines.
+
+    python benchmarks/suite.py              # compare with baseline.json
+    python benchmarks/suite.py --save       # make this run the baseline
+
+Each benchmark reports operations a second (the median of several runs)
+and the geometry and cell objects created per operation.  A benchmark is
+flagged when it is slower than its baseline by more than the threshold, or
+creates any more objects per operation.  One slow measurement is usually
+the machine being busy, so a benchmark that looks slower is timed again up
+to RECHECKS times and only flagged if it stays slower every time.  The
+exit status is 1 if anything was flagged.  Timings only mean anything
+against a baseline saved on the same machine.
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+
+import scenario
+
+sys.path.insert(0, os.path.join(scenario.ROOT, 'headless'))
+
+import neotrellis_display
+from ball import Ball
+from bench_allocation import ConstructorCounter
+from cells import BALL, EMPTY, GREEN_BLOCK, SOLID_BLOCK
+from game_board import Board
+from paddle import Paddle
+from vector import vector_from_components
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+RUNS = 7
+RECHECKS = 3
+RUN_NS = 100000000
+COUNTED_OPERATIONS = 200
+
+
+def _empty_board():
+    paddle = Paddle(8)
+    board = Board(8, 8, 8, paddle, seed=3)
+    board.reset_game()
+    board.clear_balls()
+    return board, paddle
+
+
+def _ball(board, x, y):
+    ball = Ball(board, x, y, vector_from_components(0.0, 0.0))
+    ball.update_bounding_box()
+    board.add_and_enable_ball(ball)
+    return ball
+
+
+def move_balls():
+    board, paddle = scenario.new_game(seed=3)
+
+    def operation():
+        if not board.is_still_in_play:
+            if board.is_game_over:
+                board.reset_game()
+                board.set_up_level(0)
+            board.launch()
+        board.move_balls()
+    return operation
+
+
+def collision(x, y, vx, vy, blocks=(), other_ball=None):
+    """check_for_and_handle_collision for one ball put at (x, y) moving at
+    (vx, vy) each time, with the given (column, row, code) cells and
+    perhaps another ball at other_ball"""
+    def setup():
+        board, paddle = _empty_board()
+        for column, row, code in blocks:
+            board.set_code_at(column, row, code)
+        other = _ball(board, other_ball[0], other_ball[1]) if other_ball else None
+        ball = _ball(board, x, y)
+        # as in move_balls, the ball being checked has left its cell
+        if board.code_at(x // board.scale, y // board.scale) == BALL:
+            board.set_code_at(x // board.scale, y // board.scale, EMPTY)
+
+        def operation():
+            ball.position.set(x, y)
+            ball.velocity.set_components(vx, vy)
+            ball.update_bounding_box()
+            ball.update_heading()
+            if other is not None:
+                other.velocity.set_components(-vx, -vy)
+            board.check_for_and_handle_collision(ball)
+        return operation
+    return setup
+
+
+def update_paddle():
+    board, paddle = _empty_board()
+    tick = [0]
+
+    def operation():
+        scenario.sweep_paddle(paddle, tick[0])
+        tick[0] += 1
+        board.update_paddle()
+    return operation
+
+
+def set_up_level():
+    board, paddle = _empty_board()
+
+    def operation():
+        board.set_up_level(0)
+    return operation
+
+
+def display_update():
+    board, paddle = scenario.new_game(seed=3)
+    display = neotrellis_display.Adapter(8)
+    display.update(board)
+    tick = [0]
+
+    def operation():
+        # a block and the ball's cell change every frame
+        tick[0] += 1
+        board.set_code_at(1 + tick[0] % 8, 5, GREEN_BLOCK if tick[0] % 2 else EMPTY)
+        board.set_code_at(1 + (tick[0] * 3) % 8, 3, BALL if tick[0] % 2 else EMPTY)
+        display.update(board)
+    return operation
+
+
+def game_tick():
+    state = {'tick': 0}
+    state['board'], state['paddle'] = scenario.new_game(seed=3)
+
+    def operation():
+        board = state['board']
+        if not board.is_still_in_play:
+            if board.is_game_over:
+                state['board'], state['paddle'] = scenario.new_game(seed=3)
+                board = state['board']
+            else:
+                board.launch()
+        scenario.sweep_paddle(state['paddle'], state['tick'])
+        state['tick'] += 1
+        board.update_paddle()
+        board.move_balls()
+    return operation
+
+
+BENCHMARKS = [
+    ('move_balls', move_balls),
+    ('collision: none', collision(36, 47, 1.0, 1.0)),
+    ('collision: ball', collision(36, 47, 1.0, 0.0, other_ball=(40, 47))),
+    ('collision: bottom', collision(36, 41, 0.5, 1.5, blocks=[(4, 5, SOLID_BLOCK)])),
+    ('collision: top', collision(36, 20, 0.5, -1.5)),
+    ('collision: left', collision(6, 47, -1.5, 0.5)),
+    ('collision: right', collision(67, 47, 1.5, 0.5)),
+    ('collision: corner', collision(34, 41, 1.2, 1.0, blocks=[(5, 5, SOLID_BLOCK)])),
+    ('update_paddle', update_paddle),
+    ('set_up_level', set_up_level),
+    ('Adapter.update', display_update),
+    ('game tick', game_tick),
+]
+
+
+def _time(operation, operations):
+    start = time.process_time_ns()
+    for _ in range(operations):
+        operation()
+    return time.process_time_ns() - start
+
+
+def ops_per_second(setup):
+    """The median of RUNS runs of at least RUN_NS each.  The best run
+    depends too much on catching the machine at a quiet moment to make a
+    baseline of."""
+    operations = 100
+    while _time(setup(), operations) < RUN_NS:
+        operations *= 2
+    times = sorted(_time(setup(), operations) for _ in range(RUNS))
+    return operations * 1e9 / times[RUNS // 2]
+
+
+def run_benchmark(setup):
+    """Ops/sec and objects created per operation"""
+    ops = ops_per_second(setup)
+    operation = setup()
+    counter = ConstructorCounter()
+    with counter:
+        for _ in range(COUNTED_OPERATIONS):
+            operation()
+    return {
+        'ops_per_second': ops,
+        'objects_per_op': sum(counter.counts.values()) / float(COUNTED_OPERATIONS),
+    }
+
+
+def machine():
+    return '{0} {1} {2}'.format(platform.python_implementation(), platform.python_version(), platform.machine())
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the hot paths against stored baselines')
+    parser.add_argument('--save', action='store_true', help='store this run as the baseline')
+    parser.add_argument('--threshold', type=float, default=25.0,
+                        help='percent slower that counts as a regression; timings on one machine vary by 15% or so')
+    parser.add_argument('--baseline', default=BASELINE)
+    parser.add_argument('--only', help='only run benchmarks whose names contain this')
+    args = parser.parse_args()
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline.get('machine') != machine():
+            print('Baseline is from {0}, this is {1}; timings may not compare'.format(baseline.get('machine'), machine()))
+    reference = baseline.get('results', {})
+
+    results = {}
+    regressions = 0
+    print('{0:>18} {1:>12} {2:>12} {3:>8} {4:>10}'.format('', 'ops/s', 'baseline', 'change', 'objects/op'))
+    for name, setup in BENCHMARKS:
+        if args.only and args.only not in name:
+            continue
+        result = run_benchmark(setup)
+        results[name] = result
+        before = reference.get(name)
+        if before is not None:
+            for _ in range(RECHECKS):
+                if result['ops_per_second'] >= before['ops_per_second'] * (1.0 - args.threshold / 100.0):
+                    break
+                result['ops_per_second'] = max(result['ops_per_second'], ops_per_second(setup))
+        line = '{0:>18} {1:12.0f}'.format(name, result['ops_per_second'])
+        if before is None:
+            line += ' {0:>12} {1:>8} {2:10.2f}'.format('-', '-', result['objects_per_op'])
+        else:
+            change = 100.0 * (result['ops_per_second'] / before['ops_per_second'] - 1.0)
+            line += ' {0:12.0f} {1:+7.1f}% {2:10.2f}'.format(before['ops_per_second'], change, result['objects_per_op'])
+            flags = []
+            if change < -args.threshold:
+                flags.append('SLOWER')
+            if result['objects_per_op'] > before['objects_per_op']:
+                flags.append('MORE OBJECTS (was {0:.2f})'.format(before['objects_per_op']))
+            if flags:
+                regressions += 1
+                line += '  ' + ', '.join(flags)
+        print(line)
+
+    if args.save:
+        reference.update(results)
+        with open(args.baseline, 'w') as f:
+            json.dump({'machine': machine(), 'results': reference}, f, indent=2, sort_keys=True)
+        print('Saved the baseline to {0}'.format(args.baseline))
+    elif regressions:
+        print('{0} regression(s) beyond {1:.0f}%'.format(regressions, args.threshold))
+    sys.exit(1 if regressions and not args.save else 0)
+
+
+if __name__ == '__main__':
+    main()
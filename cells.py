@@ -1,10 +1,40 @@
 from rectangle import Rectangle
 
+# Cell type codes, as stored in the board's grid
+EMPTY = 0
+OUT_OF_BOUNDS = 1
+PADDLE = 2
+BALL = 3
+TOP_WALL = 4
+LEFT_WALL = 5
+RIGHT_WALL = 6
+BLUE_BLOCK = 7
+RED_BLOCK = 8
+GREEN_BLOCK = 9
+SOLID_BLOCK = 10
+BALL_BLOCK = 11
+NUMBER_OF_CELL_TYPES = 12
+
+BLOCK_CODES = {
+    'B': BLUE_BLOCK,
+    'G': GREEN_BLOCK,
+    'R': RED_BLOCK,
+    'S': SOLID_BLOCK,
+    'o': BALL_BLOCK,
+}
+
+
+_NO_BOUNDS = Rectangle(0, 0, -1, -1)
+
+
 class AbstractCell:
 
-    @property
-    def bounding_box(self):
-        return Rectangle(0, 0, -1, -1)
+    __slots__ = ()
+
+    code = EMPTY
+
+    def bounding_box_at(self, column, row):
+        return _NO_BOUNDS
 
     @property
     def color(self):
@@ -16,28 +46,22 @@ class AbstractCell:
 
 
 class Cell(AbstractCell):
+    """Behaviour shared by every cell of one type.
 
-    def __init__(self, board, row, column):
-        self._board = board
-        self._row = row
-        self._column = column
+    The board's grid only holds type codes, with one instance of each cell
+    class per board, so anything that depends on where the cell is gets the
+    column and row passed in.
+    """
 
-    @property
-    def row(self):
-        return self._row
+    __slots__ = ('_board',)
 
-    @property
-    def column(self):
-        return self._column
-
-    @property
-    def tile_number(self):
-        return 0
+    def __init__(self, board):
+        self._board = board
 
-    def is_hit_by(self, ball):
-        return ball.is_colliding_with(self.bounding_box)
+    def is_hit_by(self, ball, column, row):
+        return ball.is_colliding_with(self.bounding_box_at(column, row))
 
-    def process_hit(self, ball):
+    def process_hit(self, ball, column, row):
         pass
 
     @property
@@ -58,18 +82,35 @@ class Cell(AbstractCell):
     def label(self):
         return 'C'
 
+
+class TileCell(Cell):
+    """A cell that fills exactly the tile it sits in.
+
+    bounding_box_at reuses one rectangle, so use it before asking again.
+    """
+
+    __slots__ = ('_box',)
+
+    def __init__(self, board):
+        Cell.__init__(self, board)
+        self._box = Rectangle(0, 0, -1, -1)
+
+    def bounding_box_at(self, column, row):
+        scale = self._board.scale
+        return self._box.set_bounds(row * scale, column * scale, row * scale + (scale - 1), column * scale + (scale - 1))
+
+
 class EmptyCell(Cell):
 
-    def __init__(self):
-        Cell.__init__(self, 0, -1, -1)
-        self._empty_box = Rectangle(0, 0, -1, -1)
+    __slots__ = ()
 
-    def is_hit_by(self, ball):
-        return False
+    code = EMPTY
 
-    @property
-    def bounding_box(self):
-        return self._empty_box
+    def __init__(self, board=None):
+        Cell.__init__(self, board)
+
+    def is_hit_by(self, ball, column, row):
+        return False
 
     @property
     def label(self):
@@ -78,25 +119,27 @@ class EmptyCell(Cell):
 
 class PaddleCell(Cell):
 
+    __slots__ = ('_paddle', '_box')
+
+    code = PADDLE
+
     def __init__(self, board, paddle):
-        pos = board.convert_to_tile_position(paddle.position)
-        Cell.__init__(self, board, pos.y, pos.x)
+        Cell.__init__(self, board)
         self._paddle = paddle
+        self._box = Rectangle(0, 0, -1, -1)
 
-    @property
-    def bounding_box(self):
-        return Rectangle(self._board.scale * 2, self._paddle.position.x, self._board.scale, self._paddle.position.x + self._paddle.width)
-
-    def process_hit(self, ball):
-        Cell.process_hit(self, ball)
+    def bounding_box_at(self, column, row):
+        scale = self._board.scale
+        x = self._paddle.position.x
+        return self._box.set_bounds(scale, x, scale * 2 - 1, x + self._paddle.width - 1)
 
     @property
     def is_vertical(self):
         return False
 
     def reflect_off_horizontal(self, v):
-        self._paddle.add_velocity_to(v)
         v.flip_y()
+        self._paddle.add_velocity_to(v)
 
     @property
     def color(self):
@@ -107,32 +150,30 @@ class PaddleCell(Cell):
         return 'P'
 
 class OutOfBoundsCell(Cell):
+
+    __slots__ = ('_bounds',)
+
+    code = OUT_OF_BOUNDS
+
     def __init__(self, board):
-        Cell.__init__(self, board, 0, 0)
-        self._bounds = Rectangle(board.scale, 0, 0, board.width - 1)
+        Cell.__init__(self, board)
+        self._bounds = Rectangle(0, 0, board.scale - 1, board.width - 1)
 
-    @property
-    def bounding_box(self):
+    def bounding_box_at(self, column, row):
         return self._bounds
 
-    def process_hit(self, ball):
-        Cell.process_hit(self, ball)
+    def process_hit(self, ball, column, row):
         self._board.went_out_of_bounds(ball)
 
     @property
     def label(self):
         return 'O'
 
-class BallCell(Cell):
+class BallCell(TileCell):
 
-    def __init__(self, board, row, column):
-        Cell.__init__(self, board, row, column)
-        scale = board.scale
-        self._bounds = Rectangle(row * scale, column * scale, row * scale + (scale - 1), column * scale + (scale - 1))
+    __slots__ = ()
 
-    @property
-    def bounding_box(self):
-        return self._bounds
+    code = BALL
 
     @property
     def color(self):
@@ -142,12 +183,9 @@ class BallCell(Cell):
     def label(self):
         return 'b'
 
-class BlockCell(Cell):
+class BlockCell(TileCell):
 
-    def __init__(self, board, row, column):
-        Cell.__init__(self, board, row, column)
-        scale = board.scale
-        self._bounds = Rectangle(row * scale, column * scale, row * scale + (scale - 1), column * scale + (scale - 1))
+    __slots__ = ()
 
     @property
     def value(self):
@@ -157,24 +195,20 @@ class BlockCell(Cell):
     def removable(self):
         return True
 
-    def process_hit(self, ball):
-        Cell.process_hit(self, ball)
+    def process_hit(self, ball, column, row):
         if self.removable:
-            self._board.remove_block(self)
+            self._board.remove_block(column, row)
         self._board.add_to_score(self.value)
 
-    @property
-    def bounding_box(self):
-        return self._bounds
-
     @property
     def label(self):
         return 'B'
 
 class BlueBlockCell(BlockCell):
 
-    def __init__(self, board, row, column):
-        BlockCell.__init__(self, board, row, column)
+    __slots__ = ()
+
+    code = BLUE_BLOCK
 
     @property
     def value(self):
@@ -190,8 +224,9 @@ class BlueBlockCell(BlockCell):
 
 class RedBlockCell(BlockCell):
 
-    def __init__(self, board, row, column):
-        BlockCell.__init__(self, board, row, column)
+    __slots__ = ()
+
+    code = RED_BLOCK
 
     @property
     def value(self):
@@ -207,8 +242,9 @@ class RedBlockCell(BlockCell):
 
 class GreenBlockCell(BlockCell):
 
-    def __init__(self, board, row, column):
-        BlockCell.__init__(self, board, row, column)
+    __slots__ = ()
+
+    code = GREEN_BLOCK
 
     @property
     def value(self):
@@ -224,8 +260,9 @@ class GreenBlockCell(BlockCell):
 
 class SolidBlockCell(BlockCell):
 
-    def __init__(self, board, row, column):
-        BlockCell.__init__(self, board, row, column)
+    __slots__ = ()
+
+    code = SOLID_BLOCK
 
     @property
     def value(self):
@@ -246,16 +283,17 @@ class SolidBlockCell(BlockCell):
 
 class BallBlockCell(BlockCell):
 
-    def __init__(self, board, row, column):
-        BlockCell.__init__(self, board, row, column)
+    __slots__ = ()
+
+    code = BALL_BLOCK
 
     @property
     def value(self):
         return 20 if self._board.can_launch_another_ball else 0
 
-    def process_hit(self, ball):
-        BlockCell.process_hit(self, ball)
-        self._board.add_ball(self._row, self._column, ball.transfered_velocity)
+    def process_hit(self, ball, column, row):
+        BlockCell.process_hit(self, ball, column, row)
+        self._board.add_ball(row, column, ball.transferred_velocity)
 
     @property
     def removable(self):
@@ -272,12 +310,13 @@ class BallBlockCell(BlockCell):
 
 class WallCell(Cell):
 
-    def __init__(self, top, left, bottom, right):
-        Cell.__init__(self, None, 0, 0)
+    __slots__ = ('_bounds',)
+
+    def __init__(self, board, top, left, bottom, right):
+        Cell.__init__(self, board)
         self._bounds = Rectangle(top, left, bottom, right)
 
-    @property
-    def bounding_box(self):
+    def bounding_box_at(self, column, row):
         return self._bounds
 
     @property
@@ -287,10 +326,12 @@ class WallCell(Cell):
 
 class SideWallCell(WallCell):
 
+    __slots__ = ('code',)
+
     def __init__(self, board, on_right):
-        left = board.width if on_right else -1 * board.scale
-        right = board.width + board.scale if on_right else -1
-        WallCell.__init__(self, 0, left, board.height - 1, right)
+        left = board.width - board.scale if on_right else 0
+        WallCell.__init__(self, board, 0, left, board.height - 1, left + board.scale - 1)
+        self.code = RIGHT_WALL if on_right else LEFT_WALL
 
     @property
     def is_horizontal(self):
@@ -303,8 +344,12 @@ class SideWallCell(WallCell):
 
 class TopWallCell(WallCell):
 
+    __slots__ = ()
+
+    code = TOP_WALL
+
     def __init__(self, board):
-        WallCell.__init__(self, 0, 0, board.height - 1, board.width - 1)
+        WallCell.__init__(self, board, board.height - board.scale, 0, board.height - 1, board.width - 1)
 
     @property
     def is_vertical(self):
@@ -315,16 +360,17 @@ class TopWallCell(WallCell):
         return '-'
 
 
-def create_block_cell(board, char, row, col):
-    if char == 'B':
-        return BlueBlockCell(board, row, col)
-    elif char == 'G':
-        return GreenBlockCell(board, row, col)
-    elif char == 'R':
-        return RedBlockCell(board, row, col)
-    elif char == 'S':
-        return SolidBlockCell(board, row, col)
-    elif char == 'o':
-        return BallBlockCell(board, row, col)
-    else:
-        return EmptyCell()
+def create_cell_types(board, paddle):
+    """Make the shared cell instances for a board, indexed by type code."""
+    cell_types = [None] * NUMBER_OF_CELL_TYPES
+    for cell in (EmptyCell(board), OutOfBoundsCell(board), PaddleCell(board, paddle), BallCell(board),
+                 TopWallCell(board), SideWallCell(board, False), SideWallCell(board, True),
+                 BlueBlockCell(board), RedBlockCell(board), GreenBlockCell(board),
+                 SolidBlockCell(board), BallBlockCell(board)):
+        cell_types[cell.code] = cell
+    return cell_types
+
+
+def block_code_for(char):
+    """The cell type code for a character in a level definition."""
+    return BLOCK_CODES.get(char, EMPTY)
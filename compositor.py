@@ -0,0 +1,200 @@
+"""Brightness, gamma and effects between the board and the display.
+
+The compositor keeps a frame of the whole grid, a 0xRRGGBB int per cell
+that can go straight to a NeoPixel, and the cell codes it was last
+composed from.  Each render it
+only recomposes the cells in the board's dirty rows and the cells with an
+effect running:
+
+- a block that's knocked out flashes white and fades
+- a cell the ball has just left keeps a fading trail of it
+- fade_in brings the whole picture up from black, e.g. at a level start
+
+Every color goes through one of STEPS + 1 tables of 256 bytes, built
+whenever brightness or gamma change, that gamma correct, apply the
+brightness and scale by the table's step, so a composed pixel costs a
+few table lookups and rendering allocates nothing.  Pixels whose color
+changed are flagged in `changed`, and their rows in `dirty_rows`, for the
+display to push.
+"""
+
+from array import array
+
+from cells import EMPTY, BALL, BLUE_BLOCK, BALL_BLOCK
+
+STEPS = 8                   # effect and fade levels; tables[STEPS] is full strength
+FLASH_FRAMES = STEPS
+TRAIL_FRAMES = STEPS // 2
+FADE_FRAMES = STEPS
+
+
+def level_table(step, brightness, gamma):
+    """The 256 byte table taking a channel value to its gamma corrected,
+    dimmed value, scaled by step / STEPS"""
+    scale = 255.0 * brightness * step / STEPS
+    return bytearray(int(scale * (value / 255.0) ** gamma + 0.5) for value in range(256))
+
+
+class Compositor(object):
+
+    def __init__(self, brightness=1.0, gamma=2.6):
+        """
+        :param brightness: 0.0 to 1.0, applied after gamma
+        :param gamma: the exponent that makes the LEDs' output look even
+        """
+        self._brightness = brightness
+        self._gamma = gamma
+        self._tables = [level_table(step, brightness, gamma) for step in range(STEPS + 1)]
+        self._board = None
+        self._fade = 0
+        self._effect_count = 0
+
+    @property
+    def brightness(self):
+        return self._brightness
+
+    @brightness.setter
+    def brightness(self, brightness):
+        self._brightness = brightness
+        self._rebuild_tables()
+
+    @property
+    def gamma(self):
+        return self._gamma
+
+    @gamma.setter
+    def gamma(self, gamma):
+        self._gamma = gamma
+        self._rebuild_tables()
+
+    def _rebuild_tables(self):
+        for step in range(STEPS + 1):
+            self._tables[step][:] = level_table(step, self._brightness, self._gamma)
+        if self._board is not None:
+            self._recompose_all()
+
+    def _attach(self, board):
+        cells = len(board.cells)
+        self._board = board
+        self._columns = board.columns
+        palette = board.palette
+        self._base = bytearray(3 * len(palette))
+        for code in range(len(palette)):
+            self._base[3 * code:3 * code + 3] = bytes(palette[code])
+        self._codes = bytearray(board.cells)
+        self.frame = array('L', [0] * cells)
+        self.changed = bytearray(cells)
+        self.dirty_rows = bytearray(board.rows)
+        self._flash = bytearray(cells)
+        self._trail = bytearray(cells)
+        self._effects = array('H', [0] * cells)
+        self._effect_count = 0
+        self._recompose_all()
+        # whatever was shown before, every pixel needs pushing
+        for index in range(cells):
+            self.changed[index] = 1
+        for row in range(board.rows):
+            self.dirty_rows[row] = 1
+
+    def fade_in(self):
+        """Bring the whole picture up from black over the next few renders"""
+        self._fade = FADE_FRAMES
+        if self._board is not None:
+            self._recompose_all()
+
+    @property
+    def animating(self):
+        """Whether the next render will change anything by itself"""
+        return self._fade > 0 or self._effect_count > 0
+
+    def render(self, board):
+        """Bring the frame up to date with the board"""
+        if board is not self._board:
+            self._attach(board)
+        self._step_effects()
+        if self._fade:
+            self._fade -= 1
+            self._take_changes(board)
+            self._recompose_all()
+        else:
+            self._take_changes(board, True)
+
+    def _take_changes(self, board, compose=False):
+        """Note the cells that changed in the board's dirty rows, starting
+        flashes and trails, and compose them if asked to"""
+        cells = board.cells
+        dirty = board.dirty_rows
+        codes = self._codes
+        columns = self._columns
+        for row in range(len(dirty)):
+            if not dirty[row]:
+                continue
+            dirty[row] = 0
+            for index in range(row * columns, row * columns + columns):
+                code = cells[index]
+                old = codes[index]
+                if code == old:
+                    continue
+                codes[index] = code
+                if code == EMPTY:
+                    if BLUE_BLOCK <= old <= BALL_BLOCK:
+                        self._start_effect(index, self._flash, FLASH_FRAMES)
+                    elif old == BALL:
+                        self._start_effect(index, self._trail, TRAIL_FRAMES)
+                if compose:
+                    self._compose(index)
+
+    def _start_effect(self, index, levels, frames):
+        if not (self._flash[index] or self._trail[index]):
+            self._effects[self._effect_count] = index
+            self._effect_count += 1
+        levels[index] = frames
+
+    def _step_effects(self):
+        """Fade every running effect a step, dropping the finished ones"""
+        effects = self._effects
+        flash = self._flash
+        trail = self._trail
+        kept = 0
+        for i in range(self._effect_count):
+            index = effects[i]
+            if flash[index]:
+                flash[index] -= 1
+            if trail[index]:
+                trail[index] -= 1
+            self._compose(index)
+            if flash[index] or trail[index]:
+                effects[kept] = index
+                kept += 1
+        self._effect_count = kept
+
+    def _recompose_all(self):
+        for index in range(len(self._codes)):
+            self._compose(index)
+
+    def _compose(self, index):
+        """Work out the color of one cell, flagging it if it changed"""
+        table = self._tables[STEPS - self._fade]
+        base = self._base
+        code = 3 * self._codes[index]
+        red = table[base[code]]
+        green = table[base[code + 1]]
+        blue = table[base[code + 2]]
+        flash = self._flash[index]
+        if flash:
+            white = self._tables[flash][255]
+            red = max(red, white)
+            green = max(green, white)
+            blue = max(blue, white)
+        trail = self._trail[index]
+        if trail:
+            ball = 3 * BALL
+            faded = self._tables[trail]
+            red = max(red, faded[base[ball]])
+            green = max(green, faded[base[ball + 1]])
+            blue = max(blue, faded[base[ball + 2]])
+        color = (red << 16) | (green << 8) | blue
+        if self.frame[index] != color:
+            self.frame[index] = color
+            self.changed[index] = 1
+            self.dirty_rows[index // self._columns] = 1
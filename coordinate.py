@@ -1,15 +1,18 @@
-from vector import Vector
-from math import atan2, sqrt
-
-import adafruit_logging as logging
-logger = logging.getLogger('breakout')
+from vector import vector_from_components
 
 class Coordinate(object):
 
+    __slots__ = ('_x', '_y')
+
     def __init__(self, x, y):
         self._x = x
         self._y = y
 
+    def set(self, x, y):
+        self._x = x
+        self._y = y
+        return self
+
     @property
     def x(self):
         return int(self._x)
@@ -26,28 +29,46 @@ class Coordinate(object):
     def y(self, new_y):
         self._y = new_y
 
+    @property
+    def raw_x(self):
+        return self._x
+
+    @property
+    def raw_y(self):
+        return self._y
+
     def __str__(self):
         return 'Coordinate(x: {0:6.4f}, y: {1:6.4f})'.format(self.x, self.y)
 
     def move_by(self, dx_or_vector, dy=None):
-        logger.debug('Coordinate.move_by(%s, %s)', dx_or_vector, dy)
-        if isinstance(dx_or_vector, Vector):
-            logger.debug('  moving by (%d, %d)', dx_or_vector.x, dx_or_vector.y)
+        if dy is None:
             self._x += dx_or_vector.x
             self._y += dx_or_vector.y
         else:
             self._x += dx_or_vector
             self._y += dy
-        logger.debug('Coordinate now %s', self)
 
-    def convert_to_tile_position(self, scale):
-        return Coordinate(self._x // scale, self._y // scale)
+    def move_by_raw(self, dx, dy):
+        self._x += dx
+        self._y += dy
+
+    def convert_to_tile_position(self, scale, target=None):
+        """The tile this point is in, written into target if one is given"""
+        if target is None:
+            return Coordinate(self._x // scale, self._y // scale)
+        return target.set(self._x // scale, self._y // scale)
 
     def clip_x(self, low, high):
-        self._x = min([high, max([low, self._x])])
+        if self._x < low:
+            self._x = low
+        elif self._x > high:
+            self._x = high
 
     def clip_y(self, low, high):
-        self._y = min([high, max([low, self._y])])
+        if self._y < low:
+            self._y = low
+        elif self._y > high:
+            self._y = high
 
     def out_of_bounds_x(self, low, high):
         return self._x < low or self._x > high
@@ -56,6 +77,4 @@ class Coordinate(object):
         return self._y < low or self._y > high
 
     def vector_difference(self, other):
-        dx = self._x - other.x
-        dy = self._y - other.y
-        return Vector(atan2(dy, dx), sqrt(dx * dx + dy * dy))
+        return vector_from_components(self._x - other.x, self._y - other.y)
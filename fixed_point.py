@@ -0,0 +1,344 @@
+"""Integer fixed point helpers for the fixed point physics mode.
+
+Positions and velocities are held in sub-point units, ONE to a board
+point.  Angles are in 512ths of a turn and the trig is done with the
+tables below, written out as literals so that CPython and CircuitPython
+get bit-for-bit the same results.
+"""
+
+from coordinate import Coordinate
+
+SHIFT = 8
+ONE = 1 << SHIFT
+
+TRIG_SHIFT = 14           # sine table entries are scaled by 1 << TRIG_SHIFT
+ANGLE_STEPS = 512
+RADIANS_TO_STEPS = 81.48733086305042
+STEPS_TO_RADIANS = 1.0 / RADIANS_TO_STEPS
+
+# sin(2 pi i / 512) << TRIG_SHIFT for the first quarter turn, i = 0..128
+QUARTER_SINE = (
+    0, 201, 402, 603, 804, 1005, 1205, 1406, 1606, 1806, 2006, 2205, 2404, 2603, 2801, 2999, 3196,
+    3393, 3590, 3786, 3981, 4176, 4370, 4563, 4756, 4948, 5139, 5330, 5520, 5708, 5897, 6084, 6270,
+    6455, 6639, 6823, 7005, 7186, 7366, 7545, 7723, 7900, 8076, 8250, 8423, 8595, 8765, 8935, 9102,
+    9269, 9434, 9598, 9760, 9921, 10080, 10238, 10394, 10549, 10702, 10853, 11003, 11151, 11297,
+    11442, 11585, 11727, 11866, 12004, 12140, 12274, 12406, 12537, 12665, 12792, 12916, 13039,
+    13160, 13279, 13395, 13510, 13623, 13733, 13842, 13949, 14053, 14155, 14256, 14354, 14449,
+    14543, 14635, 14724, 14811, 14896, 14978, 15059, 15137, 15213, 15286, 15357, 15426, 15493,
+    15557, 15619, 15679, 15736, 15791, 15843, 15893, 15941, 15986, 16029, 16069, 16107, 16143,
+    16176, 16207, 16235, 16261, 16284, 16305, 16324, 16340, 16353, 16364, 16373, 16379, 16383,
+    16384,
+)
+
+# atan(i / 64) in 512ths of a turn, i = 0..64
+ARCTANGENT = (
+    0, 1, 3, 4, 5, 6, 8, 9, 10, 11, 13, 14, 15, 16, 18, 19, 20, 21, 22, 24, 25, 26, 27, 28, 29, 30,
+    31, 33, 34, 35, 36, 37, 38, 39, 40, 41, 42, 43, 44, 45, 46, 46, 47, 48, 49, 50, 51, 52, 52, 53,
+    54, 55, 56, 56, 57, 58, 59, 59, 60, 61, 61, 62, 63, 63, 64,
+)
+
+
+def sin_512(angle):
+    angle &= 511
+    if angle < 128:
+        return QUARTER_SINE[angle]
+    if angle < 256:
+        return QUARTER_SINE[256 - angle]
+    if angle < 384:
+        return -QUARTER_SINE[angle - 256]
+    return -QUARTER_SINE[512 - angle]
+
+
+def cos_512(angle):
+    return sin_512(angle + 128)
+
+
+def atan2_512(y, x):
+    """The angle of (x, y) in 512ths of a turn, 0..511"""
+    if x == 0 and y == 0:
+        return 0
+    ax = abs(x)
+    ay = abs(y)
+    if ax >= ay:
+        angle = ARCTANGENT[(ay * 64 + (ax >> 1)) // ax]
+    else:
+        angle = 128 - ARCTANGENT[(ax * 64 + (ay >> 1)) // ay]
+    if x < 0:
+        angle = 256 - angle
+    if y < 0:
+        angle = (512 - angle) & 511
+    return angle
+
+
+def radians_to_512(radians):
+    return int(radians * RADIANS_TO_STEPS + 0.5) & 511
+
+
+def isqrt(n):
+    """Integer square root, rounded down"""
+    if n < 2:
+        return n
+    x = n
+    y = (x + 1) >> 1
+    while y < x:
+        x = y
+        y = (x + n // x) >> 1
+    return x
+
+
+def scale_toward_zero(value, numerator, denominator):
+    """value * numerator / denominator, truncated toward zero"""
+    result = abs(value) * numerator // denominator
+    return result if value >= 0 else -result
+
+
+def to_raw(points):
+    return int(round(points * ONE))
+
+
+def _raw_components(o):
+    if isinstance(o, FixedVector):
+        return o.raw_x, o.raw_y
+    return to_raw(o.x), to_raw(o.y)
+
+
+class FixedVector(object):
+    """A Vector with integer components in sub-point units.
+
+    It has the same interface as vector.Vector; x, y and magnitude are
+    reported in points.
+    """
+
+    __slots__ = ('_x', '_y')
+
+    def __init__(self, raw_x, raw_y):
+        self._x = raw_x
+        self._y = raw_y
+
+    def __str__(self):
+        return "FixedVector(x: {0}, y: {1}, a: {2}/512)".format(self._x, self._y, self.angle_512)
+
+    @property
+    def raw_x(self):
+        return self._x
+
+    @property
+    def raw_y(self):
+        return self._y
+
+    @property
+    def x(self):
+        return self._x / ONE
+
+    @property
+    def y(self):
+        return self._y / ONE
+
+    @property
+    def angle_512(self):
+        return atan2_512(self._y, self._x)
+
+    @property
+    def angle(self):
+        return self.angle_512 * STEPS_TO_RADIANS
+
+    @property
+    def raw_magnitude(self):
+        return isqrt(self._x * self._x + self._y * self._y)
+
+    @property
+    def magnitude(self):
+        return self.raw_magnitude / ONE
+
+    def set_polar_512(self, angle, raw_magnitude):
+        self._x = scale_toward_zero(cos_512(angle), raw_magnitude, 1 << TRIG_SHIFT)
+        self._y = scale_toward_zero(sin_512(angle), raw_magnitude, 1 << TRIG_SHIFT)
+
+    def flip_x(self):
+        self._x = -self._x
+
+    def flip_y(self):
+        self._y = -self._y
+
+    def angle_as_deg_512(self):
+        return self.angle_512
+
+    def __iadd__(self, o):
+        dx, dy = _raw_components(o)
+        self._x += dx
+        self._y += dy
+        return self
+
+    def __add__(self, o):
+        dx, dy = _raw_components(o)
+        return FixedVector(self._x + dx, self._y + dy)
+
+    def __isub__(self, o):
+        dx, dy = _raw_components(o)
+        self._x -= dx
+        self._y -= dy
+        return self
+
+    def __sub__(self, o):
+        dx, dy = _raw_components(o)
+        return FixedVector(self._x - dx, self._y - dy)
+
+    def raw_dot(self, o):
+        """The dot product in sub-point units"""
+        ox, oy = _raw_components(o)
+        return (self._x * ox + self._y * oy) >> SHIFT
+
+    def dot(self, o):
+        return self.raw_dot(o) / ONE
+
+    def _set_raw_magnitude(self, high, magnitude):
+        self._x = scale_toward_zero(self._x, high, magnitude)
+        self._y = scale_toward_zero(self._y, high, magnitude)
+
+    def clip_magnitude_at(self, high):
+        high = to_raw(high)
+        magnitude = self.raw_magnitude
+        if magnitude > high:
+            self._set_raw_magnitude(high, magnitude)
+
+    def clip_magnitude_between(self, low, high):
+        magnitude = self.raw_magnitude
+        if magnitude == 0:
+            return
+        low = to_raw(low)
+        high = to_raw(high)
+        if magnitude < low:
+            self._set_raw_magnitude(low, magnitude)
+        elif magnitude > high:
+            self._set_raw_magnitude(high, magnitude)
+
+    def clip_angle_between(self, low, high):
+        """Clip the angle, given in radians, to the 512 step closest to the
+        limit it crosses."""
+        angle = self.angle_512
+        low = radians_to_512(low)
+        high = radians_to_512(high)
+        if angle < low:
+            self.set_polar_512(low, self.raw_magnitude)
+        elif angle > high:
+            self.set_polar_512(high, self.raw_magnitude)
+
+    def normalize_angle(self):
+        pass
+
+    @property
+    def is_left(self):
+        return self._x < 0
+
+    @property
+    def is_right(self):
+        return self._x > 0
+
+    @property
+    def is_down(self):
+        return self._y > 0
+
+    @property
+    def is_up(self):
+        return self._y < 0
+
+    @property
+    def is_primarily_right(self):
+        return self._x >= abs(self._y)
+
+    @property
+    def is_primarily_up(self):
+        return -self._y >= abs(self._x)
+
+    @property
+    def is_primarily_left(self):
+        return -self._x >= abs(self._y)
+
+    @property
+    def is_primarily_down(self):
+        return self._y >= abs(self._x)
+
+    def is_in_the_same_direction_as(self, v):
+        return self.raw_dot(v) > 0
+
+
+def fixed_vector_from_polar_512(angle, raw_magnitude):
+    v = FixedVector(0, 0)
+    v.set_polar_512(angle, raw_magnitude)
+    return v
+
+
+class FixedCoordinate(object):
+    """A Coordinate held in sub-point units.  x and y report whole points."""
+
+    __slots__ = ('_x', '_y')
+
+    def __init__(self, x, y):
+        self._x = to_raw(x)
+        self._y = to_raw(y)
+
+    @property
+    def raw_x(self):
+        return self._x
+
+    @property
+    def raw_y(self):
+        return self._y
+
+    @property
+    def x(self):
+        return self._x >> SHIFT
+
+    @x.setter
+    def x(self, new_x):
+        self._x = to_raw(new_x)
+
+    @property
+    def y(self):
+        return self._y >> SHIFT
+
+    @y.setter
+    def y(self, new_y):
+        self._y = to_raw(new_y)
+
+    def __str__(self):
+        return 'FixedCoordinate(x: {0}/{2}, y: {1}/{2})'.format(self._x, self._y, ONE)
+
+    def move_by(self, dx_or_vector, dy=None):
+        if dy is None:
+            dx, dy = _raw_components(dx_or_vector)
+        else:
+            dx = to_raw(dx_or_vector)
+            dy = to_raw(dy)
+        self._x += dx
+        self._y += dy
+
+    def move_by_raw(self, dx, dy):
+        self._x += dx
+        self._y += dy
+
+    def convert_to_tile_position(self, scale, target=None):
+        if target is None:
+            return Coordinate(self.x // scale, self.y // scale)
+        return target.set(self.x // scale, self.y // scale)
+
+    def clip_x(self, low, high):
+        if self._x < low * ONE:
+            self._x = low * ONE
+        elif self._x > high * ONE:
+            self._x = high * ONE
+
+    def clip_y(self, low, high):
+        if self._y < low * ONE:
+            self._y = low * ONE
+        elif self._y > high * ONE:
+            self._y = high * ONE
+
+    def out_of_bounds_x(self, low, high):
+        return self._x < low * ONE or self._x > high * ONE
+
+    def out_of_bounds_y(self, low, high):
+        return self._y < low * ONE or self._y > high * ONE
+
+    def vector_difference(self, other):
+        return FixedVector(self._x - other.raw_x, self._y - other.raw_y)
@@ -1,24 +1,81 @@
-import math
-from cells import create_block_cell, EmptyCell, TopWallCell, SideWallCell, PaddleCell, OutOfBoundsCell, BallCell
-from levels import levels
-from ball import Ball
+from cells import create_cell_types, EMPTY, OUT_OF_BOUNDS, PADDLE, BALL, TOP_WALL, LEFT_WALL, RIGHT_WALL
+from level_format import LevelHeader, HEADER_SIZE, compiled_level
+from ball import Ball, BALL_SIZE, HEADINGS, STEEP
+from ball_hash import BallHash
+from coordinate import Coordinate
+from physics import FloatPhysics, FixedPointPhysics
+from rng import XorShift32
+from sweep import GridSweep
+import tracing
 
 import adafruit_logging as logging
 logger = logging.getLogger('breakout')
 
 MAX_BALLS_IN_PLAY = 2
 
+# how far apart, in points, the centres of two balls' boxes can be in each
+# direction and still touch, allowing for rounding to whole points
+_BALL_REACH = BALL_SIZE + 1
+
+# The collision checks that can fire for each heading code (see
+# ball.heading_of).  A ball only hits a cell edge it's moving towards, or
+# along: the bottom edge unless it's heading up, and so on, in the order
+# bottom, top, left, right.  The corner it's heading into is checked for
+# a side hit if it's moving more along y than x, otherwise a top or bottom
+# hit, and not at all if it's moving straight along an axis.
+_BOTTOM = 0
+_TOP = 1
+_LEFT = 2
+_RIGHT = 3
+
+
+def _edge_checks(heading):
+    x_sign, y_sign = divmod(heading % STEEP, 3)
+    edges = []
+    if y_sign >= 1:
+        edges.append(_BOTTOM)
+    if y_sign <= 1:
+        edges.append(_TOP)
+    if x_sign <= 1:
+        edges.append(_LEFT)
+    if x_sign >= 1:
+        edges.append(_RIGHT)
+    return tuple(edges)
+
+
+def _corner_check(heading):
+    """(side hit, left column, top row), or None"""
+    x_sign, y_sign = divmod(heading % STEEP, 3)
+    if x_sign == 1 or y_sign == 1:
+        return None
+    return heading >= STEEP, x_sign == 0, y_sign == 0
+
+
+_EDGE_CHECKS = tuple(_edge_checks(heading) for heading in range(HEADINGS))
+_CORNER_CHECKS = tuple(_corner_check(heading) for heading in range(HEADINGS))
+
 class Board(object):
 
 
-    def __init__(self, scale, rows, columns, paddle):
+    def __init__(self, scale, rows, columns, paddle, fixed_point=False, seed=1, swept_collisions=False,
+                 max_balls=MAX_BALLS_IN_PLAY, level_pack=None):
         """
         :param scale: the number of mathamatical points in a display pixel
         :param rows: the number of rows on screen
         :param columns: the number of columns on the screen
         :param paddle: the paddle object to use
+        :param fixed_point: run ball physics in integer fixed point rather than floats
+        :param seed: seed for the random number generator that launch and ball block angles come from
+        :param swept_collisions: sweep balls through the grid each tick rather than checking where they land
+        :param max_balls: the most balls in play at once
+        :param level_pack: a LevelPack to take levels from rather than levels.py
         """
         self._paddle = paddle
+        self._seed = seed
+        if fixed_point:
+            self._physics = FixedPointPhysics(XorShift32(seed))
+        else:
+            self._physics = FloatPhysics(XorShift32(seed))
         self._scale = scale
         self._rows = rows + 2             # stored rows & columns include a one pixel halo
         self._columns = columns + 2
@@ -26,15 +83,20 @@ class Board(object):
         self._in_play = False
         self._balls_remaining = 3
         self._number_of_balls = 1
-        self._balls = []
-        for _ in range(MAX_BALLS_IN_PLAY):
-            self._balls.append(None)
-        self._cells = []
-        for _ in range(self._columns):
-            row_cells = []
-            self._cells.append(row_cells)
-            for _ in range(self._rows):
-                row_cells.append(EmptyCell())
+        self._max_balls = max_balls
+        self._level_pack = level_pack
+        self._balls = [None] * max_balls
+        # with only a few balls, looking at each one is cheaper than keeping a hash of them
+        self._ball_hash = None
+        if max_balls > MAX_BALLS_IN_PLAY:
+            self._ball_hash = BallHash(self._columns, self._rows, scale, max_balls)
+        self._cells = bytearray(self._columns * self._rows)    # cell type codes, row by row
+        self._dirty_rows = bytearray(self._rows)                # 1 for each row changed since a display took it
+        self._cell_types = create_cell_types(self, paddle)
+        self._palette = [cell.color for cell in self._cell_types]
+        self._tile_position = Coordinate(0, 0)      # scratch for move_balls
+        self._paddle_column = None                  # where update_paddle last put the paddle
+        self._sweep = GridSweep(self) if swept_collisions else None
         self._add_border()
         self._add_out_of_bounds()
         self.update_paddle()
@@ -42,24 +104,72 @@ class Board(object):
 
     def reset_game(self):
         self._score = 0
-        self.in_play = False
+        self._in_play = False
         self._balls_remaining = 3
+        self.clear_balls()
         self._number_of_balls = 1
-        for i in range(MAX_BALLS_IN_PLAY):
-            self._balls[i] = None
 
     @property
     def width(self):
-        return (self._columns - 2) * self._scale
+        """The width of the board in points, including the halo"""
+        return self._columns * self._scale
 
     @property
     def height(self):
-        return self._rows - 2
+        """The height of the board in points, including the halo"""
+        return self._rows * self._scale
+
+    @property
+    def columns(self):
+        """The number of columns of cells, including the halo"""
+        return self._columns
+
+    @property
+    def rows(self):
+        """The number of rows of cells, including the halo"""
+        return self._rows
+
+    @property
+    def swept_collisions(self):
+        return self._sweep is not None
+
+    @property
+    def score(self):
+        return self._score
 
     @property
     def scale(self):
         return self._scale
 
+    @property
+    def physics(self):
+        return self._physics
+
+    @property
+    def seed(self):
+        return self._seed
+
+    @property
+    def fixed_point(self):
+        return self._physics.units_per_point != 1
+
+    @property
+    def paddle(self):
+        return self._paddle
+
+    @property
+    def balls(self):
+        """The ball slots; empty slots hold None"""
+        return self._balls
+
+    @property
+    def balls_remaining(self):
+        return self._balls_remaining
+
+    @property
+    def number_of_balls(self):
+        return self._number_of_balls
+
     @property
     def paddle_x(self):
         return self._paddle.position.x
@@ -70,37 +180,63 @@ class Board(object):
 
     @property
     def cells(self):
+        """The grid of cell type codes, one byte per cell, row by row"""
         return self._cells
 
+    def cell_type(self, code):
+        """The shared cell instance for a type code"""
+        return self._cell_types[code]
+
+    @property
+    def palette(self):
+        """The color of each cell type code, so cells is an indexed picture
+        of the board"""
+        return self._palette
+
+    @property
+    def dirty_rows(self):
+        """A byte per row, set when a cell in the row changes.  A display
+        clears the ones it has drawn."""
+        return self._dirty_rows
+
+    def mark_all_rows_dirty(self):
+        for row in range(self._rows):
+            self._dirty_rows[row] = 1
+
     def cell_at(self, x_or_coordinate, y=None, value=None):
         if isinstance(x_or_coordinate, int):
             x = x_or_coordinate
         else:
             x = x_or_coordinate.x
             y = x_or_coordinate.y
-        previous_value = self._cells[x][y]
-        if value is not None:
-            self._cells[x][y] = value
-            if x == 1 and y == 7 and value.label == 'P' :
-                raise Exception('', '')
+        index = y * self._columns + x
+        previous_value = self._cell_types[self._cells[index]]
+        if value is not None and value.code != self._cells[index]:
+            self._cells[index] = value.code
+            self._dirty_rows[y] = 1
         return previous_value
 
+    def code_at(self, x, y):
+        return self._cells[y * self._columns + x]
+
+    def set_code_at(self, x, y, code):
+        index = y * self._columns + x
+        if self._cells[index] != code:
+            self._cells[index] = code
+            self._dirty_rows[y] = 1
+
     def _add_border(self):
         """Add wall cels along the top and sides"""
-        top = TopWallCell(self)
-        left = SideWallCell(self, False)
-        right = SideWallCell(self, True)
         for col in range(self._columns):
-            self.cell_at(col, self._rows - 1, top)
+            self.set_code_at(col, self._rows - 1, TOP_WALL)
         for row in range(self._rows):
-            self.cell_at(0, row, left)
-            self.cell_at(self._columns - 1, row, right)
+            self.set_code_at(0, row, LEFT_WALL)
+            self.set_code_at(self._columns - 1, row, RIGHT_WALL)
 
     def _add_out_of_bounds(self):
         """Add a row of out of bounds cells along the bottom"""
-        cell = OutOfBoundsCell(self)
         for x in range(self._columns):
-            self.cell_at(x, 0, cell)
+            self.set_code_at(x, 0, OUT_OF_BOUNDS)
 
 
     def add_blocks(self):
@@ -108,22 +244,54 @@ class Board(object):
 
 
     def set_up_level(self, level):
-        logger.debug('Loading level {0}'.format(level))
-        level_data = levels[level]
-        data_index = 0
-        for row in range(self._rows - 2, 1, -1):
-            line = level_data[data_index]
-            data_index += 1
-            for col in range(1, self._columns - 1):
-                # print('    Col: {0}'.format(col))
-                self.cell_at(col, row, create_block_cell(self, line[col - 1], row, col))
+        if tracing.enabled:
+            tracing.record(tracing.LEVEL, tracing.NO_SLOT, level)
+        if self._level_pack is None:
+            return self.load_level(compiled_level(level))
+        header = self.load_level(self._level_pack.level(level))
+        self._level_pack.prefetch(level + 1)
+        return header
+
+    def load_level(self, data):
+        """Copy a compiled level (see level_format) into the grid, its first
+        line just under the top wall.  Returns the level's header."""
+        header = LevelHeader(data)
+        width = header.width
+        field_width = self._columns - 2
+        if width > field_width or header.height > self._rows - 3:
+            raise ValueError('A {0}x{1} level does not fit the board'.format(width, header.height))
+        if width < field_width or header.height < self._rows - 3:
+            # a level smaller than the field sits in the middle at the top
+            # with nothing around it
+            empty = bytes(field_width)
+            for row in range(2, self._rows - 1):
+                start = row * self._columns + 1
+                self._cells[start:start + field_width] = empty
+                self._dirty_rows[row] = 1
+        codes = memoryview(data)
+        offset = HEADER_SIZE
+        left = 1 + (field_width - width) // 2
+        for row in range(self._rows - 2, self._rows - 2 - header.height, -1):
+            start = row * self._columns + left
+            self._cells[start:start + width] = codes[offset:offset + width]
+            self._dirty_rows[row] = 1
+            offset += width
+        return header
 
     def update_paddle(self):
-        for x in range(1, self._columns - 1):
-            self.cell_at(x, 1, EmptyCell())
-        x = self._paddle.position.x // self._scale
-        for offset in range(self._paddle.width // self._scale):
-            self.cell_at(int(x + offset), 1, PaddleCell(self, self._paddle))
+        """Move the paddle's cells to where the paddle is, only touching
+        the cells it covered and now covers."""
+        column = int(self._paddle.position.x // self._scale)
+        if column == self._paddle_column:
+            return
+        cells = self._paddle.width // self._scale
+        if self._paddle_column is not None:
+            for x in range(self._paddle_column, self._paddle_column + cells):
+                if self.code_at(x, 1) == PADDLE:
+                    self.set_code_at(x, 1, EMPTY)
+        for x in range(column, column + cells):
+            self.set_code_at(x, 1, PADDLE)
+        self._paddle_column = column
 
     def clear_level(self):
         pass
@@ -131,167 +299,159 @@ class Board(object):
     def display_game_over(self):
         pass
 
+    def sweep_ball(self, ball):
+        """Move a ball through one tick, handling every cell it meets on the way"""
+        return self._sweep.move(ball)
+
     def process_ball(self, ball):
-        logger.debug('Processing ball')
-        self.check_for_and_handle_collision(ball)
+        if self._sweep is None:
+            self.check_for_and_handle_collision(ball)
+        elif self.is_ball_in_play(ball):
+            self.check_for_and_handle_ball_collision(ball)
 
     def check_for_and_handle_collision(self, ball):
         if self.check_for_and_handle_ball_collision(ball):
-            logger.debug('Ball collision')
-            return True
-        if self.check_for_and_handle_non_corner_collision(ball):
-            logger.debug('Non corner collision')
-            return True
-        if self.check_for_and_handle_corner_collision(ball):
-            logger.debug('Corner collision')
-            return True
-        return False
+            event = tracing.BALL_HIT
+        elif self.check_for_and_handle_non_corner_collision(ball):
+            event = tracing.EDGE_HIT
+        elif self.check_for_and_handle_corner_collision(ball):
+            event = tracing.CORNER_HIT
+        else:
+            return False
+        if tracing.enabled:
+            tracing.record(event, tracing.NO_SLOT, ball.position.x, ball.position.y)
+        return True
 
     def check_for_and_handle_ball_collision(self, ball1):
-        for ball_number in range(MAX_BALLS_IN_PLAY):
+        if self._number_of_balls < 2:
+            return False
+        if self._ball_hash is None:
+            for ball2 in self._balls:
+                if ball2 is None or ball2 is ball1:
+                    continue
+                if self._physics.handle_ball_collision(ball1, ball2):
+                    return True
+            return False
+        center = ball1.center
+        for ball_number in self._ball_hash.near(center.raw_x, center.raw_y, _BALL_REACH):
             ball2 = self._balls[ball_number]
-            if ball2 is None:
-                continue
-            if ball2 == ball1:
+            if ball2 is ball1:
                 continue
-            n12 = ball1.center.vector_difference(ball2.center)
-            if n12.magnitude > 8:         #not touching
-                continue
-            if ball1.velocity.is_in_the_same_direction_as(n12):
-                continue
-            n12.normalize()
-            projection_onto_n12_of_v1 = n12 * n12.dot(ball1.velocity)
-            n21 = ball2.center.vector_difference(ball1.center)
-            n21.normalize()
-            projection_onto_n21_of_v2 = n21 * n21.dot(ball2.velocity)
-            ball1.add_to_velocity(projection_onto_n21_of_v2 - projection_onto_n12_of_v1)
-            ball2.add_to_velocity(projection_onto_n12_of_v1 - projection_onto_n21_of_v2)
-            return True
-        return False
-
-    def check_for_and_handle_corner_collision(self, ball):
-        top = ball.top_cell_position.y
-        bottom = ball.bottom_cell_position.y
-        left = ball.left_cell_position.x
-        right = ball.right_cell_position.x
-
-        if ball.is_heading_primarily_up:
-            if ball.is_heading_left:
-                self.vertical_hit(self.cell_at(top, left), ball)
-                return True
-            if ball.is_heading_right:
-                self.vertical_hit(self.cell_at(top, right), ball)
-                return True
-        if ball.is_heading_primarily_down:
-            if ball.is_heading_left:
-                self.vertical_hit(self.cell_at(bottom, left), ball)
-                return True
-            if ball.is_heading_right:
-                self.vertical_hit(self.cell_at(bottom, right), ball)
-                return True
-        if ball.is_heading_primarily_left:
-            if ball.is_heading_up:
-                self.horizontal_hit(self.cell_at(top, left), ball)
+            if self._physics.handle_ball_collision(ball1, ball2):
                 return True
-            if ball.is_heading_down:
-                self.horizontal_hit(self.cell_at(bottom, left), ball)
-                return True
-        if ball.is_heading_primarily_right:
-            if ball.is_heading_up:
-                self.horizontal_hit(self.cell_at(top, right), ball)
-                return True
-            if ball.is_heading_down:
-                self.horizontal_hit(self.cell_at(bottom, right), ball)
-                return True
-
         return False
 
-    def vertical_hit(self, cell, ball):
+    def check_for_and_handle_corner_collision(self, ball):
+        corner = _CORNER_CHECKS[ball.heading]
+        if corner is None:
+            return False
+        vertical, on_left, on_top = corner
+        column = ball.left_cell_position.x if on_left else ball.right_cell_position.x
+        row = ball.top_cell_position.y if on_top else ball.bottom_cell_position.y
+        if vertical:
+            return self.vertical_hit(column, row, ball)
+        return self.horizontal_hit(column, row, ball)
+
+    def vertical_hit(self, column, row, ball):
+        cell = self.cell_at(column, row)
         if not cell.is_vertical:
             return False
-        if not cell.is_hit_by(ball):
+        if not cell.is_hit_by(ball, column, row):
             return False
-        cell.process_hit(ball)
+        cell.process_hit(ball, column, row)
         ball.reflect_from_side(cell)
         return True
 
-    def horizontal_hit(self, cell, ball):
+    def horizontal_hit(self, column, row, ball):
+        cell = self.cell_at(column, row)
         if not cell.is_horizontal:
             return False
-        if not cell.is_hit_by(ball):
+        if not cell.is_hit_by(ball, column, row):
             return False
-        cell.process_hit(ball)
+        cell.process_hit(ball, column, row)
         ball.reflect_from_top_bottom(cell)
         return True
 
     def check_for_and_handle_non_corner_collision(self, ball):
-        if self.check_for_and_handle_bottom_hit(self.cell_at(ball.bottom_cell_position), ball):
-            return True
-        if self.check_for_and_handle_top_hit(self.cell_at(ball.top_cell_position), ball):
-            return True
-        if self.check_for_and_handle_left_hit(self.cell_at(ball.left_cell_position), ball):
-            return True
-        if self.check_for_and_handle_right_hit(self.cell_at(ball.right_cell_position), ball):
-            return True
+        for edge in _EDGE_CHECKS[ball.heading]:
+            if edge == _BOTTOM:
+                position = ball.bottom_cell_position
+                if self.check_for_and_handle_bottom_hit(position.x, position.y, ball):
+                    return True
+            elif edge == _TOP:
+                position = ball.top_cell_position
+                if self.check_for_and_handle_top_hit(position.x, position.y, ball):
+                    return True
+            elif edge == _LEFT:
+                position = ball.left_cell_position
+                if self.check_for_and_handle_left_hit(position.x, position.y, ball):
+                    return True
+            else:
+                position = ball.right_cell_position
+                if self.check_for_and_handle_right_hit(position.x, position.y, ball):
+                    return True
         return False
 
-    def check_for_and_handle_left_hit(self, cell, ball):
+    # The edge checks only run for a ball heading towards that edge (see
+    # _EDGE_CHECKS), so they don't look at the heading again
+
+    def check_for_and_handle_left_hit(self, column, row, ball):
+        cell = self.cell_at(column, row)
         if not cell.is_vertical:
             return False
-        if not cell.is_hit_by(ball):
+        if not cell.is_hit_by(ball, column, row):
             return False
-        if ball.is_heading_right:
-            return False
-        cell.process_hit(ball)
+        cell.process_hit(ball, column, row)
         ball.reflect_from_side(cell)
         return True
 
-    def check_for_and_handle_right_hit(self, cell, ball):
+    def check_for_and_handle_right_hit(self, column, row, ball):
+        cell = self.cell_at(column, row)
         if not cell.is_vertical:
             return False
-        if not cell.is_hit_by(ball):
-            return False
-        if ball.is_Heading_Left:
+        if not cell.is_hit_by(ball, column, row):
             return False
-        cell.process_hit(ball)
+        cell.process_hit(ball, column, row)
         ball.reflect_from_side(cell)
         return True
 
-    def check_for_and_handle_top_hit(self, cell, ball):
+    def check_for_and_handle_top_hit(self, column, row, ball):
+        cell = self.cell_at(column, row)
         if not cell.is_horizontal:
             return False
-        if not cell.is_hit_by(ball):
+        if not cell.is_hit_by(ball, column, row):
             return False
-        if ball.is_heading_down:
-            return False
-        cell.process_hit(ball)
+        cell.process_hit(ball, column, row)
         ball.reflect_from_top_bottom(cell)
         return True
 
-    def check_for_and_handle_bottom_hit(self, cell, ball):
+    def check_for_and_handle_bottom_hit(self, column, row, ball):
+        cell = self.cell_at(column, row)
         if not cell.is_horizontal:
             return False
-        if not cell.is_hit_by(ball):
-            return False
-        if ball.is_heading_up:
+        if not cell.is_hit_by(ball, column, row):
             return False
-        cell.process_hit(ball)
+        cell.process_hit(ball, column, row)
         ball.reflect_from_top_bottom(cell)
         return True
 
     def went_out_of_bounds(self, ball):
-        logger.debug('Out of bounds')
-        for ball_number in range(MAX_BALLS_IN_PLAY):
-            if self._balls[ball_number] is None:
-                continue
-            if self._balls[ball_number] == ball:
+        for ball_number in range(self._max_balls):
+            if self._balls[ball_number] is not ball:
                 continue
             self._balls[ball_number] = None
+            if self._ball_hash is not None:
+                self._ball_hash.remove(ball_number)
             self._number_of_balls -= 1
+            if tracing.enabled:
+                tracing.record(tracing.OUT_OF_BOUNDS, ball_number, self._number_of_balls)
             if self._number_of_balls == 0:
                 self._balls_remaining -= 1
                 self._in_play = False
 
+    def is_ball_in_play(self, ball):
+        return ball in self._balls
+
     @property
     def is_still_in_play(self):
         return self._in_play
@@ -301,55 +461,94 @@ class Board(object):
         return self._balls_remaining == 0
 
     def clear_balls(self):
-        for i in range(MAX_BALLS_IN_PLAY):
+        for i in range(self._max_balls):
             self._balls[i] = None
+        if self._ball_hash is not None:
+            self._ball_hash.clear()
+        self._number_of_balls = 0
+
+    def remove_block(self, column, row):
+        if tracing.enabled:
+            tracing.record(tracing.BLOCK_REMOVED, tracing.NO_SLOT, column, row)
+        self.set_code_at(column, row, EMPTY)
 
-    def remove_block(self, cell):
-        self.cell_at(cell.row, cell.column, EmptyCell())
+    def add_to_score(self, value):
+        self._score += value
 
 
     def move_balls(self):
-        for ball in self._balls:
+        if tracing.enabled:
+            tracing.tick()
+        for ball_number in range(self._max_balls):
+            ball = self._balls[ball_number]
             if ball is None:
                 continue
-            old_raw_position = ball.position
-            old_position = self.convert_to_tile_position(ball.position)
-            ball_cell = self.cell_at(old_position.x, old_position.y)
-            self.cell_at(old_position.y, old_position.x,  EmptyCell())
+            old_position = self.convert_to_tile_position(ball.position, self._tile_position)
+            old_x = old_position.x
+            old_y = old_position.y
+            old_index = old_y * self._columns + old_x
+            # a ball's own cell is out of its way while it moves, but only
+            # goes in the grid's dirty rows if the ball ends up elsewhere
+            erased = self._cells[old_index] == BALL
+            if erased:
+                self._cells[old_index] = EMPTY
             ball.move()
-            new_raw_position = ball.position
-            if math.fabs(old_raw_position.x - new_raw_position.x) > 0.1 or math.fabs(old_raw_position.y - new_raw_position.y) > 0.1:
-                logger.debug('Moving ball from %s', old_raw_position)
-                logger.debug('Moving ball to %s', new_raw_position)
-            logger.debug('Ball at %s', new_raw_position)
-            new_position = self.convert_to_tile_position(ball.position)
-            self.cell_at(new_position.y, new_position.x, ball_cell)
+            if erased:
+                if self._cells[old_index] == EMPTY:
+                    self._cells[old_index] = BALL
+                else:
+                    erased = False          # something else took the cell meanwhile
+            if not self.is_ball_in_play(ball):
+                if erased:
+                    self.set_code_at(old_x, old_y, EMPTY)
+                continue
+            if tracing.enabled:
+                tracing.record(tracing.BALL_MOVED, ball_number, ball.position.x, ball.position.y)
+            if self._ball_hash is not None:
+                center = ball.center
+                self._ball_hash.place(ball_number, center.raw_x, center.raw_y)
+            new_position = self.convert_to_tile_position(ball.position, self._tile_position)
+            if new_position.x == old_x and new_position.y == old_y:
+                if not erased and self._cells[old_index] == EMPTY:
+                    self.set_code_at(old_x, old_y, BALL)
+                continue
+            if erased:
+                self.set_code_at(old_x, old_y, EMPTY)
+            if self.code_at(new_position.x, new_position.y) == EMPTY:
+                self.set_code_at(new_position.x, new_position.y, BALL)
 
 
     def launch(self):
+        if tracing.enabled:
+            tracing.record(tracing.LAUNCH, tracing.NO_SLOT, self._balls_remaining)
         self.clear_balls()
         self.add_and_enable_ball(Ball(self))
         self._in_play = True
 
-    def addBall(self, row, column, initial_velocity):
+    def add_ball(self, row, column, initial_velocity):
         self.add_and_enable_ball(Ball(self, column * self._scale, row * self._scale, initial_velocity))
 
     def add_and_enable_ball(self, ball):
-        for ball_number in range(MAX_BALLS_IN_PLAY):
+        for ball_number in range(self._max_balls):
             if self._balls[ball_number] is None:
                 self._balls[ball_number] = ball
+                if self._ball_hash is not None:
+                    center = ball.center
+                    self._ball_hash.place(ball_number, center.raw_x, center.raw_y)
                 ball_position = self.convert_to_tile_position(ball.position)
-                logger.debug('Ball x: %d, y: %d', ball_position.x, ball_position.y)
-                self.cell_at(ball_position.x, ball_position.y, BallCell(self, ball_position.y, ball_position.x))
+                if tracing.enabled:
+                    tracing.record(tracing.BALL_ADDED, ball_number, ball_position.x, ball_position.y)
+                if self.code_at(ball_position.x, ball_position.y) == EMPTY:
+                    self.set_code_at(ball_position.x, ball_position.y, BALL)
                 self._number_of_balls += 1
                 return
 
     @property
     def can_launch_another_ball(self):
-        return self._number_of_balls < MAX_BALLS_IN_PLAY
+        return self._number_of_balls < self._max_balls
 
-    def convert_to_tile_position(self, coord):
-        return coord.convert_to_tile_position(self._scale)
+    def convert_to_tile_position(self, coord, target=None):
+        return coord.convert_to_tile_position(self._scale, target)
 
     def dump(self):
         for row in range(self._rows-1, -1, -1):
@@ -0,0 +1,31 @@
+class Debouncer(object):
+    """Stand-in for adafruit_debouncer.Debouncer.
+
+    The scripted input is already clean, so every update takes the raw value
+    as the debounced state.
+    """
+
+    def __init__(self, io_or_predicate, interval=0.010):
+        if callable(io_or_predicate):
+            self._read = io_or_predicate
+        else:
+            self._read = lambda: io_or_predicate.value
+        self.interval = interval
+        self._state = bool(self._read())
+        self._previous = self._state
+
+    def update(self):
+        self._previous = self._state
+        self._state = bool(self._read())
+
+    @property
+    def value(self):
+        return self._state
+
+    @property
+    def rose(self):
+        return self._state and not self._previous
+
+    @property
+    def fell(self):
+        return self._previous and not self._state
@@ -0,0 +1,33 @@
+import simulator
+
+
+class MultiTrellis(object):
+
+    def __init__(self, neotrellis_array):
+        self._trelli = neotrellis_array
+        self._rows = len(neotrellis_array)
+        self._cols = len(neotrellis_array[0])
+        simulator.current().attach_trellis(self)
+
+    @property
+    def width(self):
+        return self._cols * 4
+
+    @property
+    def height(self):
+        return self._rows * 4
+
+    def color(self, x, y, color):
+        self._trelli[y // 4][x // 4].pixels[(y % 4) * 4 + x % 4] = color
+
+    def pixel(self, x, y):
+        return self._trelli[y // 4][x // 4].pixels[(y % 4) * 4 + x % 4]
+
+    def activate_key(self, x, y, edge, enable=True):
+        pass
+
+    def set_callback(self, x, y, function):
+        pass
+
+    def sync(self):
+        pass
@@ -0,0 +1,63 @@
+def _rgb(color):
+    """An (r, g, b) tuple for a color given as one, or packed as 0xRRGGBB
+    as the seesaw NeoPixel also takes"""
+    if isinstance(color, int):
+        return ((color >> 16) & 0xFF, (color >> 8) & 0xFF, color & 0xFF)
+    return tuple(color)
+
+
+class _Pixels(object):
+    """In-memory stand-in for the seesaw NeoPixel strip on a NeoTrellis.
+
+    Every pixel store and every show() counts as one bus transaction, the
+    same as on the hardware.
+    """
+
+    def __init__(self, i2c_bus, n=16):
+        self._i2c_bus = i2c_bus
+        self._buffer = [(0, 0, 0)] * n
+        self.auto_write = True
+        self.brightness = 1.0
+        self.shows = 0
+
+    def __len__(self):
+        return len(self._buffer)
+
+    def __getitem__(self, index):
+        return self._buffer[index]
+
+    def __setitem__(self, index, color):
+        self._buffer[index] = _rgb(color)
+        self._i2c_bus.transactions += 1
+        if self.auto_write:
+            self.show()
+
+    def fill(self, color):
+        for i in range(len(self._buffer)):
+            self._buffer[i] = _rgb(color)
+        self._i2c_bus.transactions += 1
+        if self.auto_write:
+            self.show()
+
+    def show(self):
+        self.shows += 1
+        self._i2c_bus.transactions += 1
+
+
+class NeoTrellis(object):
+
+    def __init__(self, i2c_bus, interrupt=False, addr=0x2E, drdy=None):
+        self.i2c_bus = i2c_bus
+        self.interrupt_enabled = interrupt
+        self.addr = addr
+        self.pixels = _Pixels(i2c_bus)
+        self.callbacks = [None] * 16
+
+    def activate_key(self, key, edge, enable=True):
+        pass
+
+    def set_callback(self, key, function):
+        self.callbacks[key] = function
+
+    def sync(self):
+        pass
@@ -0,0 +1,7 @@
+"""Pin names for the headless stand-ins; the values are only labels."""
+
+D5 = 'D5'
+D11 = 'D11'
+D12 = 'D12'
+SCL = 'SCL'
+SDA = 'SDA'
@@ -0,0 +1,10 @@
+class I2C(object):
+
+    def __init__(self, scl, sda, frequency=100000):
+        self.scl = scl
+        self.sda = sda
+        self.frequency = frequency
+        self.transactions = 0
+
+    def deinit(self):
+        pass
@@ -0,0 +1,28 @@
+import simulator
+
+
+class Direction(object):
+    INPUT = 'INPUT'
+    OUTPUT = 'OUTPUT'
+
+
+class Pull(object):
+    UP = 'UP'
+    DOWN = 'DOWN'
+
+
+class DigitalInOut(object):
+    """Reads the scripted button: pressed reads low, as with the pulled up
+    encoder switch."""
+
+    def __init__(self, pin):
+        self.pin = pin
+        self.direction = Direction.INPUT
+        self.pull = None
+
+    @property
+    def value(self):
+        return not simulator.current().read_button()
+
+    def deinit(self):
+        pass
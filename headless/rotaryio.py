@@ -0,0 +1,16 @@
+import simulator
+
+
+class IncrementalEncoder(object):
+
+    def __init__(self, pin_a, pin_b, divisor=4):
+        self.pin_a = pin_a
+        self.pin_b = pin_b
+        self.divisor = divisor
+
+    @property
+    def position(self):
+        return simulator.current().read_encoder()
+
+    def deinit(self):
+        pass
@@ -0,0 +1,124 @@
+"""Shared state for the headless hardware stand-ins.
+
+The modules in this directory shadow the CircuitPython hardware libraries
+(board, busio, digitalio, rotaryio, adafruit_debouncer, adafruit_neotrellis)
+so main.py can run unmodified on CPython.  They all talk to the simulator
+installed here, which supplies scripted input and collects the pixels the
+game pushes to the trellis.
+"""
+
+import random
+import time
+
+
+class SimulationComplete(Exception):
+    """Raised by the input stand-ins once the tick budget is used up."""
+    pass
+
+
+def press_every_read(sim):
+    """Button script: the button toggles on every read, so every wait for
+    `button.fell` completes within two updates."""
+    return sim.button_reads % 2 == 1
+
+
+def encoder_still(sim):
+    return 0
+
+
+def encoder_sweep(sim, span=12):
+    """Encoder script: sweep back and forth across the paddle's range."""
+    phase = sim.encoder_reads % (2 * span)
+    return phase if phase < span else 2 * span - phase
+
+
+def encoder_random(sim):
+    return sim.encoder_position + sim.random.choice((-1, 0, 1))
+
+
+ENCODER_SCRIPTS = {
+    'still': encoder_still,
+    'sweep': encoder_sweep,
+    'random': encoder_random,
+}
+
+
+class Simulator(object):
+
+    def __init__(self, button_script=press_every_read, encoder_script=encoder_still, max_button_reads=None,
+                 max_time_ns=None, max_wall_seconds=None, seed=0):
+        """
+        :param button_script: callable(sim) returning True while the button is pressed
+        :param encoder_script: callable(sim) returning the encoder position
+        :param max_button_reads: raise SimulationComplete after this many button reads (None for no limit)
+        :param max_time_ns: raise SimulationComplete once the simulated clock passes this (None for no limit)
+        :param max_wall_seconds: raise SimulationComplete from the input reads after this much real time
+        :param seed: seed for the simulator's own random source
+        """
+        self.button_script = button_script
+        self.encoder_script = encoder_script
+        self.max_button_reads = max_button_reads
+        self.max_time_ns = max_time_ns
+        self.deadline = None if max_wall_seconds is None else time.monotonic() + max_wall_seconds
+        self.time_ns = 0
+        self.random = random.Random(seed)
+        self.button_reads = 0
+        self.encoder_reads = 0
+        self.encoder_position = 0
+        self.trellis = None
+
+    def _check_deadline(self):
+        if self.deadline is not None and time.monotonic() >= self.deadline:
+            raise SimulationComplete()
+
+    def read_button(self):
+        self._check_deadline()
+        if self.max_button_reads is not None and self.button_reads >= self.max_button_reads:
+            raise SimulationComplete()
+        pressed = self.button_script(self)
+        self.button_reads += 1
+        return pressed
+
+    def read_encoder(self):
+        self._check_deadline()
+        self.encoder_position = self.encoder_script(self)
+        self.encoder_reads += 1
+        return self.encoder_position
+
+    def clock_ns(self):
+        """Simulated time.monotonic_ns; it only moves when the game sleeps."""
+        if self.max_time_ns is not None and self.time_ns >= self.max_time_ns:
+            raise SimulationComplete()
+        return self.time_ns
+
+    def sleep(self, seconds):
+        self.time_ns += max(1000, int(seconds * 1000000000))
+
+    def attach_trellis(self, trellis):
+        self.trellis = trellis
+
+    def render(self):
+        """Return the current trellis contents as rows of text, '.' for an
+        unlit pixel and '#' for a lit one."""
+        if self.trellis is None:
+            return []
+        lines = []
+        for y in range(self.trellis.height):
+            line = ''
+            for x in range(self.trellis.width):
+                line += '.' if self.trellis.pixel(x, y) == (0, 0, 0) else '#'
+            lines.append(line)
+        return lines
+
+
+_current = Simulator()
+
+
+def install(sim):
+    global _current
+    _current = sim
+    return sim
+
+
+def current():
+    return _current
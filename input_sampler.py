@@ -0,0 +1,119 @@
+"""Reading the encoder and button between physics ticks.
+
+sample is called at a fixed rate, well above the physics rate.  Each call
+reads the encoder and updates the button's debouncer, and anything that
+changed goes into a preallocated ring buffer as a timestamped event,
+overwriting the oldest if nobody has read them:
+
+    kind        value
+    TURNED      detents turned since the last sample, right if positive
+    PRESSED     0
+    RELEASED    0
+
+Timestamps are in microseconds and wrap at 2**32.  Alongside the events
+the sampler keeps running totals, so the game loop doesn't need to look at
+events at all: take_steps gives the detents turned since the last call,
+however many samples that spans, holding back any past what the paddle
+can move in a tick for the next, and take_presses the button presses.
+
+    sampler = InputSampler(encoder, button)
+    scheduler.add('input', INPUT_HZ, sampler.sample)
+    ...
+    paddle.move(sampler.take_steps())
+"""
+
+import time
+from array import array
+
+from paddle import MAX_STEPS
+
+TURNED = 1
+PRESSED = 2
+RELEASED = 3
+
+
+class InputSampler(object):
+
+    def __init__(self, encoder, button, size=32, clock=time.monotonic_ns):
+        """
+        :param encoder: anything with a position, e.g. rotaryio.IncrementalEncoder
+        :param button: a Debouncer, or anything with update, fell and rose
+        :param size: how many events the ring buffer holds
+        :param clock: returns nanoseconds; time.monotonic_ns unless given
+        """
+        self._encoder = encoder
+        self._button = button
+        self._clock = clock
+        self._last_position = encoder.position
+        self._kinds = bytearray(size)
+        self._values = array('h', [0] * size)
+        self._times = array('L', [0] * size)
+        self._size = size
+        self._next = 0
+        self._count = 0
+        self._steps = 0
+        self._presses = 0
+        self.samples = 0
+        self.overwritten = 0
+
+    def sample(self):
+        """Read the encoder and button, noting whatever changed"""
+        self.samples += 1
+        position = self._encoder.position
+        turned = position - self._last_position
+        if turned:
+            self._last_position = position
+            self._steps += turned
+            self._add(TURNED, max(-32768, min(32767, turned)))
+        button = self._button
+        button.update()
+        if button.fell:
+            self._presses += 1
+            self._add(PRESSED, 0)
+        elif button.rose:
+            self._add(RELEASED, 0)
+
+    def _add(self, kind, value):
+        at = self._next
+        self._kinds[at] = kind
+        self._values[at] = value
+        self._times[at] = (self._clock() // 1000) & 0xFFFFFFFF
+        at += 1
+        self._next = 0 if at == self._size else at
+        if self._count < self._size:
+            self._count += 1
+        else:
+            self.overwritten += 1
+
+    def take_steps(self, most=MAX_STEPS):
+        """The detents turned since the last call, right if positive, up to
+        most either way; any more are kept for the next call, so a spin too
+        fast for one tick's move still moves the paddle all the way"""
+        steps = max(-most, min(most, self._steps))
+        self._steps -= steps
+        return steps
+
+    def take_presses(self):
+        """How many times the button was pressed since the last call"""
+        presses = self._presses
+        self._presses = 0
+        return presses
+
+    @property
+    def pending(self):
+        """How many events haven't been read"""
+        return self._count
+
+    def next_event(self):
+        """The oldest unread event as (kind, value, microseconds), or None"""
+        if self._count == 0:
+            return None
+        at = (self._next - self._count) % self._size
+        self._count -= 1
+        return self._kinds[at], self._values[at], self._times[at]
+
+    def clear(self):
+        """Forget the unread events and the running totals, e.g. at a launch"""
+        self._count = 0
+        self._steps = 0
+        self._presses = 0
@@ -0,0 +1,195 @@
+"""Opt-in timing of each phase of the game loop.
+
+Nothing here is called unless instruments are attached: attaching wraps
+the board's and display's methods on those instances only, so a game
+that isn't being measured runs exactly the code it always did.
+
+Every sample goes into a fixed-size Histogram, so measuring doesn't
+allocate as the game runs.  Buckets are exact below 16 and then 8 to a
+doubling, so a percentile is good to within an eighth.  Phases are
+timed in microseconds; the per tick counts (collisions of each kind,
+cells changed) are plain numbers.
+
+    instruments = TickInstruments()
+    sample_input = instruments.timed('input', sample_input)
+    instruments.attach(board, display)
+    ...
+    for line in instruments.report():
+        print(line)
+"""
+
+import time
+from array import array
+
+SUB_BUCKETS = 8
+BUCKETS = 24 * SUB_BUCKETS      # up to 2**26, over a minute in microseconds
+
+COLLISION_KINDS = (('ball', 'check_for_and_handle_ball_collision'),
+                   ('bottom', 'check_for_and_handle_bottom_hit'),
+                   ('top', 'check_for_and_handle_top_hit'),
+                   ('left', 'check_for_and_handle_left_hit'),
+                   ('right', 'check_for_and_handle_right_hit'),
+                   ('corner', 'check_for_and_handle_corner_collision'))
+
+
+def bucket_for(value):
+    """The bucket a non-negative whole number goes in"""
+    if value < 2 * SUB_BUCKETS:
+        return value
+    shift = 0
+    while value >= 2 * SUB_BUCKETS:
+        value >>= 1
+        shift += 1
+    index = shift * SUB_BUCKETS + value
+    return index if index < BUCKETS else BUCKETS - 1
+
+
+def bucket_limit(index):
+    """The largest value that goes in a bucket"""
+    if index < 2 * SUB_BUCKETS:
+        return index
+    shift, top = divmod(index, SUB_BUCKETS)
+    return ((top + SUB_BUCKETS + 1) << (shift - 1)) - 1
+
+
+class Histogram(object):
+
+    def __init__(self, name, unit='us'):
+        """
+        :param name: label for reports
+        :param unit: what the samples count, for reports
+        """
+        self.name = name
+        self.unit = unit
+        self._buckets = array('L', [0] * BUCKETS)
+        self.count = 0
+        self.maximum = 0
+
+    def add(self, value):
+        self._buckets[bucket_for(value)] += 1
+        self.count += 1
+        if value > self.maximum:
+            self.maximum = value
+
+    def clear(self):
+        for i in range(BUCKETS):
+            self._buckets[i] = 0
+        self.count = 0
+        self.maximum = 0
+
+    def percentile(self, percent):
+        """A value that percent of the samples are at or below"""
+        wanted = (self.count * percent + 99) // 100
+        seen = 0
+        for index in range(BUCKETS):
+            seen += self._buckets[index]
+            if seen >= wanted:
+                return min(bucket_limit(index), self.maximum)
+        return 0
+
+    def report(self):
+        if self.count == 0:
+            return '{0}: no samples'.format(self.name)
+        return '{0}: {1} samples, p50 {2}, p99 {3}, max {4} {5}'.format(
+            self.name, self.count, self.percentile(50), self.percentile(99), self.maximum, self.unit).rstrip()
+
+
+class TickInstruments(object):
+    """Histograms of how long each phase of the game loop takes, and of
+    what happens on the board each physics tick."""
+
+    def __init__(self, clock=time.monotonic_ns):
+        """
+        :param clock: returns nanoseconds; time.monotonic_ns unless given
+        """
+        self._clock = clock
+        self.phases = []
+        self.collision_ns = 0
+        self.collision_counts = [0] * len(COLLISION_KINDS)
+        self.cells_changed = 0
+        self.collisions = Histogram('collisions')
+        self.kinds = [Histogram(kind + ' hits', '') for kind, _ in COLLISION_KINDS]
+        self.cells = Histogram('cells changed', '')
+
+    def phase(self, name):
+        """The histogram for a phase, made if need be"""
+        for histogram in self.phases:
+            if histogram.name == name:
+                return histogram
+        histogram = Histogram(name)
+        self.phases.append(histogram)
+        return histogram
+
+    def timed(self, name, function):
+        """function, wrapped to time each call as phase name"""
+        histogram = self.phase(name)
+        clock = self._clock
+
+        def timed_call(*args):
+            start = clock()
+            result = function(*args)
+            histogram.add((clock() - start) // 1000)
+            return result
+        return timed_call
+
+    def attach(self, board, display=None):
+        """Time the paddle update, ball movement and collision handling on
+        board, the display update if given, and count what each tick does"""
+        board.update_paddle = self.timed('paddle', board.update_paddle)
+        board.check_for_and_handle_collision = self._collision_timer(board.check_for_and_handle_collision)
+        for kind in range(len(COLLISION_KINDS)):
+            method = COLLISION_KINDS[kind][1]
+            setattr(board, method, self._hit_counter(kind, getattr(board, method)))
+        board.set_code_at = self._change_counter(board, board.set_code_at)
+        move_balls = self.timed('balls', board.move_balls)
+
+        def move_balls_then_end_tick():
+            move_balls()
+            self.end_tick()
+        board.move_balls = move_balls_then_end_tick
+        if display is not None:
+            display.update = self.timed('display', display.update)
+
+    def _collision_timer(self, check):
+        clock = self._clock
+
+        def timed_check(ball):
+            start = clock()
+            result = check(ball)
+            self.collision_ns += clock() - start
+            return result
+        return timed_check
+
+    def _hit_counter(self, kind, check):
+        counts = self.collision_counts
+
+        def counted_check(*args):
+            hit = check(*args)
+            if hit:
+                counts[kind] += 1
+            return hit
+        return counted_check
+
+    def _change_counter(self, board, set_code_at):
+        code_at = board.code_at
+
+        def counted_set(column, row, code):
+            if code_at(column, row) != code:
+                self.cells_changed += 1
+            set_code_at(column, row, code)
+        return counted_set
+
+    def end_tick(self):
+        """Put this tick's collision time and counts into their histograms"""
+        self.collisions.add(self.collision_ns // 1000)
+        self.collision_ns = 0
+        counts = self.collision_counts
+        for kind in range(len(counts)):
+            self.kinds[kind].add(counts[kind])
+            counts[kind] = 0
+        self.cells.add(self.cells_changed)
+        self.cells_changed = 0
+
+    def report(self):
+        """Lines giving p50 and p99 for every phase and per tick count"""
+        return [histogram.report() for histogram in self.phases + [self.collisions] + self.kinds + [self.cells]]
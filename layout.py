@@ -0,0 +1,71 @@
+"""How the NeoTrellis tiles making up the display are laid out.
+
+A layout is a grid of tiles, each given by its I2C address and how many
+quarter turns clockwise it's mounted at, so cables can be kept short.
+Display row 0 is the row nearest the paddle and tile row 0 holds it.  The
+board's playing field is the size of the display: one cell per key.
+"""
+
+NEOTRELLIS_SIZE = 4
+FIRST_ADDRESS = 0x2E
+
+
+class Layout(object):
+
+    def __init__(self, addresses, rotations=None, tile_size=NEOTRELLIS_SIZE, mirror_x=True):
+        """
+        :param addresses: rows of tile I2C addresses, starting with the row holding the paddle
+        :param rotations: rows of quarter turns clockwise for each tile; all 0 if not given
+        :param tile_size: the number of keys along a side of a tile
+        :param mirror_x: show board column 1 on the right hand side of the display
+        """
+        self.addresses = addresses
+        self.rotations = rotations or [[0] * len(row) for row in addresses]
+        self.tile_size = tile_size
+        self.mirror_x = mirror_x
+        self.tiles_across = len(addresses[0])
+        self.tiles_down = len(addresses)
+        for row in addresses:
+            if len(row) != self.tiles_across:
+                raise ValueError('Every row of tiles must be the same length')
+
+    @property
+    def columns(self):
+        """The width of the display and the board's field, in cells"""
+        return self.tiles_across * self.tile_size
+
+    @property
+    def rows(self):
+        """The height of the display and the board's field, in cells"""
+        return self.tiles_down * self.tile_size
+
+    def board_column(self, x):
+        """The board column shown at display column x"""
+        return self.columns - x if self.mirror_x else x + 1
+
+    def board_row(self, y):
+        """The board row shown at display row y"""
+        return y + 1
+
+    def pixel_index(self, tile_x, tile_y, x, y):
+        """Which of a tile's pixels shows (x, y) in the tile's own frame,
+        allowing for how the tile is mounted"""
+        last = self.tile_size - 1
+        turns = self.rotations[tile_y][tile_x] % 4
+        if turns == 1:
+            x, y = last - y, x
+        elif turns == 2:
+            x, y = last - x, last - y
+        elif turns == 3:
+            x, y = y, last - x
+        return y * self.tile_size + x
+
+
+def tile_grid(tiles_across, tiles_down, first_address=FIRST_ADDRESS):
+    """A layout of tiles numbered row by row from first_address up"""
+    return Layout([[first_address + row * tiles_across + column for column in range(tiles_across)]
+                   for row in range(tiles_down)])
+
+
+# the original 8x8 build
+DEFAULT_LAYOUT = Layout([[0x2F, 0x2E], [0x31, 0x30]])
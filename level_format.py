@@ -0,0 +1,124 @@
+"""Levels compiled to a compact binary form that loads straight into a
+Board's grid.
+
+A compiled level is a fixed size header followed by one cell type code per
+cell, a line at a time from the top of the field down, in the order
+levels.py lists them:
+
+    offset  size
+    0       4     b'BKLV'
+    4       1     format version
+    5       1     width in cells
+    6       1     height in cells (lines)
+    8       2     blocks that have to be cleared to finish the level
+    10      2     blocks of any kind
+    12      4     bounds of the blocks: first line, first column, last line,
+                  last column, all 0xFF if there are none
+    16      24    how many cells there are of each type, 2 bytes each
+    40            the codes
+
+Everything is little endian.  Compile once, on the desktop or at start up,
+and Board.load_level only has to copy bytes.
+
+    python level_format.py levels.bin
+"""
+
+import struct
+
+from cells import NUMBER_OF_CELL_TYPES, EMPTY, BLUE_BLOCK, RED_BLOCK, GREEN_BLOCK, BALL_BLOCK, block_code_for
+
+MAGIC = b'BKLV'
+VERSION = 1
+HEADER_FORMAT = '<4sBBBxHH4B{0}H'.format(NUMBER_OF_CELL_TYPES)
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+NO_BOUNDS = 0xFF
+
+_CLEARABLE = (BLUE_BLOCK, RED_BLOCK, GREEN_BLOCK, BALL_BLOCK)
+
+
+class LevelHeader(object):
+
+    def __init__(self, data):
+        """
+        :param data: a compiled level, or anything starting with one
+        """
+        fields = struct.unpack_from(HEADER_FORMAT, data, 0)
+        if fields[0] != MAGIC:
+            raise ValueError('Not a compiled level')
+        if fields[1] != VERSION:
+            raise ValueError('Compiled level format {0} is not supported'.format(fields[1]))
+        self.width = fields[2]
+        self.height = fields[3]
+        self.clearable_blocks = fields[4]
+        self.blocks = fields[5]
+        self.first_line, self.first_column, self.last_line, self.last_column = fields[6:10]
+        self.counts = fields[10:]
+
+    @property
+    def size(self):
+        """The length of the whole compiled level in bytes"""
+        return HEADER_SIZE + self.width * self.height
+
+    @property
+    def has_blocks(self):
+        return self.first_line != NO_BOUNDS
+
+
+def compile_level(lines):
+    """Compile a level given as strings, one per line, as in levels.py"""
+    height = len(lines)
+    width = len(lines[0]) if lines else 0
+    codes = bytearray(width * height)
+    counts = [0] * NUMBER_OF_CELL_TYPES
+    bounds = [NO_BOUNDS, NO_BOUNDS, 0, 0]
+    for line_number, line in enumerate(lines):
+        if len(line) != width:
+            raise ValueError('Line {0} of the level is {1} wide rather than {2}'.format(line_number, len(line), width))
+        for column, char in enumerate(line):
+            code = block_code_for(char)
+            codes[line_number * width + column] = code
+            counts[code] += 1
+            if code == EMPTY:
+                continue
+            if bounds[0] == NO_BOUNDS:
+                bounds[0] = line_number
+                bounds[1] = column
+            bounds[1] = min(bounds[1], column)
+            bounds[2] = line_number
+            bounds[3] = max(bounds[3], column)
+    if bounds[0] == NO_BOUNDS:
+        bounds = [NO_BOUNDS] * 4
+    clearable = sum(counts[code] for code in _CLEARABLE)
+    header = struct.pack(HEADER_FORMAT, MAGIC, VERSION, width, height, clearable, width * height - counts[EMPTY], *(bounds + counts))
+    return header + bytes(codes)
+
+
+def compile_levels(levels):
+    return [compile_level(lines) for lines in levels]
+
+
+_compiled = {}
+
+
+def compiled_level(number):
+    """Level `number` from levels.py, compiled the first time it's asked for"""
+    data = _compiled.get(number)
+    if data is None:
+        from levels import levels
+        data = compile_level(levels[number])
+        _compiled[number] = data
+    return data
+
+
+def main():
+    import sys
+    from levels import levels
+    path = sys.argv[1] if len(sys.argv) > 1 else 'levels.bin'
+    with open(path, 'wb') as f:
+        for data in compile_levels(levels):
+            f.write(data)
+    print('Wrote {0} levels to {1}'.format(len(levels), path))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,162 @@
+"""Level packs: many compiled levels in one file, read a level at a time.
+
+    offset  size
+    0       4       b'BKLP'
+    4       1       format version
+    6       2       the number of levels, n
+    8       4(n+1)  where each compiled level (see level_format) starts,
+                    from the start of the file, then where the last one ends
+
+Everything is little endian.  Only the index is read when a pack is
+opened.  A level is read when it's first asked for, from a memory map on
+CPython and with seek and readinto into a reused buffer elsewhere, and the
+last few levels read are kept.  Board.set_up_level asks for the next level
+to be prefetched, which the game loop does while waiting for a launch.
+
+    python level_pack.py levels.pack
+"""
+
+import struct
+
+from level_format import compile_levels
+
+MAGIC = b'BKLP'
+VERSION = 1
+HEADER_FORMAT = '<4sBxH'
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+
+try:
+    import mmap
+except ImportError:
+    mmap = None
+
+
+def write_pack(path, compiled_levels):
+    """Write compiled levels out as a pack"""
+    offset = HEADER_SIZE + 4 * (len(compiled_levels) + 1)
+    offsets = []
+    for data in compiled_levels:
+        offsets.append(offset)
+        offset += len(data)
+    offsets.append(offset)
+    with open(path, 'wb') as f:
+        f.write(struct.pack(HEADER_FORMAT, MAGIC, VERSION, len(compiled_levels)))
+        f.write(struct.pack('<{0}I'.format(len(offsets)), *offsets))
+        for data in compiled_levels:
+            f.write(data)
+
+
+class LevelPack(object):
+
+    def __init__(self, path, cache_size=2, memory_map=True):
+        """
+        :param path: the pack file
+        :param cache_size: how many levels to keep once read
+        :param memory_map: map the file where mmap is available, rather than reading it
+        """
+        self._file = open(path, 'rb')
+        magic, version, count = struct.unpack(HEADER_FORMAT, self._file.read(HEADER_SIZE))
+        if magic != MAGIC:
+            raise ValueError('{0} is not a level pack'.format(path))
+        if version != VERSION:
+            raise ValueError('Level pack format {0} is not supported'.format(version))
+        self._count = count
+        self._index = self._file.read(4 * (count + 1))
+        self._map = None
+        if memory_map and mmap is not None:
+            try:
+                self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            except (AttributeError, OSError, ValueError):
+                self._map = None
+        self._cache_size = cache_size
+        self._cache = []      # [number, data, buffer], most recently used first
+        self._spare = []      # buffers of evicted levels, for reuse
+        self._wanted = None
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return self._count
+
+    def _span(self, number):
+        if number < 0 or number >= self._count:
+            raise IndexError('There is no level {0}'.format(number))
+        return struct.unpack_from('<II', self._index, 4 * number)
+
+    def level(self, number):
+        """Compiled level `number`.  Levels come back as views that are only
+        good until the level drops out of the cache, so load it straight
+        away."""
+        cache = self._cache
+        for position in range(len(cache)):
+            entry = cache[position]
+            if entry[0] == number:
+                if position:
+                    del cache[position]
+                    cache.insert(0, entry)
+                self.hits += 1
+                return entry[1]
+        self.misses += 1
+        return self._read(number)
+
+    def _read(self, number):
+        start, end = self._span(number)
+        length = end - start
+        buffer = None
+        if self._map is not None:
+            data = self._map[start:end]
+        else:
+            for i in range(len(self._spare)):
+                if len(self._spare[i]) >= length:
+                    buffer = self._spare.pop(i)
+                    break
+            if buffer is None:
+                buffer = bytearray(length)
+            data = memoryview(buffer)[:length]
+            self._file.seek(start)
+            self._file.readinto(data)
+        self._cache.insert(0, [number, data, buffer])
+        while len(self._cache) > self._cache_size:
+            evicted = self._cache.pop()
+            if evicted[2] is not None:
+                self._spare.append(evicted[2])
+        return data
+
+    def is_cached(self, number):
+        for entry in self._cache:
+            if entry[0] == number:
+                return True
+        return False
+
+    def prefetch(self, number):
+        """Ask for a level to be read by the next call to service"""
+        if 0 <= number < self._count and not self.is_cached(number):
+            self._wanted = number
+
+    def service(self):
+        """Read the level asked for by prefetch, if any.  Call this when
+        there's time to spare, e.g. while waiting for a launch."""
+        number = self._wanted
+        self._wanted = None
+        if number is not None and not self.is_cached(number):
+            self._read(number)
+
+    def close(self):
+        self._cache = []
+        self._spare = []
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
+
+
+def main():
+    import sys
+    from levels import levels
+    path = sys.argv[1] if len(sys.argv) > 1 else 'levels.pack'
+    write_pack(path, compile_levels(levels))
+    print('Wrote {0} levels to {1}'.format(len(levels), path))
+
+
+if __name__ == '__main__':
+    main()
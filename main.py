@@ -1,3 +1,5 @@
+import os
+import random
 import time
 
 import rotaryio
@@ -6,65 +8,142 @@ from adafruit_debouncer import Debouncer
 
 from board import D5, D11, D12
 from paddle import Paddle
+from input_sampler import InputSampler
+from predictor import Autopilot
 import neotrellis_display
+from compositor import Compositor
+from layout import DEFAULT_LAYOUT
 from game_board import Board
+from level_pack import LevelPack
+from scheduler import Scheduler
+from replay import InputRecorder
+from vector import use_quantized_angles
+from instrumentation import TickInstruments
+import tracing
 
 import adafruit_logging as logging
 logger = logging.getLogger('breakout')
 #logger.setLevel(logging.INFO)
 
+PHYSICS_HZ = 30
+INPUT_HZ = 100
+DISPLAY_HZ = 30           # the trellis can only be read every 17 millisecons or so
+MAX_PHYSICS_CATCH_UP = 4
+LEVEL_PACK = 'levels.pack'
+LAYOUT = DEFAULT_LAYOUT
+BRIGHTNESS = 1.0
+LEVEL = 0
+RECORD_TO = os.getenv('BREAKOUT_RECORD')     # a path to record the game to, e.g. from settings.toml
+PROFILE = os.getenv('BREAKOUT_PROFILE')      # set to time each phase of the loop
+TRACE_TO = os.getenv('BREAKOUT_TRACE')       # a path to save the last TRACE_RECORDS board events to
+TRACE_RECORDS = 256
+QUANTIZED_ANGLES = os.getenv('BREAKOUT_QUANTIZED_ANGLES')   # set to do the float trig with 512 step tables
+AUTOPILOT = os.getenv('BREAKOUT_AUTOPILOT')  # set to have the paddle play itself and launch without the button
+
 encoder = rotaryio.IncrementalEncoder(D11, D12)
-last_position = encoder.position
 
 switch = DigitalInOut(D5)
 switch.direction = Direction.INPUT
 switch.pull = Pull.UP
 button = Debouncer(switch)
+sampler = InputSampler(encoder, button)
+
+paddle = Paddle(8, field_columns=LAYOUT.columns)
 
-paddle = Paddle(8)
+if TRACE_TO:
+    tracing.enable(TRACE_RECORDS)
+if QUANTIZED_ANGLES:
+    use_quantized_angles()
 
-board = Board(8, 8, 8, paddle)
-display = neotrellis_display.Adapter(8)
+try:
+    level_pack = LevelPack(LEVEL_PACK)
+except OSError:
+    level_pack = None               # fall back on levels.py
+
+board = Board(8, LAYOUT.rows, LAYOUT.columns, paddle, seed=random.getrandbits(32), level_pack=level_pack)
+compositor = Compositor(BRIGHTNESS)
+display = neotrellis_display.Adapter(8, LAYOUT, compositor)
 
 board.reset_game()
-board.set_up_level(0)
+board.set_up_level(LEVEL)
+compositor.fade_in()
 display.update(board)
+recorder = InputRecorder(board, LEVEL, level_pack) if RECORD_TO else None
+autopilot = Autopilot(board, paddle) if AUTOPILOT else None
 
 board.dump()
 
-logger.debug('Starting game')
-while not board.is_game_over:
-    #the trellis can only be read every 17 millisecons or so
-    #    trellis.sync()
-    display.update(board)
 
-    logger.debug('Waiting for launch')
-    button.update()
-    # wait for the encoder button to be pushed, then launch a ball & start the round
-    while not button.fell:
-        button.update()
-    logger.debug('Launching a ball')
-    board.launch()
+sample_input = sampler.sample
+
+
+def physics_tick():
+    steps = sampler.take_steps()
+    if autopilot is not None:
+        steps = autopilot.steps()
+    if recorder is not None:
+        recorder.tick(steps)
+    paddle.move(steps)
+    board.update_paddle()
+    board.move_balls()
+
+
+def refresh_display():
     display.update(board)
 
-    while board.is_still_in_play:
 
-        button.update()
-        while not button.fell:
-            button.update()
+instruments = None
+if PROFILE:
+    instruments = TickInstruments()
+    sample_input = instruments.timed('input', sample_input)
+    instruments.attach(board, display)
 
+scheduler = Scheduler()
+scheduler.add('input', INPUT_HZ, sample_input)
+scheduler.add('physics', PHYSICS_HZ, physics_tick, max_catch_up=MAX_PHYSICS_CATCH_UP)
+scheduler.add('display', DISPLAY_HZ, refresh_display)
 
-        position = encoder.position
-        if position == last_position:
-            paddle.stop()
-        else:
-            if position > last_position:
-                paddle.move_right()
-            else:
-                paddle.move_left()
+logger.debug('Starting game')
+try:
+    while not board.is_game_over:
+        display.update(board)
 
-        board.update_paddle()
-        board.move_balls()
+        logger.debug('Waiting for launch')
+        if level_pack is not None:
+            level_pack.service()
+        sampler.clear()
+        # wait for the encoder button to be pushed, then launch a ball & start the round,
+        # letting any fades and flashes run out meanwhile
+        next_frame_ns = time.monotonic_ns()
+        while not sampler.take_presses():
+            sampler.sample()
+            if compositor.animating:
+                if time.monotonic_ns() >= next_frame_ns:
+                    display.update(board)
+                    next_frame_ns += 1000000000 // DISPLAY_HZ
+            elif autopilot is not None:
+                break
+        logger.debug('Launching a ball')
+        if recorder is not None:
+            recorder.launch()
+        board.launch()
+        sampler.clear()             # turns while waiting don't carry into the round
         display.update(board)
 
-        last_position = position
+        scheduler.reset()
+        scheduler.run_while(lambda: board.is_still_in_play)
+finally:
+    if TRACE_TO:
+        # whatever stopped the game, keep what led up to it
+        tracing.save(TRACE_TO)
+    if recorder is not None:
+        recorder.save(RECORD_TO, board)
+        if board.is_game_over:
+            logger.info('Recorded %d ticks to %s', recorder.ticks, RECORD_TO)
+        else:
+            logger.warning('The game was cut short; recorded the %d ticks played to %s', recorder.ticks, RECORD_TO)
+    for line in scheduler.report():
+        logger.info(line)
+    if instruments is not None:
+        for line in instruments.report():
+            logger.info(line)
@@ -0,0 +1,145 @@
+"""asyncio version of main.py.
+
+Input sampling, physics and display flushes are separate tasks that
+talk through events.  The encoder and button are sampled at INPUT_HZ the
+whole time, between flushes too; waiting for a launch costs only that
+polling, as physics and the display sleep until they're needed.
+Works with CircuitPython's asyncio library and with CPython; copy it to
+code.py on the device to use it.  Set BREAKOUT_RECORD to record a game,
+as with main.py.
+"""
+
+import asyncio
+import os
+import random
+import time
+
+import rotaryio
+from digitalio import DigitalInOut, Direction, Pull
+from adafruit_debouncer import Debouncer
+
+from board import D5, D11, D12
+from paddle import Paddle
+from input_sampler import InputSampler
+import neotrellis_display
+from compositor import Compositor
+from layout import DEFAULT_LAYOUT
+from game_board import Board
+from level_pack import LevelPack
+from replay import InputRecorder
+
+import adafruit_logging as logging
+logger = logging.getLogger('breakout')
+#logger.setLevel(logging.INFO)
+
+PHYSICS_HZ = 30
+INPUT_HZ = 200
+DISPLAY_HZ = 30           # the trellis can only be read every 17 millisecons or so
+MAX_PHYSICS_LAG_NS = 4 * 1000000000 // PHYSICS_HZ
+LEVEL_PACK = 'levels.pack'
+LAYOUT = DEFAULT_LAYOUT
+BRIGHTNESS = 1.0
+LEVEL = 0
+RECORD_TO = os.getenv('BREAKOUT_RECORD')     # a path to record the game to, e.g. from settings.toml
+
+encoder = rotaryio.IncrementalEncoder(D11, D12)
+
+switch = DigitalInOut(D5)
+switch.direction = Direction.INPUT
+switch.pull = Pull.UP
+button = Debouncer(switch)
+sampler = InputSampler(encoder, button)
+
+paddle = Paddle(8, field_columns=LAYOUT.columns)
+
+try:
+    level_pack = LevelPack(LEVEL_PACK)
+except OSError:
+    level_pack = None               # fall back on levels.py
+
+board = Board(8, LAYOUT.rows, LAYOUT.columns, paddle, seed=random.getrandbits(32), level_pack=level_pack)
+compositor = Compositor(BRIGHTNESS)
+display = neotrellis_display.Adapter(8, LAYOUT, compositor)
+
+board.reset_game()
+board.set_up_level(LEVEL)
+compositor.fade_in()
+display.update(board)
+recorder = InputRecorder(board, LEVEL, level_pack) if RECORD_TO else None
+
+board.dump()
+
+
+async def sample_input(launch_requested):
+    while not board.is_game_over:
+        sampler.sample()
+        if sampler.take_presses():
+            launch_requested.set()
+        await asyncio.sleep(1 / INPUT_HZ)
+
+
+def physics_tick():
+    steps = sampler.take_steps()
+    if recorder is not None:
+        recorder.tick(steps)
+    paddle.move(steps)
+    board.update_paddle()
+    board.move_balls()
+
+
+async def run_physics(launch_requested, frame_ready):
+    period_ns = 1000000000 // PHYSICS_HZ
+    while not board.is_game_over:
+        logger.debug('Waiting for launch')
+        if level_pack is not None:
+            level_pack.service()
+        launch_requested.clear()
+        await launch_requested.wait()
+        logger.debug('Launching a ball')
+        if recorder is not None:
+            recorder.launch()
+        board.launch()
+        sampler.clear()             # turns while waiting don't carry into the round
+        frame_ready.set()
+        next_tick_ns = time.monotonic_ns()
+        while board.is_still_in_play:
+            physics_tick()
+            frame_ready.set()
+            next_tick_ns += period_ns
+            delay_ns = next_tick_ns - time.monotonic_ns()
+            if delay_ns < -MAX_PHYSICS_LAG_NS:
+                # too far behind to catch up; drop the missed ticks
+                next_tick_ns = time.monotonic_ns()
+                delay_ns = 0
+            await asyncio.sleep(max(0, delay_ns) / 1000000000)
+    frame_ready.set()
+
+
+async def refresh_display(frame_ready):
+    while not board.is_game_over:
+        if not compositor.animating:
+            await frame_ready.wait()
+        frame_ready.clear()
+        display.update(board)
+        await asyncio.sleep(1 / DISPLAY_HZ)
+    display.update(board)
+
+
+async def play():
+    launch_requested = asyncio.Event()
+    frame_ready = asyncio.Event()
+    logger.debug('Starting game')
+    await asyncio.gather(sample_input(launch_requested),
+                         run_physics(launch_requested, frame_ready),
+                         refresh_display(frame_ready))
+
+
+try:
+    asyncio.run(play())
+finally:
+    if recorder is not None:
+        recorder.save(RECORD_TO, board)
+        if board.is_game_over:
+            logger.info('Recorded %d ticks to %s', recorder.ticks, RECORD_TO)
+        else:
+            logger.warning('The game was cut short; recorded the %d ticks played to %s', recorder.ticks, RECORD_TO)
@@ -3,6 +3,7 @@ from board import SCL, SDA
 import busio
 from adafruit_neotrellis.neotrellis import NeoTrellis
 from adafruit_neotrellis.multitrellis import MultiTrellis
+from layout import DEFAULT_LAYOUT
 
 #some color definitions
 OFF = (0, 0, 0)
@@ -16,24 +17,141 @@ PURPLE = (180, 0, 255)
 PADDLE = (0, 255, 0)
 
 class Adapter(object):
+    """Pushes the board to the grid of NeoTrellis tiles a Layout describes.
 
-    def __init__(self, scale):
+    Only the rows the board has marked dirty are looked at.  The cell type
+    shown on every key is kept, so each update only writes the pixels that
+    changed, with auto write off, followed by a single show() for each tile
+    that was touched.  Which board cell and which pixel each key maps to is
+    worked out once per board, row by row.
+    """
+
+    def __init__(self, scale, layout=DEFAULT_LAYOUT, compositor=None):
+        """
+        :param scale: the number of points in a cell
+        :param layout: the tiles making up the display
+        :param compositor: a Compositor to take colors from, rather than the board's palette
+        """
         self._scale = scale
+        self._layout = layout
+        self._compositor = compositor
         i2c_bus = busio.I2C(SCL, SDA)
-        trelli = [
-            [NeoTrellis(i2c_bus, False, addr=0x2F), NeoTrellis(i2c_bus, False, addr=0x2E)],
-            [NeoTrellis(i2c_bus, False, addr=0x31), NeoTrellis(i2c_bus, False, addr=0x30)]
-        ]
+        self._trelli = [[NeoTrellis(i2c_bus, False, addr=address) for address in row] for row in layout.addresses]
+
+        self._trellis = MultiTrellis(self._trelli)
+        self._width = layout.columns
+        self._height = layout.rows
+        self._shadow = bytearray(self._width * self._height)     # all EMPTY, i.e. unlit
+        self._board = None
+        self._tiles = []
+        self._rows = []
+        self._written = []
+        self._colors = []
+        self.reset_counters()
+        for tile_row in self._trelli:
+            for tile in tile_row:
+                tile.pixels.auto_write = False
+                tile.pixels.fill(OFF)
+                tile.pixels.show()
 
-        self._trellis = MultiTrellis(trelli)
-        for y in range(8):
-            for x in range(8):
-                self._trellis.color(x, y, OFF)
-#                time.sleep(.05)
+    def reset_counters(self):
+        self.frames = 0
+        self.pixels_written = 0
+        self.tiles_shown = 0
+        self.bus_transactions = 0
 
+    def _attach(self, board):
+        """Map the board's rows to the keys showing them: for every row, the
+        tile, shadow index, grid index and pixel of each of its keys."""
+        layout = self._layout
+        if board.columns != layout.columns + 2 or board.rows != layout.rows + 2:
+            raise ValueError('The board is not the size of the display')
+        size = layout.tile_size
+        rows = [([], [], [], []) for _ in range(board.rows)]
+        self._tiles = []
+        key = 0
+        for tile_y in range(layout.tiles_down):
+            for tile_x in range(layout.tiles_across):
+                tile = len(self._tiles)
+                for y in range(size):
+                    for x in range(size):
+                        column = layout.board_column(tile_x * size + x)
+                        row = layout.board_row(tile_y * size + y)
+                        tiles, keys, cell_indexes, pixel_indexes = rows[row]
+                        tiles.append(tile)
+                        keys.append(key)
+                        cell_indexes.append(row * board.columns + column)
+                        pixel_indexes.append(layout.pixel_index(tile_x, tile_y, x, y))
+                        key += 1
+                self._tiles.append(self._trelli[tile_y][tile_x].pixels)
+        self._rows = [row if row[0] else None for row in rows]
+        self._written = [0] * len(self._tiles)
+        self._colors = board.palette
+        self._board = board
+        board.mark_all_rows_dirty()
 
     def update(self, board):
-        for x in range(8):
-            for y in range(8):
-                #print('{0} {1}: {2} '.format(row, col, cells[row + 1][col + 1].color))
-                self._trellis.color(x, y, board.cell_at(8 - x, y + 1).color)
+        """Draw the rows of the board that changed since the last update"""
+        if board is not self._board:
+            self._attach(board)
+        self.frames += 1
+        if self._compositor is not None:
+            self._compositor.render(board)
+            self._draw_composited(self._compositor)
+        else:
+            self._draw_cells(board)
+        self._show_written()
+
+    def _draw_cells(self, board):
+        cells = board.cells
+        dirty = board.dirty_rows
+        shadow = self._shadow
+        colors = self._colors
+        tile_pixels = self._tiles
+        written = self._written
+        for row in range(len(dirty)):
+            if not dirty[row]:
+                continue
+            dirty[row] = 0
+            keys_in_row = self._rows[row]
+            if keys_in_row is None:
+                continue
+            tiles, keys, cell_indexes, pixel_indexes = keys_in_row
+            for i in range(len(keys)):
+                code = cells[cell_indexes[i]]
+                if shadow[keys[i]] != code:
+                    shadow[keys[i]] = code
+                    tile_pixels[tiles[i]][pixel_indexes[i]] = colors[code]
+                    written[tiles[i]] += 1
+
+    def _draw_composited(self, compositor):
+        frame = compositor.frame
+        changed = compositor.changed
+        dirty = compositor.dirty_rows
+        tile_pixels = self._tiles
+        written = self._written
+        for row in range(len(dirty)):
+            if not dirty[row]:
+                continue
+            dirty[row] = 0
+            keys_in_row = self._rows[row]
+            if keys_in_row is None:
+                continue
+            tiles, keys, cell_indexes, pixel_indexes = keys_in_row
+            for i in range(len(keys)):
+                index = cell_indexes[i]
+                if changed[index]:
+                    changed[index] = 0
+                    tile_pixels[tiles[i]][pixel_indexes[i]] = frame[index]
+                    written[tiles[i]] += 1
+
+    def _show_written(self):
+        tile_pixels = self._tiles
+        written = self._written
+        for tile in range(len(written)):
+            if written[tile]:
+                tile_pixels[tile].show()
+                self.pixels_written += written[tile]
+                self.tiles_shown += 1
+                self.bus_transactions += written[tile] + 1
+                written[tile] = 0
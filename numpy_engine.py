@@ -0,0 +1,396 @@
+"""Ball simulation on NumPy arrays, for headless stress and balancing runs.
+
+Board moves its balls one at a time through Ball, Coordinate and Vector
+objects, which is what the hardware wants but tops out at a handful of
+balls.  NumpyEngine takes a Board's grid, paddle and balls and keeps
+positions, velocities and collision boxes for any number of balls in
+arrays, moving them and checking them against the grid a whole batch at a
+time.
+
+Collision checks follow Board.check_for_and_handle_collision stage by
+stage: ball against ball, then the bottom, top, left and right cells, then
+the corner cell the ball is heading into, with the first hit winning.
+While no more balls are in play than a Board allows, balls are stepped one
+after another in slot order, exactly as Board.move_balls does, and a game
+plays out the same on both.  Past that every ball moves at once, so two
+balls hitting one block in the same tick both bounce off it and both score.
+
+CPython only; this isn't meant for the board itself.
+"""
+
+import numpy as np
+
+from ball import BALL_SIZE, COLLISION_MARGIN
+from cells import (EMPTY, OUT_OF_BOUNDS, PADDLE, BALL, TOP_WALL, LEFT_WALL, RIGHT_WALL, BLUE_BLOCK, RED_BLOCK,
+                   GREEN_BLOCK, SOLID_BLOCK, BALL_BLOCK, NUMBER_OF_CELL_TYPES)
+from game_board import MAX_BALLS_IN_PLAY
+from physics import FloatPhysics
+from rng import XorShift32
+from vector import vector_from_components
+
+_REMOVABLE = (BLUE_BLOCK, RED_BLOCK, GREEN_BLOCK)
+_SPECIAL = (OUT_OF_BOUNDS, PADDLE, BALL_BLOCK)
+
+
+class NumpyEngine(object):
+
+    def __init__(self, board, capacity=MAX_BALLS_IN_PLAY):
+        """
+        :param board: a float physics Board to take the grid, paddle and balls from; it isn't changed
+        :param capacity: the most balls that can be in play at once
+        """
+        if board.physics.units_per_point != 1:
+            raise ValueError('NumpyEngine only runs the float physics')
+        self._paddle = board.paddle
+        # a generator of its own, carrying on from where the board's is
+        rng = XorShift32()
+        rng.state = board.physics.rng.state
+        self._physics = FloatPhysics(rng)
+        self._scale = board.scale
+        self._columns = board.columns
+        self._rows = board.rows
+        self._width = board.width
+        self._height = board.height
+        self._score = board.score
+        self._balls_remaining = board.balls_remaining
+        self._number_of_balls = 0
+        self._in_play = board.is_still_in_play
+        self.capacity = capacity
+        self.ball_ticks = 0
+        self.grid = np.frombuffer(bytes(board.cells), dtype=np.uint8).copy()
+
+        self.x = np.zeros(capacity)
+        self.y = np.zeros(capacity)
+        self.vx = np.zeros(capacity)
+        self.vy = np.zeros(capacity)
+        self.top = np.zeros(capacity, dtype=np.int64)
+        self.left = np.zeros(capacity, dtype=np.int64)
+        self.bottom = np.zeros(capacity, dtype=np.int64)
+        self.right = np.zeros(capacity, dtype=np.int64)
+        self.active = np.zeros(capacity, dtype=bool)
+
+        self._build_cell_tables(board)
+        for slot, ball in enumerate(board.balls):
+            if ball is None:
+                continue
+            self.x[slot] = ball.position.raw_x
+            self.y[slot] = ball.position.raw_y
+            self.vx[slot] = ball.velocity.x
+            self.vy[slot] = ball.velocity.y
+            box = ball.bounding_box
+            self.top[slot] = box.top
+            self.left[slot] = box.left
+            self.bottom[slot] = box.bottom
+            self.right[slot] = box.right
+            self.active[slot] = True
+            self._number_of_balls += 1
+
+    def _build_cell_tables(self, board):
+        """Per cell type lookups: orientation, score and, for the cells that
+        don't fill their own tile, the bounding box."""
+        self._vertical = np.zeros(NUMBER_OF_CELL_TYPES, dtype=bool)
+        self._horizontal = np.zeros(NUMBER_OF_CELL_TYPES, dtype=bool)
+        self._tile_cell = np.zeros(NUMBER_OF_CELL_TYPES, dtype=bool)
+        self._value = np.zeros(NUMBER_OF_CELL_TYPES, dtype=np.int64)
+        self._box_top = np.zeros(NUMBER_OF_CELL_TYPES, dtype=np.int64)
+        self._box_left = np.zeros(NUMBER_OF_CELL_TYPES, dtype=np.int64)
+        self._box_bottom = np.full(NUMBER_OF_CELL_TYPES, -1, dtype=np.int64)
+        self._box_right = np.full(NUMBER_OF_CELL_TYPES, -1, dtype=np.int64)
+        for code in range(1, NUMBER_OF_CELL_TYPES):
+            cell = board.cell_type(code)
+            self._vertical[code] = cell.is_vertical
+            self._horizontal[code] = cell.is_horizontal
+        for code in (BALL, BLUE_BLOCK, RED_BLOCK, GREEN_BLOCK, SOLID_BLOCK, BALL_BLOCK):
+            self._tile_cell[code] = True
+        for code in (BLUE_BLOCK, RED_BLOCK, GREEN_BLOCK, SOLID_BLOCK):
+            self._value[code] = board.cell_type(code).value
+        for code in (OUT_OF_BOUNDS, TOP_WALL, LEFT_WALL, RIGHT_WALL):
+            box = board.cell_type(code).bounding_box_at(0, 0)
+            self._box_top[code] = box.top
+            self._box_left[code] = box.left
+            self._box_bottom[code] = box.bottom
+            self._box_right[code] = box.right
+        self._set_paddle_box()
+
+    def _set_paddle_box(self):
+        x = self._paddle.position.x
+        self._box_top[PADDLE] = self._scale
+        self._box_left[PADDLE] = x
+        self._box_bottom[PADDLE] = self._scale * 2 - 1
+        self._box_right[PADDLE] = x + self._paddle.width - 1
+
+    @property
+    def score(self):
+        return self._score
+
+    @property
+    def number_of_balls(self):
+        return self._number_of_balls
+
+    @property
+    def balls_remaining(self):
+        return self._balls_remaining
+
+    @property
+    def is_still_in_play(self):
+        return self._in_play
+
+    @property
+    def is_game_over(self):
+        return self._balls_remaining == 0
+
+    @property
+    def can_launch_another_ball(self):
+        return self._number_of_balls < self.capacity
+
+    def code_at(self, x, y):
+        return int(self.grid[y * self._columns + x])
+
+    def set_code_at(self, x, y, code):
+        self.grid[y * self._columns + x] = code
+
+    def update_paddle(self):
+        row = self.grid[self._columns + 1:2 * self._columns - 1]
+        row[row == PADDLE] = EMPTY
+        x = self._paddle.position.x // self._scale
+        for offset in range(self._paddle.width // self._scale):
+            self.set_code_at(int(x + offset), 1, PADDLE)
+        self._set_paddle_box()
+
+    def clear_balls(self):
+        self.active[:] = False
+        self._number_of_balls = 0
+
+    def launch(self):
+        self.clear_balls()
+        velocity = self._physics.launch_velocity(self._scale)
+        self.add_ball(self._paddle.position.x + (self._paddle.width // 2) - (BALL_SIZE // 2), self._scale * 3 - 1,
+                      velocity.x, velocity.y)
+        self._in_play = True
+
+    def add_ball(self, x, y, vx, vy):
+        """Put a ball in the first free slot.  Like a new Ball it has no
+        collision box until it first moves.  Returns the slot, or None if
+        there's no room."""
+        free = np.flatnonzero(~self.active)
+        if len(free) == 0:
+            return None
+        slot = int(free[0])
+        self.x[slot] = x
+        self.y[slot] = y
+        self.vx[slot] = vx
+        self.vy[slot] = vy
+        self.top[slot] = self.left[slot] = self.bottom[slot] = self.right[slot] = 0
+        self.active[slot] = True
+        column = int(x // self._scale)
+        row = int(y // self._scale)
+        if self.code_at(column, row) == EMPTY:
+            self.set_code_at(column, row, BALL)
+        self._number_of_balls += 1
+        return slot
+
+    def went_out_of_bounds(self, slot):
+        if not self.active[slot]:
+            return
+        self.active[slot] = False
+        self._number_of_balls -= 1
+        if self._number_of_balls == 0:
+            self._balls_remaining -= 1
+            self._in_play = False
+
+    def move_balls(self):
+        """Move every ball one tick.  Up to a Board's worth of balls are
+        moved one after another, as Board.move_balls does, so a ball added
+        to a later slot moves in the same tick; past that they all move at
+        once."""
+        if self._number_of_balls > MAX_BALLS_IN_PLAY:
+            self._step(np.flatnonzero(self.active))
+            return
+        for slot in range(self.capacity):
+            if self.active[slot]:
+                self._step(np.array([slot]))
+
+    def _tiles_of(self, idx):
+        scale = self._scale
+        return (self.y[idx] // scale).astype(np.int64) * self._columns + (self.x[idx] // scale).astype(np.int64)
+
+    def _step(self, idx):
+        self.ball_ticks += len(idx)
+        old = self._tiles_of(idx)
+        self.grid[old[self.grid[old] == BALL]] = EMPTY
+
+        x = np.clip(self.x[idx] + self.vx[idx], 0, self._width - BALL_SIZE)
+        y = np.clip(self.y[idx] + self.vy[idx], BALL_SIZE - 1, self._height - 1)
+        self.x[idx] = x
+        self.y[idx] = y
+        # positions are never negative, so floor is Coordinate's int()
+        x = np.floor(x).astype(np.int64)
+        y = np.floor(y).astype(np.int64)
+        self.top[idx] = y - (BALL_SIZE - 1) + COLLISION_MARGIN
+        self.left[idx] = x + COLLISION_MARGIN
+        self.bottom[idx] = y - COLLISION_MARGIN
+        self.right[idx] = x + (BALL_SIZE - 1) - COLLISION_MARGIN
+
+        self._collide(idx)
+
+        idx = idx[self.active[idx]]
+        new = self._tiles_of(idx)
+        self.grid[new[self.grid[new] == EMPTY]] = BALL
+
+    def _collide(self, idx):
+        pending = ~self._ball_collisions(idx)
+        scale = self._scale
+        top = self.top[idx]
+        left = self.left[idx]
+        bottom = self.bottom[idx]
+        right = self.right[idx]
+        top_row = top // scale
+        bottom_row = bottom // scale
+        left_column = left // scale
+        right_column = right // scale
+        middle_column = (left + right) // (2 * scale)
+        middle_row = (top + bottom) // (2 * scale)
+        vx = self.vx[idx]
+        vy = self.vy[idx]
+        vertical = np.ones(len(idx), dtype=bool)
+
+        for columns, rows, on_side, heading in ((middle_column, bottom_row, False, vy >= 0.0),
+                                                (middle_column, top_row, False, vy <= 0.0),
+                                                (left_column, middle_row, True, vx <= 0.0),
+                                                (right_column, middle_row, True, vx >= 0.0)):
+            pending &= ~self._hit_stage(idx, pending & heading, columns, rows, vertical if on_side else ~vertical)
+            if not pending.any():
+                return
+
+        up = -vy >= np.abs(vx)
+        down = vy >= np.abs(vx)
+        heading_left = -vx >= np.abs(vy)
+        heading_right = vx >= np.abs(vy)
+        branches = (up & (vx < 0.0), up & (vx > 0.0), down & (vx < 0.0), down & (vx > 0.0),
+                    heading_left & (vy < 0.0), heading_left & (vy > 0.0),
+                    heading_right & (vy < 0.0), heading_right & (vy > 0.0))
+        columns = np.select(branches, (left_column, right_column, left_column, right_column,
+                                       left_column, left_column, right_column, right_column))
+        rows = np.select(branches, (top_row, top_row, bottom_row, bottom_row, top_row, bottom_row, top_row, bottom_row))
+        on_side = np.select(branches, (True,) * 4 + (False,) * 4, False)
+        self._hit_stage(idx, pending & np.logical_or.reduce(branches), columns, rows, on_side)
+
+    def _hit_stage(self, idx, candidates, columns, rows, on_side):
+        """Hit the candidates against the cell at (columns, rows) if its box
+        overlaps theirs and it faces the way they'd hit it.  Returns which
+        were hit."""
+        if not candidates.any():
+            return candidates
+        codes = self.grid[rows * self._columns + columns]
+        scale = self._scale
+        tile = self._tile_cell[codes]
+        cell_top = np.where(tile, rows * scale, self._box_top[codes])
+        cell_left = np.where(tile, columns * scale, self._box_left[codes])
+        cell_bottom = np.where(tile, rows * scale + (scale - 1), self._box_bottom[codes])
+        cell_right = np.where(tile, columns * scale + (scale - 1), self._box_right[codes])
+        hit = candidates & (codes != EMPTY) & np.where(on_side, self._vertical[codes], self._horizontal[codes])
+        hit &= ~((self.top[idx] > cell_bottom) | (self.bottom[idx] < cell_top) |
+                 (self.left[idx] > cell_right) | (self.right[idx] < cell_left))
+        if hit.any():
+            self._process_hits(idx[hit], codes[hit], columns[hit], rows[hit], on_side[hit])
+        return hit
+
+    def _process_hits(self, balls, codes, columns, rows, on_side):
+        """Cell.process_hit then the reflection, for a batch of hits."""
+        removed = np.isin(codes, _REMOVABLE)
+        self.grid[rows[removed] * self._columns + columns[removed]] = EMPTY
+        self._score += int(self._value[codes].sum())
+
+        special = np.flatnonzero(np.isin(codes, _SPECIAL))
+        for i in special:
+            slot = int(balls[i])
+            code = codes[i]
+            if code == OUT_OF_BOUNDS:
+                self.went_out_of_bounds(slot)
+            elif code == BALL_BLOCK:
+                self._hit_ball_block(slot, int(columns[i]), int(rows[i]))
+            elif code == PADDLE:
+                v = vector_from_components(float(self.vx[slot]), float(self.vy[slot]))
+                v.flip_y()
+                self._paddle.add_velocity_to(v)
+                self.vx[slot] = v.x
+                self.vy[slot] = v.y
+
+        side = balls[on_side]
+        self.vx[side] = -self.vx[side]
+        flat = balls[~on_side & (codes != PADDLE)]
+        self.vy[flat] = -self.vy[flat]
+
+    def _hit_ball_block(self, slot, column, row):
+        if self.can_launch_another_ball:
+            self.set_code_at(column, row, EMPTY)
+            self._score += 20
+        velocity = self._physics.transferred_velocity(vector_from_components(float(self.vx[slot]),
+                                                                             float(self.vy[slot])))
+        self.add_ball(column * self._scale, row * self._scale, velocity.x, velocity.y)
+
+    def _ball_collisions(self, idx):
+        """FloatPhysics.handle_ball_collision for each ball in idx against
+        the first ball in play it's touching.  Returns which of idx hit one."""
+        others = np.flatnonzero(self.active)
+        if len(others) < 2:
+            return np.zeros(len(idx), dtype=bool)
+        center_x = (self.left + self.right) / 2.0
+        center_y = (self.top + self.bottom) / 2.0
+        # Coordinate.vector_difference truncates the other point
+        dx = center_x[idx][:, None] - np.floor(center_x[others])[None, :]
+        dy = center_y[idx][:, None] - np.floor(center_y[others])[None, :]
+        touching = np.sqrt(dx * dx + dy * dy) <= BALL_SIZE
+        touching &= ~(self.vx[idx][:, None] * dx + self.vy[idx][:, None] * dy > 0.0)
+        touching &= others[None, :] != idx[:, None]
+        collided = touching.any(axis=1)
+        if not collided.any():
+            return collided
+
+        first = touching.argmax(axis=1)[collided]
+        ball1 = idx[collided]
+        ball2 = others[first]
+        # when both balls of a pair find each other, exchange once
+        partner = np.full(self.capacity, -1)
+        partner[ball1] = ball2
+        keep = ~((partner[ball2] == ball1) & (ball2 < ball1))
+        ball1 = ball1[keep]
+        ball2 = ball2[keep]
+
+        n12x, n12y = self._unit_difference(center_x, center_y, ball1, ball2)
+        d1 = n12x * self.vx[ball1] + n12y * self.vy[ball1]
+        p1x = n12x * d1
+        p1y = n12y * d1
+        n21x, n21y = self._unit_difference(center_x, center_y, ball2, ball1)
+        d2 = n21x * self.vx[ball2] + n21y * self.vy[ball2]
+        p2x = n21x * d2
+        p2y = n21y * d2
+        np.add.at(self.vx, ball1, p2x - p1x)
+        np.add.at(self.vy, ball1, p2y - p1y)
+        np.add.at(self.vx, ball2, p1x - p2x)
+        np.add.at(self.vy, ball2, p1y - p2y)
+        self._clip_speeds(np.union1d(ball1, ball2), 0.5, 2.0)
+        return collided
+
+    @staticmethod
+    def _unit_difference(center_x, center_y, a, b):
+        x = center_x[a] - np.floor(center_x[b])
+        y = center_y[a] - np.floor(center_y[b])
+        magnitude = np.sqrt(x * x + y * y)
+        magnitude[magnitude == 0.0] = 1.0
+        return x / magnitude, y / magnitude
+
+    def _clip_speeds(self, balls, low, high):
+        """Vector.clip_magnitude_between on each ball's velocity"""
+        x = self.vx[balls]
+        y = self.vy[balls]
+        magnitude = np.sqrt(x * x + y * y)
+        stopped = magnitude == 0.0
+        with np.errstate(divide='ignore'):
+            scale = np.where(magnitude < low, low / magnitude, np.where(magnitude > high, high / magnitude, 1.0))
+        scale[stopped] = 1.0
+        x = x * scale
+        y = y * scale
+        x[stopped] = low
+        self.vx[balls] = x
+        self.vy[balls] = y
@@ -2,18 +2,36 @@ from math import pi
 from vector import Vector
 from coordinate import Coordinate
 
+POINTS_PER_STEP = 4         # how far the paddle moves for each encoder detent
+MAX_STEPS = 4               # the most detents a tick's move goes by
+
+
+def clip_steps(steps):
+    """steps, limited to what a single tick's move allows"""
+    return max(-MAX_STEPS, min(MAX_STEPS, steps))
+
+
 class Paddle(object):
 
-    moving_left = Vector(0.0, 4)
-    moving_right = Vector(pi, 4)
+    # moves[MAX_STEPS + steps] is the velocity of a move by steps detents, right if positive
+    moves = tuple(Vector(pi if steps > 0 else 0.0, POINTS_PER_STEP * abs(steps))
+                  for steps in range(-MAX_STEPS, MAX_STEPS + 1))
+    moving_left = moves[MAX_STEPS - 1]
+    moving_right = moves[MAX_STEPS + 1]
     stopped = Vector(0.0, 0.0)
 
-    def __init__(self, scale, width=0):
+    def __init__(self, scale, width=0, field_columns=8):
+        """
+        :param scale: the number of points in a cell
+        :param width: the paddle's width in points; two cells if not given
+        :param field_columns: the width of the playing field in cells
+        """
         self._scale = scale
         if width == 0:
             width = scale * 2
         self._width = width
-        self._position = Coordinate(40 - (width / 2), 8)
+        self._right_limit = (field_columns + 1) * scale - width
+        self._position = Coordinate((field_columns // 2 + 1) * scale - (width / 2), 8)
         self._velocity = Paddle.stopped
 
     @property
@@ -27,7 +45,7 @@ class Paddle(object):
     def _move_by(self, v):
         self._velocity = v
         self._position.move_by(v)
-        self._position.clip_x(self._scale, 9 * self._scale - self._width)
+        self._position.clip_x(self._scale, self._right_limit)
         self._position.clip_y(0, 0)
 
     def move_left(self):
@@ -36,6 +54,15 @@ class Paddle(object):
     def move_right(self):
         self._move_by(Paddle.moving_right)
 
+    def move(self, steps):
+        """Move by however many detents the encoder turned since the last
+        tick, up to MAX_STEPS, right if steps is positive, so the paddle
+        keeps up with a fast spin; its velocity goes with the distance"""
+        if steps == 0:
+            self.stop()
+        else:
+            self._move_by(Paddle.moves[MAX_STEPS + clip_steps(steps)])
+
     def stop(self):
         self._velocity = Paddle.stopped
 
@@ -0,0 +1,115 @@
+"""Number representations for ball motion.
+
+A Board holds one of these and Ball asks it for positions and velocities,
+so the same game code runs on floats or on integer fixed point.
+"""
+
+from math import pi
+from coordinate import Coordinate
+from vector import Vector, vector_from_components
+from fixed_point import ONE, SHIFT, FixedCoordinate, FixedVector, fixed_vector_from_polar_512, isqrt
+from ball import BALL_SIZE
+
+
+class FloatPhysics(object):
+    """Positions and velocities as floats, in board points.
+
+    Random angles come from the board's generator rather than the random
+    module, so a game can be replayed from its seed.
+    """
+
+    units_per_point = 1
+
+    def __init__(self, rng):
+        self._rng = rng
+
+    @property
+    def rng(self):
+        return self._rng
+
+    def new_coordinate(self, x, y):
+        return Coordinate(x, y)
+
+    def launch_velocity(self, scale):
+        return Vector((pi / 4) + self._rng.random() * (pi / 8) - pi / 16, scale / 2)
+
+    def transferred_velocity(self, velocity):
+        angle = self._rng.random() * 3.14 - 1.57
+        magnitude = self._rng.random() - 0.5
+        return velocity + Vector(angle, magnitude)
+
+    def handle_ball_collision(self, ball1, ball2):
+        c1 = ball1.center
+        c2 = ball2.center
+        dx = c1.raw_x - c2.x
+        dy = c1.raw_y - c2.y
+        if dx * dx + dy * dy > BALL_SIZE * BALL_SIZE:         #not touching
+            return False
+        v1 = ball1.velocity
+        if v1.x * dx + v1.y * dy > 0.0:         # already moving apart
+            return False
+        n12 = vector_from_components(dx, dy)
+        n12.normalize()
+        projection_onto_n12_of_v1 = n12 * n12.dot(ball1.velocity)
+        n21 = ball2.center.vector_difference(ball1.center)
+        n21.normalize()
+        projection_onto_n21_of_v2 = n21 * n21.dot(ball2.velocity)
+        ball1.add_to_velocity(projection_onto_n21_of_v2 - projection_onto_n12_of_v1)
+        ball2.add_to_velocity(projection_onto_n12_of_v1 - projection_onto_n21_of_v2)
+        return True
+
+
+class FixedPointPhysics(object):
+    """Positions and velocities as integers in 1/ONE of a board point.
+
+    Random launch angles come from the board's integer generator, so a
+    given seed plays out the same way on every platform.
+    """
+
+    units_per_point = ONE
+
+    def __init__(self, rng):
+        self._rng = rng
+
+    @property
+    def rng(self):
+        return self._rng
+
+    def new_coordinate(self, x, y):
+        return FixedCoordinate(x, y)
+
+    def launch_velocity(self, scale):
+        # pi/4 +/- pi/16, as on the float path
+        return fixed_vector_from_polar_512(32 + self._rng.randbelow(64), scale * ONE // 2)
+
+    def transferred_velocity(self, velocity):
+        extra = fixed_vector_from_polar_512(self._rng.randbelow(256) - 128, self._rng.randbelow(ONE) - ONE // 2)
+        return velocity + extra
+
+    def handle_ball_collision(self, ball1, ball2):
+        # every ball has the same box, so the difference between positions
+        # is the difference between centres
+        p1 = ball1.position
+        p2 = ball2.position
+        dx = p1.raw_x - p2.raw_x
+        dy = p1.raw_y - p2.raw_y
+        distance_squared = dx * dx + dy * dy
+        if distance_squared > (BALL_SIZE * ONE) * (BALL_SIZE * ONE):
+            return False
+        v1 = ball1.velocity
+        v2 = ball2.velocity
+        if v1.raw_x * dx + v1.raw_y * dy > 0:
+            return False
+        distance = isqrt(distance_squared)
+        if distance == 0:
+            return False
+        nx = (dx << SHIFT) // distance
+        ny = (dy << SHIFT) // distance
+        s1 = (nx * v1.raw_x + ny * v1.raw_y) >> SHIFT
+        s2 = (nx * v2.raw_x + ny * v2.raw_y) >> SHIFT
+        exchange = FixedVector(((s2 - s1) * nx) >> SHIFT, ((s2 - s1) * ny) >> SHIFT)
+        ball1.add_to_velocity(exchange)
+        exchange.flip_x()
+        exchange.flip_y()
+        ball2.add_to_velocity(exchange)
+        return True
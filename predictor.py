@@ -0,0 +1,168 @@
+"""Where a ball will reach the paddle, worked out rather than simulated,
+and an autopilot that steers the paddle there.
+
+Stepping a copy of the board forward to see where a ball lands costs a
+whole tick of collision checks for every tick ahead.  The predictor works
+it out from the ball's position and velocity instead.  Bouncing off a
+side wall only flips the ball's x velocity, so the ball's x at any time is
+where it would be with no walls, folded back into the field like light
+between two mirrors; that is a multiply and a modulo however many times
+it bounces.  Going up or down, the predictor visits the rows the ball's
+leading edge crosses, working out x where it enters each and looking at
+the cells the ball's box covers there.  A block or the top wall turns the
+ball around and the walk carries on the other way, until the ball
+reaches the paddle's row or MAX_BOUNCES is used up.
+
+That is a few cell lookups per row, so it is cheap enough to run every
+tick on the device.  It's not exact: blocks hit on their sides partway
+through a row, other balls and the spin the paddle gives aren't allowed
+for.  An autopilot asking again every tick corrects itself as the ball
+gets nearer.
+"""
+
+from ball import BALL_SIZE, COLLISION_MARGIN
+from cells import EMPTY, BALL, BLUE_BLOCK, RED_BLOCK, GREEN_BLOCK, BALL_BLOCK
+from paddle import POINTS_PER_STEP, clip_steps
+
+MAX_BOUNCES = 4
+
+_CENTER = (BALL_SIZE - 1) / 2.0                         # from a ball's x to the middle of its box
+_HALF_WIDTH = (BALL_SIZE - 1) / 2.0 - COLLISION_MARGIN  # from the middle of the box to its sides
+_LOW_EDGE = BALL_SIZE - 1 - COLLISION_MARGIN            # from a ball's y down to the box's edge nearest the paddle
+_HEIGHT = BALL_SIZE - 1 - 2 * COLLISION_MARGIN          # from that edge up to the far one
+_PADDLE_ROW = 1
+_REMOVABLE = (BLUE_BLOCK, RED_BLOCK, GREEN_BLOCK, BALL_BLOCK)
+
+
+class LandingPredictor(object):
+
+    def __init__(self, board):
+        """
+        :param board: the board whose balls are to be predicted
+        """
+        self._board = board
+        self._scale = board.scale
+        self._columns = board.columns
+        self._last_column = board.columns - 2
+        self._units = board.physics.units_per_point
+        # the range the middle of a ball's box stays in between the side walls
+        self._low_x = board.scale + _HALF_WIDTH
+        self._high_x = (board.columns - 1) * board.scale - 1 - _HALF_WIDTH
+        self._removed = [0] * MAX_BOUNCES
+        # the last prediction
+        self.x = None
+        self.ticks = 0.0
+
+    def fold(self, x):
+        """Where the middle of a ball that would be at x with no side walls
+        really is"""
+        low = self._low_x
+        span = self._high_x - low
+        x = (x - low) % (2 * span)
+        if x > span:
+            x = 2 * span - x
+        return low + x
+
+    def predict(self, ball):
+        """Where the middle of ball will be across the field when it reaches
+        the paddle's row, or None if it can't be worked out.  The number of
+        ticks until then is left in ticks."""
+        units = self._units
+        position = ball.position
+        velocity = ball.velocity
+        x = position.raw_x / units + _CENTER
+        low = position.raw_y / units - _LOW_EDGE
+        vx = velocity.raw_x / units
+        vy = velocity.raw_y / units
+        scale = self._scale
+        elapsed = 0.0
+        removed = 0
+        self.x = None
+        if vy == 0:
+            return None
+        for _ in range(MAX_BOUNCES + 1):
+            if vy < 0:
+                row = int(low // scale)
+                while True:
+                    t = (low - row * scale) / -vy
+                    row -= 1
+                    if row <= _PADDLE_ROW:
+                        self.ticks = elapsed + t
+                        self.x = self.fold(x + vx * t)
+                        return self.x
+                    index = self._obstacle(self.fold(x + vx * t), row, removed)
+                    if index:
+                        break
+                low = (row + 1) * scale
+            else:
+                row = int((low + _HEIGHT) // scale)
+                while True:
+                    t = ((row + 1) * scale - (low + _HEIGHT)) / vy
+                    row += 1
+                    index = self._obstacle(self.fold(x + vx * t), row, removed)
+                    if index:
+                        break
+                low = row * scale - _HEIGHT
+            # the walls only fold x, so x carries on unfolded through the bounce
+            x += vx * t
+            elapsed += t
+            vy = -vy
+            if index > 0 and removed < MAX_BOUNCES:
+                self._removed[removed] = index
+                removed += 1
+        return None
+
+    def _obstacle(self, x, row, removed):
+        """Whether the box with its middle at x meets anything in row: 0 if
+        not, the cell's index if it's a block that'll be knocked out, -1 if
+        it's something else"""
+        scale = self._scale
+        first = max(1, int((x - _HALF_WIDTH) // scale))
+        last = min(self._last_column, int((x + _HALF_WIDTH) // scale))
+        cells = self._board.cells
+        start = row * self._columns
+        for index in range(start + first, start + last + 1):
+            code = cells[index]
+            if code == EMPTY or code == BALL:
+                continue
+            if code not in _REMOVABLE:
+                return -1
+            for i in range(removed):
+                if self._removed[i] == index:
+                    break
+            else:
+                return index
+        return 0
+
+
+class Autopilot(object):
+    """Steers the paddle under whichever ball will reach it first."""
+
+    def __init__(self, board, paddle):
+        """
+        :param board: the board being played
+        :param paddle: the paddle to steer
+        """
+        self._board = board
+        self._paddle = paddle
+        self._predictor = LandingPredictor(board)
+        self._rest_x = board.width / 2.0
+        self.target = self._rest_x
+
+    def steps(self):
+        """The encoder steps that move the paddle towards the next landing,
+        or back to the middle if nothing is coming down"""
+        predictor = self._predictor
+        target = None
+        soonest = 0.0
+        for ball in self._board.balls:
+            if ball is None:
+                continue
+            x = predictor.predict(ball)
+            if x is not None and (target is None or predictor.ticks < soonest):
+                target = x
+                soonest = predictor.ticks
+        self.target = self._rest_x if target is None else target
+        # moving right takes the paddle towards smaller x
+        offset = self._paddle.position.x + self._paddle.width / 2.0 - self.target
+        return clip_steps(int(offset / POINTS_PER_STEP))
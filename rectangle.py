@@ -4,12 +4,21 @@ from coordinate import Coordinate
 
 class Rectangle(object):
 
+    __slots__ = ('_top', '_left', '_bottom', '_right')
+
     def __init__(self, top, left, bottom, right):
         self._top = top
         self._left = left
         self._bottom = bottom
         self._right = right
 
+    def set_bounds(self, top, left, bottom, right):
+        self._top = top
+        self._left = left
+        self._bottom = bottom
+        self._right = right
+        return self
+
     @property
     def top(self):
         return self._top
@@ -24,7 +33,7 @@ class Rectangle(object):
 
     @left.setter
     def left(self, new_left):
-        self._top = new_left
+        self._left = new_left
 
     @property
     def bottom(self):
@@ -48,7 +57,10 @@ class Rectangle(object):
 
     @property
     def bottom_center(self):
-        return Coordinate((self._left + self._right) / 2, self._bottom)
+        return self.bottom_center_into(Coordinate(0, 0))
+
+    def bottom_center_into(self, target):
+        return target.set((self._left + self._right) / 2, self._bottom)
 
     @property
     def bottom_right(self):
@@ -60,7 +72,10 @@ class Rectangle(object):
 
     @property
     def top_center(self):
-        return Coordinate((self._left + self._right) / 2, self._top)
+        return self.top_center_into(Coordinate(0, 0))
+
+    def top_center_into(self, target):
+        return target.set((self._left + self._right) / 2, self._top)
 
     @property
     def top_right(self):
@@ -68,15 +83,24 @@ class Rectangle(object):
 
     @property
     def middle_left(self):
-        return Coordinate(self._left, (self._top + self._right) / 2)
+        return self.middle_left_into(Coordinate(0, 0))
+
+    def middle_left_into(self, target):
+        return target.set(self._left, (self._top + self._bottom) / 2)
 
     @property
     def middle_right(self):
-        return Coordinate(self._right, (self._top + self._right) / 2)
+        return self.middle_right_into(Coordinate(0, 0))
+
+    def middle_right_into(self, target):
+        return target.set(self._right, (self._top + self._bottom) / 2)
 
     @property
     def center(self):
-        return Coordinate((self._left + self._right) / 2, (self._top + self._bottom) / 2)
+        return self.center_into(Coordinate(0, 0))
+
+    def center_into(self, target):
+        return target.set((self._left + self._right) / 2, (self._top + self._bottom) / 2)
 
     def is_empty(self):
         return (self._top > self._bottom) or (self._left > self._right)
@@ -104,6 +128,8 @@ class Rectangle(object):
 
 class EmptyRectangle(Rectangle):
 
+    __slots__ = ()
+
     def __init__(self):
         Rectangle.__init__(self, 0, 0, 0, 0)
 
@@ -111,7 +137,7 @@ class EmptyRectangle(Rectangle):
         return True
 
     def __or__(self, r):
-        return other_rect
+        return r
 
     def __and__(self, r):
         return self
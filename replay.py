@@ -0,0 +1,260 @@
+"""Recording games and playing them back.
+
+A game is fully determined by the board's settings, its seed, the level
+and what the player did on each physics tick, so that's all a recording
+holds:
+
+    offset  size
+    0       4     b'BKRC'
+    4       1     format version
+    5       1     flags: 1 fixed point, 2 swept collisions, 4 quantized angles
+    6       1     field columns
+    7       1     field rows
+    8       4     seed
+    12      2     level
+    16      4     physics ticks
+    20      4     game_hash of the board at the end
+    24      4     level_hash of the compiled level played
+    28            runs of ticks: an input byte then how many ticks in a row
+                  had it, up to 255
+
+An input byte is the paddle's move (0 stopped, 1 right, 2 left), plus 4 if
+a ball was launched just before the tick, plus 8 times the detents moved
+beyond the first, up to paddle.MAX_STEPS - 1.  Version 1 recordings, from
+before the paddle moved by more than a detent a tick, never have those
+bits set and replay as they always did.  Recordings before version 3
+have no level hash, so they can't be checked against the level they're
+replayed on.  Everything is little endian.
+
+Replaying skips the display and the clock, so it runs as fast as the CPU
+allows, and checks the board ends up as it did when recorded.  Games
+played from a level pack are replayed from the same pack:
+
+    python replay.py games/*.rec
+    python replay.py --pack levels.pack games/*.rec
+"""
+
+import struct
+
+import vector
+from level_format import compiled_level
+from paddle import clip_steps
+
+HEADER_FORMAT = '<4sBBBBIHxxIII'
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+_V2_HEADER_FORMAT = '<4sBBBBIHxxII'
+_V2_HEADER_SIZE = struct.calcsize(_V2_HEADER_FORMAT)
+MAGIC = b'BKRC'
+VERSION = 3
+
+FIXED_POINT = 1
+SWEPT_COLLISIONS = 2
+QUANTIZED_ANGLES = 4
+
+STOPPED = 0
+RIGHT = 1
+LEFT = 2
+LAUNCH = 4
+_MOVE = 3
+_EXTRA_STEPS_SHIFT = 3
+
+SCALE = 8
+
+
+def game_hash(board):
+    """FNV-1a over the grid, score, balls left and ball positions.  Float
+    positions go in to 1/256 of a point."""
+    h = 0x811C9DC5
+    for value in board.cells:
+        h ^= value
+        h = (h * 0x01000193) & 0xFFFFFFFF
+    values = [board.score, board.balls_remaining]
+    for ball in board.balls:
+        if ball is not None:
+            values.append(ball.position.raw_x)
+            values.append(ball.position.raw_y)
+    for value in values:
+        if isinstance(value, float):
+            value = int(value * 256)
+        for shift in (0, 8, 16, 24):
+            h ^= (value >> shift) & 0xFF
+            h = (h * 0x01000193) & 0xFFFFFFFF
+    return h
+
+
+def level_hash(data):
+    """FNV-1a over a compiled level"""
+    h = 0x811C9DC5
+    for value in data:
+        h ^= value
+        h = (h * 0x01000193) & 0xFFFFFFFF
+    return h
+
+
+def level_data(level, level_pack=None):
+    """The compiled level, from level_pack if one's given, else levels.py"""
+    if level_pack is None:
+        return compiled_level(level)
+    return level_pack.level(level)
+
+
+class InputRecorder(object):
+    """Notes what the player does, a physics tick at a time."""
+
+    def __init__(self, board, level=0, level_pack=None):
+        """
+        :param board: the board being played, before the first launch
+        :param level: the level it was set up with
+        :param level_pack: the LevelPack the board takes its levels from, if any
+        """
+        self._flags = (FIXED_POINT if board.fixed_point else 0) | (SWEPT_COLLISIONS if board.swept_collisions else 0)
+        if vector.quantized_angles():
+            self._flags |= QUANTIZED_ANGLES
+        self._columns = board.columns - 2
+        self._rows = board.rows - 2
+        self._seed = board.seed
+        self._level = level
+        self._level_hash = level_hash(level_data(level, level_pack))
+        self._runs = bytearray()
+        self._launched = False
+        self.ticks = 0
+
+    def launch(self):
+        self._launched = True
+
+    def tick(self, steps):
+        """Record a physics tick, with the paddle moving steps detents,
+        right if steps is positive, left if it's negative"""
+        steps = clip_steps(steps)
+        code = RIGHT if steps > 0 else LEFT if steps < 0 else STOPPED
+        if steps:
+            code |= (abs(steps) - 1) << _EXTRA_STEPS_SHIFT
+        if self._launched:
+            code |= LAUNCH
+            self._launched = False
+        runs = self._runs
+        if runs and runs[-2] == code and runs[-1] < 255:
+            runs[-1] += 1
+        else:
+            runs.append(code)
+            runs.append(1)
+        self.ticks += 1
+
+    def save(self, path, board):
+        """Write the recording out, with the hash of the board as it is now"""
+        with open(path, 'wb') as f:
+            f.write(struct.pack(HEADER_FORMAT, MAGIC, VERSION, self._flags, self._columns, self._rows,
+                                self._seed & 0xFFFFFFFF, self._level, self.ticks, game_hash(board),
+                                self._level_hash))
+            f.write(self._runs)
+
+
+class Recording(object):
+
+    def __init__(self, data):
+        magic, version, flags, columns, rows, seed, level, ticks, final_hash = struct.unpack_from(_V2_HEADER_FORMAT,
+                                                                                                  data, 0)
+        if magic != MAGIC:
+            raise ValueError('Not a game recording')
+        if version > VERSION:
+            raise ValueError('Recording format {0} is not supported'.format(version))
+        if version < 3:
+            self.level_hash = None
+            self.runs = data[_V2_HEADER_SIZE:]
+        else:
+            self.level_hash = struct.unpack_from(HEADER_FORMAT, data, 0)[-1]
+            self.runs = data[HEADER_SIZE:]
+        self.fixed_point = bool(flags & FIXED_POINT)
+        self.swept_collisions = bool(flags & SWEPT_COLLISIONS)
+        self.quantized_angles = bool(flags & QUANTIZED_ANGLES)
+        self.columns = columns
+        self.rows = rows
+        self.seed = seed
+        self.level = level
+        self.ticks = ticks
+        self.final_hash = final_hash
+
+    @staticmethod
+    def load(path):
+        with open(path, 'rb') as f:
+            return Recording(f.read())
+
+
+def replay(recording, level_pack=None):
+    """Play a recording through on a fresh board and return the board.
+    Raises ValueError if the level isn't the one the game was played on.
+
+    :param recording: the Recording to play
+    :param level_pack: the LevelPack the game took its levels from, if any
+    """
+    from game_board import Board
+    from paddle import Paddle
+
+    data = level_data(recording.level, level_pack)
+    if recording.level_hash is not None and level_hash(data) != recording.level_hash:
+        raise ValueError('Level {0} is not the one the game was played on'.format(recording.level))
+
+    quantized = vector.quantized_angles()
+    vector.use_quantized_angles(recording.quantized_angles)
+    try:
+        paddle = Paddle(SCALE, field_columns=recording.columns)
+        board = Board(SCALE, recording.rows, recording.columns, paddle, fixed_point=recording.fixed_point,
+                      seed=recording.seed, swept_collisions=recording.swept_collisions)
+        board.reset_game()
+        board.load_level(data)
+        runs = recording.runs
+        for i in range(0, len(runs), 2):
+            code = runs[i]
+            move = code & _MOVE
+            steps = (code >> _EXTRA_STEPS_SHIFT) + 1
+            if move == LEFT:
+                steps = -steps
+            elif move != RIGHT:
+                steps = 0
+            for _ in range(runs[i + 1]):
+                if code & LAUNCH:
+                    board.launch()
+                paddle.move(steps)
+                board.update_paddle()
+                board.move_balls()
+    finally:
+        vector.use_quantized_angles(quantized)
+    return board
+
+
+def main():
+    import argparse
+    import sys
+    import time
+
+    parser = argparse.ArgumentParser(description='Play game recordings back and check they end as they did')
+    parser.add_argument('--pack', help='the level pack the games were played from, if not levels.py')
+    parser.add_argument('paths', nargs='+', metavar='recording')
+    args = parser.parse_args()
+    level_pack = None
+    if args.pack:
+        from level_pack import LevelPack
+        level_pack = LevelPack(args.pack)
+
+    failures = 0
+    for path in args.paths:
+        recording = Recording.load(path)
+        start = time.monotonic()
+        try:
+            board = replay(recording, level_pack)
+        except ValueError as error:
+            failures += 1
+            print('{0}: {1}'.format(path, error))
+            continue
+        elapsed = time.monotonic() - start
+        final_hash = game_hash(board)
+        matched = final_hash == recording.final_hash
+        failures += not matched
+        print('{0}: {1}, {2} ticks, {3:.0f} ticks/s, score {4}'.format(
+            path, 'ok' if matched else 'MISMATCH {0:08x} != {1:08x}'.format(final_hash, recording.final_hash),
+            recording.ticks, recording.ticks / elapsed if elapsed else 0.0, board.score))
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
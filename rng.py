@@ -0,0 +1,42 @@
+class XorShift32(object):
+    """A small xorshift generator.
+
+    Only integer operations are used, so a given seed produces the same
+    sequence on CPython and CircuitPython.
+    """
+
+    def __init__(self, seed=1):
+        self.seed(seed)
+
+    def seed(self, seed):
+        # mix the seed, as small seeds would otherwise start off with a run
+        # of small numbers
+        x = seed & 0xFFFFFFFF
+        x = ((x ^ (x >> 16)) * 0x45D9F3B) & 0xFFFFFFFF
+        x = ((x ^ (x >> 16)) * 0x45D9F3B) & 0xFFFFFFFF
+        x ^= x >> 16
+        self._state = x or 0x9E3779B9
+
+    @property
+    def state(self):
+        return self._state
+
+    @state.setter
+    def state(self, state):
+        """Carry on from where another generator got to"""
+        self._state = state
+
+    def next(self):
+        x = self._state
+        x ^= (x << 13) & 0xFFFFFFFF
+        x ^= x >> 17
+        x ^= (x << 5) & 0xFFFFFFFF
+        self._state = x
+        return x
+
+    def randbelow(self, n):
+        return self.next() % n
+
+    def random(self):
+        """A float in [0, 1)"""
+        return (self.next() >> 8) / 16777216.0
@@ -0,0 +1,177 @@
+"""Run main.py on CPython against the stand-ins in headless/ and report
+ticks per second, per tick allocation and frame cost.
+
+    python run_headless.py --seconds 60 --encoder sweep
+
+The game runs on a simulated clock that only moves when the game loop
+sleeps, so a minute of play takes as long as the CPU needs for it.
+main_async.py paces itself with asyncio.sleep and so runs in real time:
+
+    python run_headless.py --entry main_async.py --seconds 10
+"""
+
+import argparse
+import gc
+import os
+import random
+import runpy
+import sys
+import time
+import tracemalloc
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+HEADLESS = os.path.join(HERE, 'headless')
+
+
+def _use_stand_ins():
+    for path in (HERE, HEADLESS):
+        if path not in sys.path:
+            sys.path.insert(0, path)
+
+
+class _Timer(object):
+    """Wraps a method, counting calls and accumulating their wall time."""
+
+    def __init__(self, cls, name, track_memory):
+        self.calls = 0
+        self.total_ns = 0
+        self.worst_ns = 0
+        self.peak_bytes = 0
+        self.instance = None
+        self._cls = cls
+        self._name = name
+        self._original = getattr(cls, name)
+        timer = self
+        original = self._original
+
+        def timed(*args, **kwargs):
+            if track_memory:
+                tracemalloc.reset_peak()
+                baseline = tracemalloc.get_traced_memory()[0]
+            start = time.perf_counter_ns()
+            result = original(*args, **kwargs)
+            elapsed = time.perf_counter_ns() - start
+            if track_memory:
+                timer.peak_bytes = max(timer.peak_bytes, tracemalloc.get_traced_memory()[1] - baseline)
+            timer.calls += 1
+            timer.instance = args[0]
+            timer.total_ns += elapsed
+            timer.worst_ns = max(timer.worst_ns, elapsed)
+            return result
+
+        setattr(cls, name, timed)
+
+    def restore(self):
+        setattr(self._cls, self._name, self._original)
+
+    def report(self, label):
+        if self.calls == 0:
+            return '{0:>10}: not called'.format(label)
+        line = '{0:>10}: {1:7d} calls, mean {2:8.1f} us, worst {3:8.1f} us'.format(
+            label, self.calls, self.total_ns / self.calls / 1000.0, self.worst_ns / 1000.0)
+        if self.peak_bytes:
+            line += ', peak transient {0} bytes'.format(self.peak_bytes)
+        return line
+
+
+def run(seconds, encoder='sweep', seed=0, track_memory=False, quiet=False, entry='main.py', record=None,
+        profile=False, trace=None, autopilot=False):
+    """Run main.py (or another entry point) until the game ends or
+    `seconds` of simulated time have passed, recording the game to `record`
+    if it's given, timing each phase of the loop if profile is set,
+    saving a trace of the last board events to `trace` if it's given and
+    letting the autopilot play if autopilot is set.  Returns the simulator."""
+    _use_stand_ins()
+    if record:
+        os.environ['BREAKOUT_RECORD'] = record
+    else:
+        os.environ.pop('BREAKOUT_RECORD', None)
+    if profile:
+        os.environ['BREAKOUT_PROFILE'] = '1'
+    else:
+        os.environ.pop('BREAKOUT_PROFILE', None)
+    if trace:
+        os.environ['BREAKOUT_TRACE'] = trace
+    else:
+        os.environ.pop('BREAKOUT_TRACE', None)
+    if autopilot:
+        os.environ['BREAKOUT_AUTOPILOT'] = '1'
+    else:
+        os.environ.pop('BREAKOUT_AUTOPILOT', None)
+    import simulator
+    import game_board
+    import neotrellis_display
+    import scheduler
+
+    random.seed(seed)
+    real_time = entry != 'main.py'
+    sim = simulator.install(simulator.Simulator(encoder_script=simulator.ENCODER_SCRIPTS[encoder],
+                                                max_time_ns=None if real_time else int(seconds * scheduler.NS_PER_SECOND),
+                                                max_wall_seconds=seconds if real_time else None,
+                                                seed=seed))
+    scheduler.use_clock(sim.clock_ns, sim.sleep)
+    timers = [('tick', _Timer(game_board.Board, 'move_balls', track_memory)),
+              ('paddle', _Timer(game_board.Board, 'update_paddle', track_memory)),
+              ('frame', _Timer(neotrellis_display.Adapter, 'update', track_memory)),
+              ('pass', _Timer(scheduler.Scheduler, 'run_once', track_memory))]
+    if track_memory:
+        tracemalloc.start()
+    collections_before = gc.get_stats()[0]['collections']
+    start = time.perf_counter()
+    try:
+        runpy.run_path(os.path.join(HERE, entry), run_name='__main__')
+        finished = 'game over'
+    except simulator.SimulationComplete:
+        finished = 'time budget used'
+    elapsed = time.perf_counter() - start
+    collections = gc.get_stats()[0]['collections'] - collections_before
+    if track_memory:
+        tracemalloc.stop()
+    for _, timer in timers:
+        timer.restore()
+    scheduler.use_clock(time.monotonic_ns, time.sleep)
+
+    if not quiet:
+        tick_timer = timers[0][1]
+        if real_time:
+            print('Finished: {0} after {1:.3f} s'.format(finished, elapsed))
+        else:
+            print('Finished: {0} after {1:.3f} s simulated, {2:.3f} s real'.format(
+                finished, sim.time_ns / float(scheduler.NS_PER_SECOND), elapsed))
+        print('Ticks per second: {0:.1f}'.format(tick_timer.calls / elapsed if elapsed else 0.0))
+        for label, timer in timers:
+            print(timer.report(label))
+        print('Gen 0 collections: {0}'.format(collections))
+        passes = timers[3][1].instance
+        if passes is not None:
+            for line in passes.report():
+                print('    ' + line)
+        display = timers[2][1].instance
+        if display is not None and display.frames:
+            print('Display: {0:.2f} pixels written, {1:.2f} bus transactions per frame'.format(
+                display.pixels_written / display.frames, display.bus_transactions / display.frames))
+        if sim.trellis is not None:
+            print('I2C transactions: {0}'.format(sim.trellis._trelli[0][0].i2c_bus.transactions))
+            for line in sim.render():
+                print('    ' + line)
+    return sim
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run the breakout game loop headless')
+    parser.add_argument('--seconds', type=float, default=60.0, help='simulated seconds to run before stopping')
+    parser.add_argument('--encoder', choices=['still', 'sweep', 'random'], default='sweep')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--entry', default='main.py', help='the game script to run')
+    parser.add_argument('--memory', action='store_true', help='track transient allocation with tracemalloc')
+    parser.add_argument('--record', help='record the game to this file, for replay.py')
+    parser.add_argument('--profile', action='store_true', help='log p50 and p99 times for each phase of the loop')
+    parser.add_argument('--trace', help='save the last board events to this file, for tracing.py')
+    parser.add_argument('--autopilot', action='store_true', help='let the autopilot move the paddle, not the encoder')
+    args = parser.parse_args()
+    run(args.seconds, args.encoder, args.seed, args.memory, entry=args.entry, record=args.record, profile=args.profile,
+        trace=args.trace, autopilot=args.autopilot)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,118 @@
+"""Fixed rate scheduling for the game loop.
+
+Each task runs at its own rate off time.monotonic_ns.  A task keeps an
+accumulator of time owed to it; every call to run_once pays that out in
+whole periods, up to the task's catch up limit, and anything still owed
+past that is dropped (and counted) rather than run late.  Physics can
+catch up a few ticks after a slow display flush and so keeps a fixed
+timestep, while the display just skips frames it has no time for.
+"""
+
+import time
+
+NS_PER_SECOND = 1000000000
+
+_clock = time.monotonic_ns
+_sleep = time.sleep
+
+
+def use_clock(clock, sleep):
+    """Replace the clock and sleep used by schedulers made from now on,
+    e.g. with a simulated clock when running headless."""
+    global _clock, _sleep
+    _clock = clock
+    _sleep = sleep
+
+
+class FixedRateTask(object):
+
+    def __init__(self, name, rate_hz, callback, max_catch_up=1):
+        """
+        :param name: label for reports
+        :param rate_hz: how many times a second to run
+        :param callback: called with no arguments each time the task runs
+        :param max_catch_up: the most runs in one pass when behind; the rest are dropped
+        """
+        self.name = name
+        self.period_ns = NS_PER_SECOND // rate_hz
+        self.callback = callback
+        self.max_catch_up = max_catch_up
+        self.owed_ns = 0
+        self.runs = 0
+        self.dropped = 0
+        self.late_passes = 0
+
+    def advance(self, elapsed_ns):
+        self.owed_ns += elapsed_ns
+        period = self.period_ns
+        runs = 0
+        while self.owed_ns >= period and runs < self.max_catch_up:
+            self.callback()
+            self.owed_ns -= period
+            runs += 1
+        if runs > 1:
+            self.late_passes += 1
+        if self.owed_ns >= period:
+            self.dropped += self.owed_ns // period
+            self.owed_ns %= period
+        self.runs += runs
+        return runs
+
+    @property
+    def due_in_ns(self):
+        return self.period_ns - self.owed_ns
+
+    def report(self):
+        return '{0}: {1} runs, {2} dropped, {3} catch up passes'.format(self.name, self.runs, self.dropped, self.late_passes)
+
+
+class Scheduler(object):
+
+    def __init__(self, clock=None, sleep=None):
+        self._clock = clock or _clock
+        self._sleep = sleep or _sleep
+        self._tasks = []
+        self._last_ns = None
+
+    def add(self, name, rate_hz, callback, max_catch_up=1):
+        """Add a task; tasks due in the same pass run in the order added."""
+        task = FixedRateTask(name, rate_hz, callback, max_catch_up)
+        self._tasks.append(task)
+        return task
+
+    @property
+    def tasks(self):
+        return self._tasks
+
+    def reset(self):
+        """Start timing afresh, e.g. after waiting for a launch, so the wait
+        isn't treated as time owed."""
+        self._last_ns = None
+        for task in self._tasks:
+            task.owed_ns = 0
+
+    def run_once(self):
+        """Run whatever is due and return the nanoseconds until something
+        is next due."""
+        now = self._clock()
+        if self._last_ns is None:
+            self._last_ns = now
+        elapsed = now - self._last_ns
+        self._last_ns = now
+        next_due = None
+        for task in self._tasks:
+            task.advance(elapsed)
+            due = task.due_in_ns
+            if next_due is None or due < next_due:
+                next_due = due
+        return next_due
+
+    def run_while(self, condition):
+        """Keep running tasks, sleeping between them, while condition()"""
+        while condition():
+            idle_ns = self.run_once()
+            if idle_ns:
+                self._sleep(idle_ns / NS_PER_SECOND)
+
+    def report(self):
+        return [task.report() for task in self._tasks]
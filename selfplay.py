@@ -0,0 +1,267 @@
+"""Headless self-play, for balancing levels and physics constants.
+
+Plays many games of each level with a scripted paddle and writes what
+happened, level by level, to a JSON results file: how many games cleared
+the level and how many ticks that took, balls lost, the spread of scores,
+and how often each block was knocked out.  Games are shared out over a
+process pool in chunks; each worker builds its own boards and sends back
+its totals and the ticks and score of each game, so the work scales with
+the number of cores.
+
+    python selfplay.py --games 2000 --levels 0 --out results.json
+
+Game n of a run is seeded with --seed plus n, for the board and for the
+controller, so a run gives the same results however many processes play
+it.  Change levels.py or the constants in ball.py and run it again to see
+what the change does.
+"""
+
+import argparse
+import json
+import random
+import time
+
+from game_board import Board
+from layout import DEFAULT_LAYOUT
+from levels import levels as LEVELS
+from paddle import Paddle, POINTS_PER_STEP, clip_steps
+from predictor import Autopilot
+
+SCALE = 8
+MAX_TICKS = 20000           # over ten minutes at 30 Hz; games still going are counted as timed out
+LAPSE = 0.2                 # how often the tracking controller misses a tick
+
+
+# A controller is made for each game, from the board, the paddle and a
+# random source, and gives the encoder steps to move the paddle by each
+# tick.
+
+def sweep(board, paddle, rng):
+    """Move back and forth across the field, as benchmarks/scenario.py does"""
+    def steps(tick):
+        return 1 if (tick // 12) % 2 == 0 else -1
+    return steps
+
+
+def track(board, paddle, rng):
+    """Follow the ball nearest the paddle, missing the odd tick"""
+    def steps(tick):
+        if rng.random() < LAPSE:
+            return 0
+        nearest = None
+        for ball in board.balls:
+            if ball is not None and (nearest is None or ball.center.y < nearest.center.y):
+                nearest = ball
+        if nearest is None:
+            return 0
+        # moving right takes the paddle towards smaller x
+        offset = paddle.position.x + paddle.width / 2 - nearest.center.x
+        return clip_steps(int(offset / POINTS_PER_STEP))
+    return steps
+
+
+def autopilot(board, paddle, rng):
+    """Go to where predictor.py says the next ball will land"""
+    pilot = Autopilot(board, paddle)
+    return lambda tick: pilot.steps()
+
+
+CONTROLLERS = {
+    'sweep': sweep,
+    'track': track,
+    'autopilot': autopilot,
+}
+
+
+class _CountingBoard(Board):
+    """A Board that counts the blocks it loses"""
+
+    def __init__(self, *args, **kwargs):
+        Board.__init__(self, *args, **kwargs)
+        self.removed = 0
+        self.knocked_out = [0] * len(self.cells)
+
+    def remove_block(self, column, row):
+        Board.remove_block(self, column, row)
+        self.removed += 1
+        self.knocked_out[row * self.columns + column] += 1
+
+
+def play(level, seed, controller, fixed_point=False, swept_collisions=False, max_ticks=MAX_TICKS):
+    """Play a game of level to the end, until it's cleared or max_ticks
+    have passed.  Returns the board and how many ticks it ran for, and
+    whether the level was cleared."""
+    paddle = Paddle(SCALE, field_columns=DEFAULT_LAYOUT.columns)
+    board = _CountingBoard(SCALE, DEFAULT_LAYOUT.rows, DEFAULT_LAYOUT.columns, paddle, fixed_point=fixed_point,
+                           seed=seed, swept_collisions=swept_collisions)
+    steps = controller(board, paddle, random.Random(seed))
+    board.reset_game()
+    clearable = board.set_up_level(level).clearable_blocks
+    for tick in range(max_ticks):
+        if board.removed >= clearable:
+            return board, tick, True
+        if not board.is_still_in_play:
+            if board.is_game_over:
+                return board, tick, False
+            board.launch()
+        paddle.move(steps(tick))
+        board.update_paddle()
+        board.move_balls()
+    return board, max_ticks, board.removed >= clearable
+
+
+class LevelResults(object):
+    """What happened over some games of one level"""
+
+    def __init__(self, level, cells):
+        self.level = level
+        self.games = 0
+        self.cleared = 0
+        self.timed_out = 0
+        self.ticks_to_clear = []
+        self.balls_lost = [0] * 4
+        self.scores = []
+        self.knocked_out = [0] * cells
+
+    def add_game(self, board, ticks, cleared, max_ticks):
+        self.games += 1
+        if cleared:
+            self.cleared += 1
+            self.ticks_to_clear.append(ticks)
+        elif ticks >= max_ticks:
+            self.timed_out += 1
+        self.balls_lost[min(3, 3 - board.balls_remaining)] += 1
+        self.scores.append(board.score)
+        for index in range(len(self.knocked_out)):
+            self.knocked_out[index] += board.knocked_out[index]
+
+    def merge(self, other):
+        self.games += other.games
+        self.cleared += other.cleared
+        self.timed_out += other.timed_out
+        self.ticks_to_clear.extend(other.ticks_to_clear)
+        self.scores.extend(other.scores)
+        for i in range(len(self.balls_lost)):
+            self.balls_lost[i] += other.balls_lost[i]
+        for i in range(len(self.knocked_out)):
+            self.knocked_out[i] += other.knocked_out[i]
+
+    def summary(self, columns, rows):
+        """The results as JSON-ready values.  knocked_out is given per
+        game, a line of the field above the paddle at a time from the top."""
+        field = []
+        for row in range(rows, 1, -1):
+            start = row * (columns + 2)
+            field.append([round(count / float(self.games), 3) for count in self.knocked_out[start + 1:start + columns + 1]])
+        return {'games': self.games,
+                'cleared': self.cleared,
+                'timed_out': self.timed_out,
+                'ticks_to_clear': spread(self.ticks_to_clear),
+                'balls_lost': self.balls_lost,
+                'score': spread(self.scores),
+                'knocked_out': field}
+
+
+def spread(values):
+    """Mean and percentiles of some numbers, or None if there aren't any"""
+    if not values:
+        return None
+    values = sorted(values)
+
+    def percentile(percent):
+        return values[min(len(values) - 1, len(values) * percent // 100)]
+    return {'mean': round(sum(values) / float(len(values)), 2), 'min': values[0], 'p10': percentile(10),
+            'p50': percentile(50), 'p90': percentile(90), 'max': values[-1]}
+
+
+def play_chunk(job):
+    """Play games first_seed up to last_seed of a level; run in a worker"""
+    level, first_seed, last_seed, controller, fixed_point, swept_collisions, max_ticks = job
+    results = None
+    for seed in range(first_seed, last_seed):
+        board, ticks, cleared = play(level, seed, CONTROLLERS[controller], fixed_point, swept_collisions, max_ticks)
+        if results is None:
+            results = LevelResults(level, len(board.cells))
+        results.add_game(board, ticks, cleared, max_ticks)
+    return results
+
+
+def jobs(levels, games, seed, chunk, controller, fixed_point, swept_collisions, max_ticks):
+    for level in levels:
+        for first in range(0, games, chunk):
+            yield (level, seed + first, seed + min(games, first + chunk), controller, fixed_point, swept_collisions,
+                   max_ticks)
+
+
+def run(levels, games, seed=0, processes=None, controller='track', fixed_point=False, swept_collisions=False,
+        max_ticks=MAX_TICKS):
+    """Play games of each level over a pool of processes (or in this one
+    if processes is 1) and return a LevelResults for each level"""
+    import multiprocessing
+
+    if processes is None:
+        processes = multiprocessing.cpu_count()
+    # a few chunks per process keeps them all busy to the end without much traffic
+    chunk = max(1, games // (processes * 4))
+    work = jobs(levels, games, seed, chunk, controller, fixed_point, swept_collisions, max_ticks)
+    results = {}
+    if processes == 1:
+        chunks = map(play_chunk, work)
+        pool = None
+    else:
+        pool = multiprocessing.Pool(processes)
+        chunks = pool.imap_unordered(play_chunk, work)
+    try:
+        for part in chunks:
+            if part.level in results:
+                results[part.level].merge(part)
+            else:
+                results[part.level] = part
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+    return [results[level] for level in levels]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Play many headless games of each level and report per level statistics')
+    parser.add_argument('--games', type=int, default=1000, help='games to play of each level')
+    parser.add_argument('--levels', type=int, nargs='+', default=[0])
+    parser.add_argument('--seed', type=int, default=1, help='the first game\'s seed')
+    parser.add_argument('--processes', type=int, help='worker processes; one per core if not given')
+    parser.add_argument('--controller', choices=sorted(CONTROLLERS), default='track')
+    parser.add_argument('--fixed-point', action='store_true')
+    parser.add_argument('--swept', action='store_true', help='use swept collisions')
+    parser.add_argument('--max-ticks', type=int, default=MAX_TICKS, help='ticks before a game is stopped')
+    parser.add_argument('--out', default='selfplay.json', help='where to write the results')
+    args = parser.parse_args()
+    if args.games < 1:
+        parser.error('--games must be at least 1')
+    args.levels = [level for i, level in enumerate(args.levels) if level not in args.levels[:i]]
+    for level in args.levels:
+        if not 0 <= level < len(LEVELS):
+            parser.error('there is no level {0}; levels.py has levels 0 to {1}'.format(level, len(LEVELS) - 1))
+
+    start = time.monotonic()
+    results = run(args.levels, args.games, args.seed, args.processes, args.controller, args.fixed_point, args.swept,
+                  args.max_ticks)
+    elapsed = time.monotonic() - start
+    columns = DEFAULT_LAYOUT.columns
+    rows = DEFAULT_LAYOUT.rows
+    with open(args.out, 'w') as f:
+        json.dump({'settings': {'games': args.games, 'seed': args.seed, 'controller': args.controller,
+                                'fixed_point': args.fixed_point, 'swept_collisions': args.swept,
+                                'max_ticks': args.max_ticks},
+                   'levels': {str(r.level): r.summary(columns, rows) for r in results}}, f, indent=2, sort_keys=True)
+    for r in results:
+        ticks = spread(r.ticks_to_clear)
+        scores = spread(r.scores)
+        print('level {0}: {1}/{2} cleared, p50 {3} ticks to clear, p50 score {4}, {5} timed out'.format(
+            r.level, r.cleared, r.games, ticks['p50'] if ticks else '-', scores['p50'], r.timed_out))
+    print('{0} games in {1:.1f} s, {2:.1f} games/s; results in {3}'.format(
+        len(args.levels) * args.games, elapsed, len(args.levels) * args.games / elapsed, args.out))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,177 @@
+"""Swept collision of a ball against the board's cell grid.
+
+Rather than moving a ball a whole step and then looking at the cells
+under its new box, the box is swept along its path.  A grid walk (DDA)
+visits the tiles the box's leading edges enter, in the order they are
+entered, and the earliest contact with a cell's bounding box wins.  The
+ball is moved up to the contact, bounced, and carries on with what is left
+of the step, so nothing is tunnelled through however far the ball moves in
+one tick.
+
+Everything is worked out in the physics' native units (points on the float
+path, 1/ONE of a point in fixed point) with times in 1/TIME_ONE of the
+step, so the fixed point mode stays integer only.
+"""
+
+from cells import EMPTY, BALL
+from ball import BALL_SIZE, COLLISION_MARGIN
+
+TIME_ONE = 256
+MAX_BOUNCES_PER_STEP = 4
+_NEVER = 1 << 30
+
+
+class GridSweep(object):
+
+    def __init__(self, board):
+        self._board = board
+        self._units = board.physics.units_per_point
+        self._integer = self._units != 1
+        self._tile = board.scale * self._units
+        # the contact found by the last call to first_hit
+        self.time = _NEVER
+        self.column = 0
+        self.row = 0
+        self.on_x_axis = False
+        self.cell = None
+
+    def _scaled(self, value, numerator, denominator):
+        if self._integer:
+            return value * numerator // denominator
+        return value * numerator / denominator
+
+    def _first_tile(self, low):
+        return int(low // self._tile)
+
+    def _last_tile(self, high):
+        """The last tile touched by a span ending (exclusively) at high"""
+        return int(-((-high) // self._tile)) - 1
+
+    def move(self, ball):
+        """Move the ball through one tick, bouncing off whatever it meets on
+        the way.  Returns False if the ball left play."""
+        units = self._units
+        position = ball.position
+        velocity = ball.velocity
+        remaining = TIME_ONE
+        for _ in range(MAX_BOUNCES_PER_STEP):
+            dx = self._scaled(velocity.raw_x, remaining, TIME_ONE)
+            dy = self._scaled(velocity.raw_y, remaining, TIME_ONE)
+            x = position.raw_x
+            y = position.raw_y
+            if not self.first_hit(x + COLLISION_MARGIN * units,
+                                  y - (BALL_SIZE - 1 - COLLISION_MARGIN) * units,
+                                  x + (BALL_SIZE - COLLISION_MARGIN) * units,
+                                  y + (1 - COLLISION_MARGIN) * units,
+                                  dx, dy):
+                position.move_by_raw(dx, dy)
+                return True
+            t = self.time
+            position.move_by_raw(self._scaled(dx, t, TIME_ONE), self._scaled(dy, t, TIME_ONE))
+            cell = self.cell
+            cell.process_hit(ball, self.column, self.row)
+            if self.on_x_axis:
+                ball.reflect_from_side(cell)
+            else:
+                ball.reflect_from_top_bottom(cell)
+            if not self._board.is_ball_in_play(ball):
+                return False
+            remaining -= self._scaled(remaining, t, TIME_ONE)
+            if remaining <= 0:
+                break
+        return True
+
+    def first_hit(self, left, top, right, bottom, dx, dy):
+        """Find the first cell the box [left, right) x [top, bottom) runs
+        into while moving by (dx, dy).  The result is left in time, column,
+        row, on_x_axis and cell."""
+        self.time = _NEVER
+        self.cell = None
+        tile = self._tile
+
+        first_column = self._first_tile(left)
+        last_column = self._last_tile(right)
+        first_row = self._first_tile(top)
+        last_row = self._last_tile(bottom)
+        for column in range(first_column, last_column + 1):
+            for row in range(first_row, last_row + 1):
+                self._check(column, row, left, top, right, bottom, dx, dy)
+
+        if dx > 0:
+            next_column = last_column + 1
+            x_distance = next_column * tile - right
+            column_step = 1
+        elif dx < 0:
+            next_column = first_column - 1
+            x_distance = left - first_column * tile
+            column_step = -1
+        else:
+            x_distance = None
+        if dy > 0:
+            next_row = last_row + 1
+            y_distance = next_row * tile - bottom
+            row_step = 1
+        elif dy < 0:
+            next_row = first_row - 1
+            y_distance = top - first_row * tile
+            row_step = -1
+        else:
+            y_distance = None
+
+        while True:
+            tx = _NEVER if x_distance is None else self._scaled(x_distance, TIME_ONE, abs(dx))
+            ty = _NEVER if y_distance is None else self._scaled(y_distance, TIME_ONE, abs(dy))
+            t = tx if tx <= ty else ty
+            if t > TIME_ONE or t > self.time:
+                break
+            if tx <= ty:
+                shift = self._scaled(dy, t, TIME_ONE)
+                for row in range(self._first_tile(top + shift), self._last_tile(bottom + shift) + 1):
+                    self._check(next_column, row, left, top, right, bottom, dx, dy)
+                next_column += column_step
+                x_distance += tile
+            else:
+                shift = self._scaled(dx, t, TIME_ONE)
+                for column in range(self._first_tile(left + shift), self._last_tile(right + shift) + 1):
+                    self._check(column, next_row, left, top, right, bottom, dx, dy)
+                next_row += row_step
+                y_distance += tile
+        return self.cell is not None
+
+    def _entry_and_exit(self, low, high, cell_low, cell_high, d):
+        if d > 0:
+            return self._scaled(cell_low - high, TIME_ONE, d), self._scaled(cell_high - low, TIME_ONE, d)
+        if d < 0:
+            return self._scaled(low - cell_high, TIME_ONE, -d), self._scaled(high - cell_low, TIME_ONE, -d)
+        if high <= cell_low or low >= cell_high:
+            return _NEVER, -_NEVER
+        return -_NEVER, _NEVER
+
+    def _check(self, column, row, left, top, right, bottom, dx, dy):
+        board = self._board
+        if column < 0 or row < 0 or column >= board.columns or row >= board.rows:
+            return
+        code = board.code_at(column, row)
+        if code == EMPTY or code == BALL:
+            return
+        cell = board.cell_type(code)
+        box = cell.bounding_box_at(column, row)
+        units = self._units
+        x_entry, x_exit = self._entry_and_exit(left, right, box.left * units, (box.right + 1) * units, dx)
+        y_entry, y_exit = self._entry_and_exit(top, bottom, box.top * units, (box.bottom + 1) * units, dy)
+        entry = x_entry if x_entry > y_entry else y_entry
+        leave = x_exit if x_exit < y_exit else y_exit
+        # already overlapping at the start is left alone, so a ball that has
+        # just bounced can move away
+        if entry >= leave or entry < 0 or entry > TIME_ONE or entry >= self.time:
+            return
+        on_x_axis = x_entry > y_entry
+        if on_x_axis and not cell.is_vertical:
+            return
+        if not on_x_axis and not cell.is_horizontal:
+            return
+        self.time = entry
+        self.column = column
+        self.row = row
+        self.on_x_axis = on_x_axis
+        self.cell = cell
@@ -0,0 +1,145 @@
+"""A trace of what the board did over the last few hundred events, for
+working out what happened after a glitch.
+
+Tracing is off unless enable is called.  Trace points check the module's
+`enabled` flag before doing anything else, so while it's off they cost a
+global lookup and a test, with no arguments built or strings formatted.
+While it's on each event is packed into a preallocated ring buffer as an
+8 byte record, overwriting the oldest:
+
+    offset  size
+    0       1     event
+    1       1     ball slot, 255 if there isn't one
+    2       2     physics tick, wrapping at 65536
+    4       2     a
+    6       2     b
+
+a and b depend on the event (see EVENTS); all are signed.  dump gives
+the records as text, oldest first, and save writes them out raw so that
+
+    python tracing.py trace.bin
+
+can print them later.
+"""
+
+import struct
+
+RECORD_FORMAT = '<BBHhh'
+RECORD_SIZE = struct.calcsize(RECORD_FORMAT)
+NO_SLOT = 255
+
+LEVEL = 1
+LAUNCH = 2
+BALL_ADDED = 3
+BALL_MOVED = 4
+BALL_HIT = 5
+EDGE_HIT = 6
+CORNER_HIT = 7
+BLOCK_REMOVED = 8
+OUT_OF_BOUNDS = 9
+
+# names, and what a and b hold, for each event
+EVENTS = {
+    LEVEL: ('level', 'level', ''),
+    LAUNCH: ('launch', 'balls left', ''),
+    BALL_ADDED: ('ball added', 'x', 'y'),
+    BALL_MOVED: ('ball moved', 'x', 'y'),
+    BALL_HIT: ('ball hit ball', 'x', 'y'),
+    EDGE_HIT: ('edge hit', 'x', 'y'),
+    CORNER_HIT: ('corner hit', 'x', 'y'),
+    BLOCK_REMOVED: ('block removed', 'column', 'row'),
+    OUT_OF_BOUNDS: ('out of bounds', 'balls in play', ''),
+}
+
+enabled = False
+_buffer = None
+_size = 0
+_next = 0
+_count = 0
+_tick = 0
+
+
+def enable(size=256):
+    """Start tracing into a fresh buffer of `size` records"""
+    global enabled, _buffer, _size, _next, _count, _tick
+    _buffer = bytearray(size * RECORD_SIZE)
+    _size = size
+    _next = 0
+    _count = 0
+    _tick = 0
+    enabled = True
+
+
+def disable():
+    """Stop tracing; what was recorded can still be dumped"""
+    global enabled
+    enabled = False
+
+
+def tick():
+    """Count a physics tick"""
+    global _tick
+    _tick = (_tick + 1) & 0xFFFF
+
+
+def record(event, slot=NO_SLOT, a=0, b=0):
+    global _next, _count
+    struct.pack_into(RECORD_FORMAT, _buffer, _next * RECORD_SIZE, event, slot, _tick, a, b)
+    _next += 1
+    if _next == _size:
+        _next = 0
+    if _count < _size:
+        _count += 1
+
+
+def records(data=None):
+    """(event, slot, tick, a, b) for each record, oldest first: from the
+    ring buffer, or from data written by save"""
+    if data is None:
+        if _buffer is None:
+            return
+        data = _buffer
+        first = (_next - _count) % _size if _size else 0
+        count = _count
+    else:
+        first = 0
+        count = len(data) // RECORD_SIZE
+    for i in range(count):
+        offset = ((first + i) % (len(data) // RECORD_SIZE)) * RECORD_SIZE
+        yield struct.unpack_from(RECORD_FORMAT, data, offset)
+
+
+def describe(event, slot, tick, a, b):
+    name, a_label, b_label = EVENTS.get(event, ('event {0}'.format(event), 'a', 'b'))
+    line = '{0:5d} {1}'.format(tick, name)
+    if slot != NO_SLOT:
+        line += ' (ball {0})'.format(slot)
+    if a_label:
+        line += ' {0} {1}'.format(a_label, a)
+    if b_label:
+        line += ' {0} {1}'.format(b_label, b)
+    return line
+
+
+def dump(data=None):
+    """The records as lines of text, oldest first"""
+    return [describe(*r) for r in records(data)]
+
+
+def save(path):
+    """Write the records out, oldest first, for tracing.py to print"""
+    with open(path, 'wb') as f:
+        for r in records():
+            f.write(struct.pack(RECORD_FORMAT, *r))
+
+
+def main():
+    import sys
+    with open(sys.argv[1], 'rb') as f:
+        data = f.read()
+    for line in dump(data):
+        print(line)
+
+
+if __name__ == '__main__':
+    main()
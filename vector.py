@@ -1,146 +1,268 @@
-from math import sin, cos, atan2, sqrt, fabs, pi
+import math
+from math import sin, cos, atan2, sqrt, pi
 
 import adafruit_logging as logging
 logger = logging.getLogger('breakout')
 
+# Quantized angles: with use_quantized_angles(), sin, cos and atan2 here
+# become table lookups at 512 steps a turn.  sin and cos are then within
+# 0.0062 of math's (half a step), and atan2 within 0.0082 radians (two
+# thirds of a step) and always a whole number of steps.
+ANGLE_STEPS = 512
+RADIANS_TO_STEPS = ANGLE_STEPS / (2 * pi)
+STEPS_TO_RADIANS = (2 * pi) / ANGLE_STEPS
+_RATIO_STEPS = 256
+_SINE = tuple(math.sin(i * STEPS_TO_RADIANS) for i in range(ANGLE_STEPS))
+# atan(i / _RATIO_STEPS) in steps, i = 0.._RATIO_STEPS
+_ARCTANGENT = tuple(int(math.atan(i / _RATIO_STEPS) * RADIANS_TO_STEPS + 0.5) for i in range(_RATIO_STEPS + 1))
+_quantized = False
+
+
+def quantized_sin(radians):
+    # the offset is four turns (2048 steps), plus a half for rounding, so
+    # int() rounds right for angles down to -8 pi; cos adds another quarter turn
+    return _SINE[int(radians * RADIANS_TO_STEPS + 2048.5) & 511]
+
+
+def quantized_cos(radians):
+    return _SINE[int(radians * RADIANS_TO_STEPS + 2176.5) & 511]
+
+
+def quantized_atan2(y, x):
+    if x == 0.0 and y == 0.0:
+        return 0.0
+    ax = abs(x)
+    ay = abs(y)
+    if ax >= ay:
+        steps = _ARCTANGENT[int(ay / ax * _RATIO_STEPS + 0.5)]
+    else:
+        steps = 128 - _ARCTANGENT[int(ax / ay * _RATIO_STEPS + 0.5)]
+    if x < 0.0:
+        steps = 256 - steps
+    if y < 0.0:
+        steps = -steps
+    return steps * STEPS_TO_RADIANS
+
+
+def use_quantized_angles(quantized=True):
+    """Switch every Vector to table lookups for its trig, or back to the
+    math module.  Games play out differently either way, so pick one
+    before the game starts."""
+    global sin, cos, atan2, _quantized
+    if quantized:
+        sin, cos, atan2 = quantized_sin, quantized_cos, quantized_atan2
+    else:
+        sin, cos, atan2 = math.sin, math.cos, math.atan2
+    _quantized = quantized
+
+
+def quantized_angles():
+    return _quantized
+
+
 class Vector (object):
+    """A 2D vector.
+
+    The Cartesian components are the source of truth.  The angle and
+    magnitude are worked out on first use and cached until the vector is
+    next changed, so the per tick x/y/dot/+= work does no trig at all.
+    Angles are in radians, in [0, 2 pi).
+    """
+
+    __slots__ = ('_x', '_y', '_angle', '_magnitude')
 
     def __init__(self, angle, magnitude):
-        self._angle = angle
-        self._magnitude = magnitude
+        self._x = magnitude * cos(angle)
+        self._y = magnitude * sin(angle)
+        self._angle = None
+        self._magnitude = magnitude if magnitude >= 0 else None
 
     def __str__(self):
-        return "Vector(a: {0:6.4f} pi, s: {1:4.2f})".format(self._angle / pi, self._magnitude)
+        return "Vector(a: {0:6.4f} pi, s: {1:4.2f})".format(self.angle / pi, self.magnitude)
+
+    def _changed(self):
+        self._angle = None
+        self._magnitude = None
 
     @property
     def x(self):
-        return self._magnitude * cos(self._angle)
+        return self._x
 
     @property
     def y(self):
-        return self._magnitude * sin(self._angle)
+        return self._y
+
+    @property
+    def raw_x(self):
+        return self._x
+
+    @property
+    def raw_y(self):
+        return self._y
 
     @property
     def angle(self):
+        if self._angle is None:
+            angle = atan2(self._y, self._x)
+            if angle < 0.0:
+                angle += 2 * pi
+            self._angle = angle
         return self._angle
 
+    @angle.setter
+    def angle(self, new_angle):
+        magnitude = self.magnitude
+        self._x = magnitude * cos(new_angle)
+        self._y = magnitude * sin(new_angle)
+        self._angle = None
+
     @property
     def magnitude(self):
+        if self._magnitude is None:
+            self._magnitude = sqrt(self._x * self._x + self._y * self._y)
         return self._magnitude
 
+    @magnitude.setter
+    def magnitude(self, new_magnitude):
+        magnitude = self.magnitude
+        if magnitude == 0.0:
+            self._x = new_magnitude
+            self._y = 0.0
+            self._angle = None
+        else:
+            scale = new_magnitude / magnitude
+            self._x *= scale
+            self._y *= scale
+        self._magnitude = new_magnitude
+
+    def set_components(self, x, y):
+        self._x = x
+        self._y = y
+        self._changed()
+
     def flip_x(self):
-        offset = 2 * pi if self._angle > pi else 0.0
-        return offset + pi - self._angle
+        self._x = -self._x
+        self._angle = None
 
     def flip_y(self):
-        return (2 * pi) - self._angle
+        self._y = -self._y
+        self._angle = None
 
     def angle_as_deg_512(self):
-        return int((self._angle * 163)) >> 1
+        return int((self.angle * 163)) >> 1
 
     def __iadd__(self, o):
-        logger.debug('Vector +=')
-        cx = self.x + o.x
-        cy = self.y + o.y
-        self.angle = atan2(cy, cx)
-        self.magnitude = sqrt(cx * cx + cy * cy)
+        self._x += o.x
+        self._y += o.y
+        self._changed()
         return self
 
     def __add__(self, o):
-        logger.debug('Vector +')
-        s = Vector(self._angle, self._magnitude)
-        s += o
-        return s
+        return vector_from_components(self._x + o.x, self._y + o.y)
 
     def __isub__(self, o):
-        cx = self.x - o.x
-        cy = self.y - o.y
-        self.angle = atan2(cy, cx)
-        self.magnitude = sqrt(cx * cx + cy * cy)
+        self._x -= o.x
+        self._y -= o.y
+        self._changed()
         return self
 
     def __sub__(self, o):
-        s = Vector(self._angle, self._magnitude)
-        s -= o
-        return s
+        return vector_from_components(self._x - o.x, self._y - o.y)
 
     def __imul__(self, scale):
-        self._magnitude *= scale
+        self._x *= scale
+        self._y *= scale
+        self._changed()
         return self
 
-    def __idiv__(self, scale):
-        self._magnitude /= scale
+    def __itruediv__(self, scale):
+        self._x /= scale
+        self._y /= scale
+        self._changed()
         return self
 
     def __mul__(self, scale):
-        return Vector(self.angle, self._magnitude * scale)
+        return vector_from_components(self._x * scale, self._y * scale)
 
-    def __div__(self, scale):
-        return Vector(self.angle, self._magnitude / scale)
+    def __truediv__(self, scale):
+        return vector_from_components(self._x / scale, self._y / scale)
+
+    __idiv__ = __itruediv__
+    __div__ = __truediv__
 
     def dot(self, o):
-        return self.x * o.x + self.y * o.y
+        return self._x * o.x + self._y * o.y
 
     def normalize(self):
-        self._magnitude = 1.0
+        magnitude = self.magnitude
+        if magnitude != 0.0:
+            self._x /= magnitude
+            self._y /= magnitude
+            self._magnitude = 1.0
 
     def clip_magnitude_at(self, high):
-        if self._magnitude > high:
-            self._magnitude = high
+        if self.magnitude > high:
+            self.magnitude = high
 
     def clip_magnitude_between(self, low, high):
-        if self._magnitude < low:
-            self._magnitude = low
-        if self._magnitude > high:
-            self._magnitude = high
+        magnitude = self.magnitude
+        if magnitude < low:
+            self.magnitude = low
+        elif magnitude > high:
+            self.magnitude = high
 
     def clip_angle_between(self, low, high):
-        if self._angle < low:
-            self._angle = low
-        if self._angle > high:
-            self._angle = high
+        angle = self.angle
+        if angle < low:
+            self.angle = low
+        elif angle > high:
+            self.angle = high
 
     def normalize_angle(self):
-        while self._angle > 2 * pi:
-            self._angle -= 2 * pi
+        """Angles are always kept in [0, 2 pi); kept for compatibility."""
+        pass
 
     @property
     def is_left(self):
-        self.normalize_angle()
-        return (self._angle > (0.5 * pi)) and (self._angle < (1.5 * pi))
+        return self._x < 0.0
 
     @property
     def is_right(self):
-        self.normalize_angle()
-        return (self._angle > (1.5 * pi)) or (self._angle < (0.5 * pi))
+        return self._x > 0.0
 
     @property
     def is_down(self):
-        self.normalize_angle()
-        return self._angle < pi
+        return self._y > 0.0
 
     @property
     def is_up(self):
-        self.normalize_angle()
-        return self._angle > pi
+        return self._y < 0.0
 
     @property
     def is_primarily_right(self):
-        self.normalize_angle()
-        return self._angle <= (0.25 * pi) or self._angle >= (1.75 * pi)
+        return self._x >= abs(self._y)
 
+    @property
     def is_primarily_up(self):
-        self.normalize_angle()
-        return self._angle >= (1.25 * pi) and self._angle <= (1.75 * pi)
+        return -self._y >= abs(self._x)
 
+    @property
     def is_primarily_left(self):
-        self.normalize_angle()
-        return self._angle >= 0.75 * pi and self._angle <= 1.25 * pi
+        return -self._x >= abs(self._y)
 
+    @property
     def is_primarily_down(self):
-        self.normalize_angle()
-        return self._angle >= 0.25 * pi and self._angle <= 0.75 * pi
+        return self._y >= abs(self._x)
 
     def is_in_the_same_direction_as(self, v):
-        difference = fabs(v - self)
-        return difference.angle < 0.5 * pi
+        return self.dot(v) > 0.0
+
+
+def vector_from_components(x, y):
+    """Make a Vector from its x and y components without any trig."""
+    v = Vector.__new__(Vector)
+    v._x = x
+    v._y = y
+    v._angle = None
+    v._magnitude = None
+    return v